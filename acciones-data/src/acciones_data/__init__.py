@@ -1,10 +1,21 @@
 """Paquete para descargar precios de acciones de tecnología usando yfinance."""
 
 from acciones_data import entrenar_autots, predecir_forecast, transformar_datos, utils
-from acciones_data.descargar_datos import descargar_datos_sector
+from acciones_data.descargar_datos import descargar_datos_sector, descargar_sectores
+from acciones_data.fuentes_precios import (
+    FuenteArchivoLocal,
+    FuentePrecios,
+    FuenteSintetica,
+    FuenteYFinance,
+)
 
 __all__ = [
     "descargar_datos_sector",
+    "descargar_sectores",
+    "FuentePrecios",
+    "FuenteYFinance",
+    "FuenteArchivoLocal",
+    "FuenteSintetica",
     "transformar_datos",
     "entrenar_autots",
     "predecir_forecast",
@@ -0,0 +1,68 @@
+"""Benchmark de descarga concurrente con la fuente sintética (sin red).
+
+Simula miles de tickers con latencia y fallos por solicitud y compara la
+descarga secuencial con el pool de hilos acotado.
+
+Uso:
+    uv run acciones-data/src/acciones_data/benchmark_descarga.py
+"""
+
+import time
+
+from acciones_data.descargar_datos import descargar_sectores
+from acciones_data.fuentes_precios import FuenteSintetica
+
+
+def generar_sectores(n_sectores: int, tickers_por_sector: int) -> dict[str, list[str]]:
+    """
+    Crea sectores con tickers ficticios ('S00T0000', 'S00T0001', ...).
+
+    Args:
+        n_sectores: Número de sectores.
+        tickers_por_sector: Tickers en cada sector.
+
+    Returns:
+        Diccionario sector -> lista de tickers.
+    """
+    return {
+        f"sector_{s:02d}": [f"S{s:02d}T{t:04d}" for t in range(tickers_por_sector)]
+        for s in range(n_sectores)
+    }
+
+
+def main(
+    n_sectores: int = 10,
+    tickers_por_sector: int = 300,
+    latencia: float = 0.05,
+    tasa_fallos: float = 0.05,
+    hilos: tuple[int, ...] = (1, 4, 16),
+) -> None:
+    """Punto de entrada principal."""
+    sectores = generar_sectores(n_sectores, tickers_por_sector)
+    total = n_sectores * tickers_por_sector
+    print(
+        f"{total:,} tickers en {n_sectores} sectores | latencia {latencia * 1000:.0f} ms "
+        f"| fallos {tasa_fallos:.0%} por solicitud\n"
+    )
+
+    referencia = None
+    for max_hilos in hilos:
+        fuente = FuenteSintetica(latencia=latencia, tasa_fallos=tasa_fallos)
+        inicio = time.perf_counter()
+        precios, errores = descargar_sectores(
+            sectores, fuente, max_hilos=max_hilos, espera_inicial=0.01
+        )
+        segundos = time.perf_counter() - inicio
+        referencia = referencia or segundos
+        print(
+            f"- {max_hilos:>3} hilos: {segundos:6.2f} s "
+            f"({total / segundos:,.0f} tickers/s, x{referencia / segundos:.1f}) | "
+            f"sectores incompletos: {len(errores)}"
+        )
+
+    columnas = sum(df.shape[1] for df in precios.values())
+    print(f"\n✓ Última ejecución: {columnas:,} series descargadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,194 @@
-"""Script para descargar datos de precios de acciones usando yfinance."""
+"""Script para descargar datos de precios de acciones usando yfinance.
 
+Las descargas de todos los sectores se reparten en lotes de tickers y se
+ejecutan en un pool de hilos acotado, con reintentos (espera exponencial con
+jitter) y timeout por solicitud. La fuente es intercambiable (ver
+``acciones_data.fuentes_precios``): por defecto Yahoo Finance.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-import yfinance as yf
+import random
+import time
+
+import pandas as pd
+
 from acciones_data.configurar_forecast import obtener_configuracion_sectores
+from acciones_data.fuentes_precios import FuentePrecios, FuenteYFinance
 
+TAMANO_LOTE = 50
+MAX_HILOS = 8
+REINTENTOS = 3
+ESPERA_INICIAL = 1.0
+TIMEOUT = 30.0
 
-def descargar_datos_sector(sector: str, tickers: list, directorio_base: Path) -> None:
+
+def obtener_con_reintentos(
+    fuente: FuentePrecios,
+    tickers: list[str],
+    periodo: str = "5y",
+    reintentos: int = REINTENTOS,
+    espera_inicial: float = ESPERA_INICIAL,
+    timeout: float = TIMEOUT,
+) -> pd.DataFrame:
     """
-    Descarga los precios de cierre para un sector específico.
+    Consulta un lote de tickers reintentando ante errores o respuestas vacías.
 
     Args:
-        sector: Nombre del sector (ej. 'tecnologia', 'consumo')
-        tickers: Lista de símbolos de acciones
+        fuente: Fuente de precios.
+        tickers: Lote de símbolos.
+        periodo: Ventana hacia atrás, con el formato de yfinance.
+        reintentos: Intentos adicionales tras el primero.
+        espera_inicial: Espera antes del primer reintento; se duplica en cada uno.
+        timeout: Segundos máximos por solicitud.
+
+    Returns:
+        DataFrame ancho con los precios de cierre del lote.
+    """
+    for intento in range(reintentos + 1):
+        try:
+            precios = fuente.obtener_cierres(tickers, periodo=periodo, timeout=timeout)
+            if not precios.empty:
+                return precios
+            error: Exception = RuntimeError("respuesta vacía")
+        except Exception as e:
+            error = e
+        if intento < reintentos:
+            # Jitter: evita que los hilos que fallaron juntos reintenten a la vez.
+            time.sleep(espera_inicial * 2**intento * random.uniform(0.5, 1.5))
+    raise RuntimeError(
+        f"Error descargando {tickers} tras {reintentos + 1} intentos: {error}"
+    ) from error
+
+
+def descargar_sectores(
+    sectores: dict[str, list[str]],
+    fuente: FuentePrecios | None = None,
+    periodo: str = "5y",
+    tamano_lote: int = TAMANO_LOTE,
+    max_hilos: int = MAX_HILOS,
+    reintentos: int = REINTENTOS,
+    espera_inicial: float = ESPERA_INICIAL,
+    timeout: float = TIMEOUT,
+) -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """
+    Descarga todos los sectores en paralelo, en lotes de ``tamano_lote`` tickers.
+
+    Args:
+        sectores: Sector -> lista de tickers.
+        fuente: Fuente de precios (por defecto ``FuenteYFinance``).
+        periodo: Ventana hacia atrás, con el formato de yfinance.
+        tamano_lote: Tickers por solicitud.
+        max_hilos: Solicitudes simultáneas como máximo.
+        reintentos: Reintentos por lote.
+        espera_inicial: Espera base del backoff exponencial, en segundos.
+        timeout: Segundos máximos por solicitud.
+
+    Returns:
+        Tupla ``(precios, errores)``: precios por sector con al menos un
+        ticker descargado (columnas en el orden de ``sectores``) y, por cada
+        sector vacío o incompleto, un mensaje con los tickers que faltan. Un
+        lote fallido no descarta los lotes correctos de su sector.
+    """
+    fuente = fuente or FuenteYFinance()
+    lotes: dict[str, list[pd.DataFrame]] = {sector: [] for sector in sectores}
+    fallos: dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max_hilos) as pool:
+        futuros = {
+            pool.submit(
+                obtener_con_reintentos,
+                fuente,
+                tickers[inicio : inicio + tamano_lote],
+                periodo,
+                reintentos,
+                espera_inicial,
+                timeout,
+            ): sector
+            for sector, tickers in sectores.items()
+            for inicio in range(0, len(tickers), tamano_lote)
+        }
+        for futuro in as_completed(futuros):
+            sector = futuros[futuro]
+            try:
+                lotes[sector].append(futuro.result())
+            except RuntimeError as e:
+                fallos.setdefault(sector, str(e))
+
+    precios: dict[str, pd.DataFrame] = {}
+    errores: dict[str, str] = {}
+    for sector, tickers in sectores.items():
+        if not tickers:
+            errores[sector] = f"El sector {sector} no tiene tickers configurados."
+            continue
+        combinados = pd.concat(lotes[sector], axis=1) if lotes[sector] else None
+        columnas = [] if combinados is None else combinados.columns
+        faltantes = [t for t in tickers if t not in columnas]
+        if faltantes:
+            causa = fallos.get(sector, "sin datos en la respuesta")
+            errores[sector] = (
+                f"Faltan {len(faltantes)} de {len(tickers)} tickers de {sector} "
+                f"{faltantes}: {causa}"
+            )
+        if combinados is not None:
+            # Los lotes llegan en orden de finalización: se restaura el de ``tickers``.
+            precios[sector] = combinados[[t for t in tickers if t in columnas]]
+    return precios, errores
+
+
+def guardar_precios_sector(
+    sector: str, precios: pd.DataFrame, directorio_base: Path
+) -> Path:
+    """
+    Guarda los precios de un sector en ``<directorio_base>/<sector>/precios_<sector>.csv``.
+
+    Args:
+        sector: Nombre del sector.
+        precios: DataFrame ancho con los precios de cierre.
         directorio_base: Ruta base donde guardar los datos (.cache/cargados)
+
+    Returns:
+        Ruta del archivo escrito.
     """
     directorio_destino = directorio_base / sector
     directorio_destino.mkdir(parents=True, exist_ok=True)
+    archivo_csv = directorio_destino / f"precios_{sector}.csv"
+    temporal = archivo_csv.with_suffix(".csv.tmp")
+    precios.to_csv(temporal)
+    temporal.replace(archivo_csv)
+    return archivo_csv
+
 
+def descargar_datos_sector(
+    sector: str,
+    tickers: list,
+    directorio_base: Path,
+    fuente: FuentePrecios | None = None,
+) -> None:
+    """
+    Descarga los precios de cierre para un sector específico.
+
+    Args:
+        sector: Nombre del sector (ej. 'tecnologia', 'consumo')
+        tickers: Lista de símbolos de acciones
+        directorio_base: Ruta base donde guardar los datos (.cache/cargados)
+        fuente: Fuente de precios (por defecto ``FuenteYFinance``)
+    """
     print(f"\nDescargando sector: {sector.upper()}")
     print(f"Tickers: {tickers}")
-    print(f"Destino: {directorio_destino}")
-
-    try:
-        # Descargar el precio de CIERRE de los últimos 5 años
-        posible_df = yf.download(tickers, period="5y")
-        if posible_df is None or posible_df.empty:
-            raise RuntimeError(f"No se descargaron datos para {sector}")
-        df_productos = posible_df["Close"]
-    except Exception as e:
-        raise RuntimeError(f"Error descargando {sector}: {e}") from e
-
-    # Guardar a CSV
-    archivo_csv = directorio_destino / f"precios_{sector}.csv"
-    df_productos.to_csv(archivo_csv)
+    print(f"Destino: {directorio_base / sector}")
 
-    print(f"✓ Descarga de {sector} completada.")
-    print(f"  Archivo: {archivo_csv}")
-    print(f"  Dimensiones: {df_productos.shape}")
+    precios, errores = descargar_sectores({sector: list(tickers)}, fuente)
+    if sector in precios:
+        archivo_csv = guardar_precios_sector(sector, precios[sector], directorio_base)
+        print(f"✓ Descarga de {sector} completada.")
+        print(f"  Archivo: {archivo_csv}")
+        print(f"  Dimensiones: {precios[sector].shape}")
+    if errores:
+        raise RuntimeError(f"Error descargando {sector}: {errores[sector]}")
 
 
-def main() -> None:
+def main(fuente: FuentePrecios | None = None) -> None:
     """Punto de entrada principal."""
     ruta_proyecto_raiz = Path(__file__).resolve().parent.parent.parent.parent
     directorio_base = ruta_proyecto_raiz / ".cache" / "cargados"
@@ -49,8 +198,20 @@ def main() -> None:
 
     sectores = obtener_configuracion_sectores()
 
-    for sector, tickers in sectores.items():
-        descargar_datos_sector(sector, tickers, directorio_base)
+    inicio = time.perf_counter()
+    precios, errores = descargar_sectores(sectores, fuente)
+    for sector, df_productos in precios.items():
+        archivo_csv = guardar_precios_sector(sector, df_productos, directorio_base)
+        print(f"✓ Descarga de {sector} completada.")
+        print(f"  Archivo: {archivo_csv}")
+        print(f"  Dimensiones: {df_productos.shape}")
+    print(
+        f"\n{len(precios)} de {len(sectores)} sectores descargados "
+        f"({len(errores)} incompletos) en {time.perf_counter() - inicio:.2f} s."
+    )
+
+    if errores:
+        raise RuntimeError("; ".join(errores.values()))
 
 
 if __name__ == "__main__":
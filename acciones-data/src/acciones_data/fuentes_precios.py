@@ -0,0 +1,185 @@
+"""Fuentes intercambiables de precios de cierre.
+
+Todas las fuentes devuelven el mismo formato que ``yf.download(...)["Close"]``:
+un DataFrame ancho con índice de fechas (``Date``) y una columna por ticker.
+
+- ``FuenteYFinance``: Yahoo Finance (requiere red).
+- ``FuenteArchivoLocal``: un CSV por ticker en un directorio; sirve para
+  repetir descargas sin red o congelar datos de pruebas.
+- ``FuenteSintetica``: precios deterministas (paseo aleatorio geométrico
+  sembrado por ticker), con latencia y fallos simulados opcionales para
+  probar la concurrencia y los reintentos con miles de tickers.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+import random
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+_PERIODO = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def desplazamiento_periodo(periodo: str) -> pd.DateOffset:
+    """
+    Convierte un periodo de yfinance ('5y', '6mo', '2wk', '30d') a un desplazamiento.
+
+    Args:
+        periodo: Periodo con el formato de yfinance.
+
+    Returns:
+        DateOffset equivalente.
+    """
+    coincidencia = _PERIODO.match(periodo)
+    if coincidencia is None:
+        raise ValueError(
+            f"Periodo no soportado: '{periodo}' (usa p. ej. 5y, 6mo, 30d)."
+        )
+    cantidad, unidad = int(coincidencia[1]), coincidencia[2]
+    argumentos = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+    return pd.DateOffset(**{argumentos[unidad]: cantidad})
+
+
+def _recortar_periodo(precios: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    if precios.empty:
+        return precios
+    inicio = precios.index.max() - desplazamiento_periodo(periodo)
+    return precios[precios.index > inicio]
+
+
+class FuentePrecios(ABC):
+    """Interfaz común de las fuentes de precios."""
+
+    @abstractmethod
+    def obtener_cierres(
+        self, tickers: list[str], periodo: str = "5y", timeout: float = 30.0
+    ) -> pd.DataFrame:
+        """
+        Obtiene los precios de cierre de un lote de tickers.
+
+        Args:
+            tickers: Símbolos a consultar.
+            periodo: Ventana hacia atrás, con el formato de yfinance.
+            timeout: Segundos máximos de la solicitud.
+
+        Returns:
+            DataFrame ancho (fechas x tickers). Un ticker sin datos no aparece
+            como columna.
+        """
+
+
+class FuenteYFinance(FuentePrecios):
+    """Yahoo Finance mediante ``yf.download``."""
+
+    def obtener_cierres(
+        self, tickers: list[str], periodo: str = "5y", timeout: float = 30.0
+    ) -> pd.DataFrame:
+        # Importación diferida: las fuentes locales no necesitan yfinance ni red.
+        import yfinance as yf
+
+        # Sin hilos internos: la concurrencia la controla el pool del llamador.
+        posible_df = yf.download(
+            tickers,
+            period=periodo,
+            timeout=timeout,
+            threads=False,
+            progress=False,
+        )
+        if posible_df is None or posible_df.empty:
+            return pd.DataFrame()
+        return posible_df["Close"].dropna(axis=1, how="all")
+
+
+class FuenteArchivoLocal(FuentePrecios):
+    """
+    Un CSV por ticker (``<TICKER>.csv`` con columnas ``Date`` y ``Close``).
+
+    Args:
+        directorio: Directorio con los archivos.
+    """
+
+    def __init__(self, directorio: Path) -> None:
+        self.directorio = Path(directorio)
+
+    def obtener_cierres(
+        self, tickers: list[str], periodo: str = "5y", timeout: float = 30.0
+    ) -> pd.DataFrame:
+        series = {}
+        for ticker in tickers:
+            ruta = self.directorio / f"{ticker}.csv"
+            if ruta.exists():
+                series[ticker] = pd.read_csv(ruta, index_col="Date", parse_dates=True)[
+                    "Close"
+                ]
+        if not series:
+            return pd.DataFrame()
+        return _recortar_periodo(pd.DataFrame(series).rename_axis("Date"), periodo)
+
+    def guardar(self, precios: pd.DataFrame) -> None:
+        """
+        Guarda cada columna de un DataFrame ancho como ``<TICKER>.csv``.
+
+        Args:
+            precios: DataFrame con el formato de ``obtener_cierres``.
+        """
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        for ticker in precios.columns:
+            serie = precios[ticker].dropna().rename("Close").rename_axis("Date")
+            temporal = self.directorio / f"{ticker}.csv.tmp"
+            serie.to_csv(temporal)
+            temporal.replace(self.directorio / f"{ticker}.csv")
+
+
+class FuenteSintetica(FuentePrecios):
+    """
+    Precios deterministas en días hábiles: mismo ticker y semilla, misma serie.
+
+    Args:
+        fecha_fin: Última fecha de las series.
+        semilla: Semilla global; cada ticker deriva la suya de su símbolo.
+        latencia: Segundos de espera simulada por solicitud.
+        tasa_fallos: Probabilidad de que una solicitud falle (``ConnectionError``).
+    """
+
+    def __init__(
+        self,
+        fecha_fin: str = "2025-01-01",
+        semilla: int = 0,
+        latencia: float = 0.0,
+        tasa_fallos: float = 0.0,
+    ) -> None:
+        self.fecha_fin = pd.Timestamp(fecha_fin)
+        self.semilla = semilla
+        self.latencia = latencia
+        self.tasa_fallos = tasa_fallos
+        self._azar = random.Random(semilla)
+        self._candado = threading.Lock()
+
+    def _serie(self, ticker: str, fechas: pd.DatetimeIndex) -> np.ndarray:
+        rng = np.random.default_rng([self.semilla, zlib.crc32(ticker.encode())])
+        precio_inicial = rng.uniform(10, 500)
+        retornos = rng.normal(0.0003, 0.02, len(fechas))
+        return np.round(precio_inicial * np.exp(np.cumsum(retornos)), 4)
+
+    def obtener_cierres(
+        self, tickers: list[str], periodo: str = "5y", timeout: float = 30.0
+    ) -> pd.DataFrame:
+        if self.latencia > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"La solicitud superó {timeout} s.")
+        time.sleep(self.latencia)
+        with self._candado:
+            falla = self._azar.random() < self.tasa_fallos
+        if falla:
+            raise ConnectionError("Fallo simulado de la fuente sintética.")
+
+        inicio = self.fecha_fin - desplazamiento_periodo(periodo)
+        fechas = pd.bdate_range(inicio, self.fecha_fin, name="Date")
+        return pd.DataFrame(
+            {ticker: self._serie(ticker, fechas) for ticker in tickers}, index=fechas
+        )
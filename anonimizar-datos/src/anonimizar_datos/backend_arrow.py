@@ -0,0 +1,137 @@
+"""Backend opcional que trabaja sobre arreglos de texto de ``pyarrow`` de extremo a extremo.
+
+Los nulos viajan en el bitmap de validez de Arrow y nunca se crean objetos de
+Python por fila: el hashing y la tokenización solo recorren los valores únicos
+del diccionario (``dictionary_encode``) y el enmascarado usa únicamente kernels
+de ``pyarrow.compute``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .hasheo import Hasheador
+from .transformaciones import LONGITUD_TOKEN, _asignar_tokens, _validar_mascara
+
+
+def _como_arreglo(arreglo: pa.Array | pa.ChunkedArray) -> pa.Array:
+    if isinstance(arreglo, pa.ChunkedArray):
+        return arreglo.combine_chunks()
+    return arreglo
+
+
+def hashear_arrow(
+    arreglo: pa.Array | pa.ChunkedArray,
+    *,
+    sal: str | None = None,
+    clave: str | None = None,
+) -> pa.Array:
+    """Hashea cada valor único del diccionario y lo expande con un ``take``."""
+
+    codificado = pc.dictionary_encode(_como_arreglo(arreglo))
+    unicos = codificado.dictionary.to_pylist()
+    hashes = Hasheador(sal=sal, clave=clave, capacidad_cache=0).hash_lote(unicos)
+    diccionario = pa.array(hashes, type=codificado.dictionary.type)
+    return pc.take(diccionario, codificado.indices)
+
+
+def enmascarar_arrow(
+    arreglo: pa.Array | pa.ChunkedArray,
+    *,
+    visible: int = 4,
+    caracter: str = "*",
+) -> pa.Array:
+    """Enmascara con kernels de longitud, recorte, repetición y concatenación."""
+
+    _validar_mascara(visible, caracter)
+
+    arreglo = _como_arreglo(arreglo)
+    longitudes = pc.utf8_length(arreglo)
+    if visible:
+        visibles = pc.utf8_slice_codeunits(arreglo, start=-visible)
+        ocultos = pc.max_element_wise(pc.subtract(longitudes, visible), 0)
+    else:
+        visibles = pc.utf8_slice_codeunits(arreglo, start=0, stop=0)
+        ocultos = longitudes
+    relleno = pc.binary_repeat(pa.scalar(caracter, type=arreglo.type), ocultos)
+    # binary_join_element_wise propaga los nulos de ``visibles`` (bitmap original).
+    return pc.binary_join_element_wise(
+        relleno, visibles, pa.scalar("", type=arreglo.type)
+    )
+
+
+def tokenizar_arrow(
+    arreglo: pa.Array | pa.ChunkedArray,
+    *,
+    prefijo: str = "token",
+    vocabulario: Dict[str, str] | None = None,
+    clave: str | None = None,
+    longitud: int = LONGITUD_TOKEN,
+) -> Tuple[pa.DictionaryArray, Dict[str, str]]:
+    """Devuelve un ``DictionaryArray`` cuyos valores son los tokens.
+
+    ``vocabulario`` se amplía en sitio con las entradas nuevas, que también se
+    devuelven; las reglas de numeración y de tokens deterministas son las mismas
+    que en ``tokenizar_serie``.
+    """
+
+    vocabulario = {} if vocabulario is None else vocabulario
+    codificado = pc.dictionary_encode(_como_arreglo(arreglo))
+    tokens, nuevos = _asignar_tokens(
+        codificado.dictionary.to_pylist(), prefijo, vocabulario, clave, longitud
+    )
+    diccionario = pa.array(tokens, type=pa.string())
+    return pa.DictionaryArray.from_arrays(codificado.indices, diccionario), nuevos
+
+
+def _arreglo_de(serie: pd.Series) -> pa.Array:
+    return _como_arreglo(pa.array(serie.array))
+
+
+def _serie_desde(arreglo: pa.Array, modelo: pd.Series) -> pd.Series:
+    """Envuelve el resultado en el mismo dtype Arrow que la serie original."""
+
+    datos = modelo.dtype.__from_arrow__(arreglo)
+    return pd.Series(datos, index=modelo.index, name=modelo.name)
+
+
+def _hashear_serie_arrow(
+    serie: pd.Series, *, sal: str | None, clave: str | None
+) -> pd.Series:
+    return _serie_desde(hashear_arrow(_arreglo_de(serie), sal=sal, clave=clave), serie)
+
+
+def _enmascarar_serie_arrow(
+    serie: pd.Series, *, visible: int, caracter: str
+) -> pd.Series:
+    enmascarado = enmascarar_arrow(
+        _arreglo_de(serie), visible=visible, caracter=caracter
+    )
+    return _serie_desde(enmascarado, serie)
+
+
+def _tokenizar_serie_arrow(
+    serie: pd.Series,
+    prefijo: str,
+    vocabulario: Dict[str, str],
+    clave: str | None,
+    longitud: int,
+) -> tuple[pd.Series, Dict[str, str]]:
+    tokens, nuevos = tokenizar_arrow(
+        _arreglo_de(serie),
+        prefijo=prefijo,
+        vocabulario=vocabulario,
+        clave=clave,
+        longitud=longitud,
+    )
+    codigos = pc.fill_null(tokens.indices, -1).to_numpy()
+    categorias = pd.Index(pd.StringDtype("pyarrow").__from_arrow__(tokens.dictionary))
+    categorica = pd.Categorical.from_codes(codigos, categories=categorias)
+    return pd.Series(categorica, index=serie.index, name=serie.name), nuevos
+
+
+__all__ = ["enmascarar_arrow", "hashear_arrow", "tokenizar_arrow"]
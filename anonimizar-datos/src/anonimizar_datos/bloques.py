@@ -0,0 +1,107 @@
+"""Anonimización por bloques para archivos CSV/Parquet más grandes que la memoria.
+
+La lectura y escritura por bloques son las de ``ml_pipeline_e2e_practica.bloques``
+(se reexportan aquí); este módulo solo añade la política por bloque.
+"""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping
+
+from ml_pipeline_e2e_practica.bloques import (
+    EXTENSIONES_PARQUET,
+    FILAS_POR_BLOQUE,
+    EscritorBloques,
+    leer_en_bloques,
+)
+
+from .politica import (
+    ModoParalelo,
+    PoliticaAnonimizacion,
+    _copiar_vocabularios,
+    _crear_pool,
+    _ejecutar_politica,
+    _validar_paralelo,
+)
+
+
+@dataclass(frozen=True)
+class ResultadoBloques:
+    destino: Path
+    filas: int
+    bloques: int
+    diccionarios: Dict[str, Dict[str, str]]
+    tiempos: Dict[str, float]
+
+
+def anonimizar_archivo(
+    origen: str | Path,
+    destino: str | Path,
+    politica: PoliticaAnonimizacion,
+    *,
+    vocabularios: Mapping[str, Mapping[str, str]] | None = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    paralelo: ModoParalelo | None = None,
+) -> ResultadoBloques:
+    """Lee ``origen`` por bloques, les aplica ``politica`` y los escribe en ``destino``.
+
+    La memoria pico depende de ``filas_por_bloque`` (más el vocabulario de
+    tokens), no del tamaño del archivo. Cada bloque se transforma en sitio y
+    los vocabularios se comparten entre bloques para que un mismo valor reciba
+    siempre el mismo token. ``tiempos`` acumula los segundos por columna. Con
+    ``paralelo`` se crea un solo pool para todo el archivo, no uno por bloque.
+    """
+
+    diccionarios = _copiar_vocabularios(vocabularios)
+    _validar_paralelo(politica, diccionarios, paralelo)
+    tiempos: Dict[str, float] = dict.fromkeys(politica.reglas, 0.0)
+
+    filas = 0
+    bloques = 0
+    paralelizar = paralelo is not None and len(politica.reglas) > 1
+    # Los CSV se leen como texto (sin deducir tipos por bloque) y hash, máscara y
+    # token devuelven texto: el esquema de salida es estable entre bloques.
+    with (
+        _crear_pool(paralelo, None) if paralelizar else nullcontext() as pool,
+        EscritorBloques(destino, columnas_texto=politica.reglas) as escritor,
+    ):
+        for bloque in leer_en_bloques(origen, filas_por_bloque=filas_por_bloque):
+            # El bloque ya es propio: no hace falta copiarlo y el vocabulario crece en sitio.
+            resultado = _ejecutar_politica(
+                bloque,
+                politica,
+                diccionarios,
+                paralelo=paralelo,
+                copiar=False,
+                pool=pool,
+            )
+            for columna, segundos in resultado.tiempos.items():
+                tiempos[columna] += segundos
+
+            escritor.escribir(resultado.dataframe)
+            filas += len(bloque)
+            bloques += 1
+
+    return ResultadoBloques(
+        destino=Path(destino),
+        filas=filas,
+        bloques=bloques,
+        diccionarios={
+            columna: diccionarios.get(columna, {})
+            for columna in politica.columnas_token
+        },
+        tiempos=tiempos,
+    )
+
+
+__all__ = [
+    "EXTENSIONES_PARQUET",
+    "EscritorBloques",
+    "FILAS_POR_BLOQUE",
+    "ResultadoBloques",
+    "anonimizar_archivo",
+    "leer_en_bloques",
+]
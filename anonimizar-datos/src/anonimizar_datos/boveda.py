@@ -0,0 +1,213 @@
+"""Bóveda de tokens indexada en SQLite para auditorías de tokenización."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, Iterator, Mapping, MutableMapping
+
+# SQLite limita el número de parámetros por consulta; las búsquedas se trocean.
+MAX_PARAMETROS = 900
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    columna TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    token TEXT NOT NULL,
+    PRIMARY KEY (columna, valor)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tokens_inverso ON tokens (columna, token);
+"""
+
+
+class BovedaTokens:
+    """Equivalencias valor ↔ token persistidas en disco con índices en ambos sentidos.
+
+    Abrir la bóveda no carga los datos: cada búsqueda (directa o inversa) usa un
+    índice B-tree, de modo que cuesta O(log n). ``agregar`` inserta en bloque y
+    nunca sobrescribe equivalencias existentes.
+    """
+
+    def __init__(self, ruta: str | Path) -> None:
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        # Los vocabularios pueden consultarse desde los hilos de ``aplicar_politica``.
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.executescript(_ESQUEMA)
+
+    def agregar(self, columna: str, equivalencias: Mapping[str, str]) -> int:
+        """Añade equivalencias nuevas y devuelve cuántas se insertaron.
+
+        Un valor ya registrado se ignora; reutilizar un token para otro valor
+        de la misma columna lanza ``ValueError``.
+        """
+
+        filas = ((columna, valor, token) for valor, token in equivalencias.items())
+        try:
+            with self._conexion:
+                cursor = self._conexion.executemany(
+                    "INSERT INTO tokens (columna, valor, token) VALUES (?, ?, ?) "
+                    "ON CONFLICT (columna, valor) DO NOTHING",
+                    filas,
+                )
+        except sqlite3.IntegrityError as error:
+            raise ValueError(
+                f"Hay tokens de '{columna}' ya asignados a otros valores."
+            ) from error
+        return cursor.rowcount
+
+    def agregar_diccionarios(
+        self, diccionarios: Mapping[str, Mapping[str, str]]
+    ) -> int:
+        return sum(
+            self.agregar(columna, equivalencias)
+            for columna, equivalencias in diccionarios.items()
+        )
+
+    def token(self, columna: str, valor: str) -> str | None:
+        fila = self._conexion.execute(
+            "SELECT token FROM tokens WHERE columna = ? AND valor = ?", (columna, valor)
+        ).fetchone()
+        return None if fila is None else fila[0]
+
+    def valor(self, columna: str, token: str) -> str | None:
+        """Revierte un token concreto sin cargar el resto de la bóveda."""
+
+        fila = self._conexion.execute(
+            "SELECT valor FROM tokens WHERE columna = ? AND token = ?", (columna, token)
+        ).fetchone()
+        return None if fila is None else fila[0]
+
+    def _buscar(
+        self, campo: str, columna: str, claves: Iterable[str]
+    ) -> Dict[str, str]:
+        destino = "token" if campo == "valor" else "valor"
+        claves = list(dict.fromkeys(claves))
+        encontrados: Dict[str, str] = {}
+        for inicio in range(0, len(claves), MAX_PARAMETROS):
+            lote = claves[inicio : inicio + MAX_PARAMETROS]
+            marcadores = ", ".join("?" * len(lote))
+            encontrados.update(
+                self._conexion.execute(
+                    f"SELECT {campo}, {destino} FROM tokens "
+                    f"WHERE columna = ? AND {campo} IN ({marcadores})",
+                    (columna, *lote),
+                )
+            )
+        return encontrados
+
+    def tokens(self, columna: str, valores: Iterable[str]) -> Dict[str, str]:
+        """Búsqueda directa por lotes: ``{valor: token}`` para los valores registrados."""
+
+        return self._buscar("valor", columna, valores)
+
+    def valores(self, columna: str, tokens: Iterable[str]) -> Dict[str, str]:
+        """Búsqueda inversa por lotes: ``{token: valor}`` para los tokens registrados."""
+
+        return self._buscar("token", columna, tokens)
+
+    def contar(self, columna: str) -> int:
+        (total,) = self._conexion.execute(
+            "SELECT COUNT(*) FROM tokens WHERE columna = ?", (columna,)
+        ).fetchone()
+        return total
+
+    def equivalencias(self, columna: str) -> Iterator[tuple[str, str]]:
+        """Recorre los pares ``(valor, token)`` de una columna sin cargarlos todos."""
+
+        yield from self._conexion.execute(
+            "SELECT valor, token FROM tokens WHERE columna = ?", (columna,)
+        )
+
+    def vocabulario(self, columna: str) -> Dict[str, str]:
+        """Carga todas las equivalencias de una columna en un diccionario."""
+
+        return dict(self.equivalencias(columna))
+
+    def importar_json(self, ruta: str | Path) -> int:
+        """Migra un volcado JSON ``{columna: {valor: token}}`` a la bóveda."""
+
+        with Path(ruta).open(encoding="utf-8") as archivo:
+            return self.agregar_diccionarios(json.load(archivo))
+
+    def cerrar(self) -> None:
+        self._conexion.close()
+
+    def __enter__(self) -> BovedaTokens:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.cerrar()
+
+
+class VocabularioBoveda(MutableMapping[str, str]):
+    """Vocabulario de una columna que consulta la bóveda en lugar de cargarla.
+
+    Sirve como ``vocabularios[columna]`` de ``aplicar_politica`` o
+    ``anonimizar_archivo``: antes de tokenizar cada lote se llama a
+    ``precargar`` con sus valores distintos, que se buscan con una consulta
+    ``IN (...)`` por el índice. Las equivalencias nuevas se acumulan en
+    ``nuevos`` hasta ``guardar``, que inserta solo esas. ``len`` cuenta las
+    registradas más las nuevas para que la numeración secuencial continúe.
+    No se puede enviar a otro proceso (la conexión no es serializable).
+    """
+
+    def __init__(self, boveda: BovedaTokens, columna: str) -> None:
+        self.boveda = boveda
+        self.columna = columna
+        self.nuevos: Dict[str, str] = {}
+        self._tokens_nuevos: set[str] = set()
+        self._registrados = boveda.contar(columna)
+        self._lote: Dict[str, str] = {}
+        self._consultados: set[str] = set()
+
+    def precargar(self, valores: Iterable[str]) -> None:
+        """Busca en bloque los valores de un lote; reemplaza al lote anterior."""
+
+        self._consultados = {valor for valor in valores if valor not in self.nuevos}
+        self._lote = self.boveda.tokens(self.columna, self._consultados)
+
+    def __getitem__(self, valor: str) -> str:
+        token = self.nuevos.get(valor) or self._lote.get(valor)
+        if token is None and valor not in self._consultados:
+            token = self.boveda.token(self.columna, valor)
+        if token is None:
+            raise KeyError(valor)
+        return token
+
+    def tokens_usados(self, tokens: Iterable[str]) -> set[str]:
+        """Los ``tokens`` ya asignados a algún valor (búsqueda inversa por lotes)."""
+
+        tokens = set(tokens)
+        usados = tokens & self._tokens_nuevos
+        return usados | set(self.boveda.valores(self.columna, tokens - usados))
+
+    def __setitem__(self, valor: str, token: str) -> None:
+        self.nuevos[valor] = token
+        self._tokens_nuevos.add(token)
+
+    def __delitem__(self, valor: str) -> None:
+        raise TypeError("La bóveda no permite borrar equivalencias.")
+
+    def __iter__(self) -> Iterator[str]:
+        for valor, _ in self.boveda.equivalencias(self.columna):
+            if valor not in self.nuevos:
+                yield valor
+        yield from self.nuevos
+
+    def __len__(self) -> int:
+        return self._registrados + len(self.nuevos)
+
+    def guardar(self) -> int:
+        """Inserta las equivalencias nuevas en la bóveda y devuelve cuántas fueron."""
+
+        insertadas = self.boveda.agregar(self.columna, self.nuevos)
+        self._registrados += insertadas
+        self.nuevos = {}
+        self._tokens_nuevos = set()
+        return insertadas
+
+
+__all__ = ["BovedaTokens", "VocabularioBoveda"]
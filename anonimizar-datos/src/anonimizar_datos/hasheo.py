@@ -0,0 +1,136 @@
+"""Primitiva de hashing con estado precalculado, caché LRU y API por lotes."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import hmac
+import threading
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+CAPACIDAD_CACHE = 100_000
+
+
+@dataclass(frozen=True)
+class EstadisticasCache:
+    aciertos: int
+    fallos: int
+    tamano: int
+    capacidad: int
+
+
+class Hasheador:
+    """Calcula SHA-256 reutilizando el estado inicial en lugar de reconstruirlo.
+
+    - Con ``clave`` usa HMAC-SHA256: el estado con la clave ya procesada se
+      precalcula una vez y cada valor parte de una ``copy()``.
+    - Con ``sal`` reproduce el esquema de ``hash_string`` (``sha256(f"{sal}:{valor}")``)
+      precalculando el prefijo ``"{sal}:"``.
+    - Sin ninguno de los dos es un SHA-256 simple.
+
+    Los resultados se memorizan en una caché LRU acotada a ``capacidad_cache``
+    entradas (``0`` la desactiva); ``estadisticas()`` expone aciertos y fallos.
+    La caché está protegida por un candado, así que un mismo ``Hasheador`` se
+    puede compartir entre hilos. Los nulos se devuelven sin cambios.
+    """
+
+    def __init__(
+        self,
+        *,
+        clave: str | bytes | None = None,
+        sal: str | None = None,
+        capacidad_cache: int = CAPACIDAD_CACHE,
+    ) -> None:
+        if clave is not None and sal:
+            raise ValueError("Usa 'clave' (HMAC) o 'sal', no ambos.")
+        if capacidad_cache < 0:
+            raise ValueError("capacidad_cache debe ser mayor o igual a cero.")
+
+        if clave is not None:
+            clave_bytes = clave.encode("utf-8") if isinstance(clave, str) else clave
+            self._base: Any = hmac.new(clave_bytes, digestmod=hashlib.sha256)
+        else:
+            self._base = hashlib.sha256(f"{sal}:".encode("utf-8") if sal else b"")
+
+        self.capacidad_cache = capacidad_cache
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._candado = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+
+    def _digest(self, texto: str) -> str:
+        estado = self._base.copy()
+        estado.update(texto.encode("utf-8"))
+        return estado.hexdigest()
+
+    def _hash_texto(self, texto: str) -> str:
+        if not self.capacidad_cache:
+            return self._digest(texto)
+
+        cache = self._cache
+        with self._candado:
+            resultado = cache.get(texto)
+            if resultado is not None:
+                self._aciertos += 1
+                cache.move_to_end(texto)
+                return resultado
+            self._fallos += 1
+
+        # El digest se calcula fuera del candado para no serializar a los hilos.
+        resultado = self._digest(texto)
+        with self._candado:
+            cache[texto] = resultado
+            if len(cache) > self.capacidad_cache:
+                cache.popitem(last=False)
+        return resultado
+
+    def hash(self, valor: Any) -> Any:
+        try:
+            if pd.isna(valor):
+                return valor
+        except (TypeError, ValueError):
+            pass
+        return self._hash_texto(str(valor))
+
+    def hash_lote(self, valores: Iterable[Any]) -> np.ndarray:
+        """Hashea un arreglo de valores y devuelve un ``ndarray`` de objetos."""
+
+        arreglo = np.asarray(valores, dtype=object)
+        resultado = arreglo.copy()
+        validos = ~pd.isna(arreglo)
+        if self.capacidad_cache:
+            hash_texto = self._hash_texto
+            resultado[validos] = [hash_texto(str(v)) for v in arreglo[validos]]
+        else:
+            # Sin caché: bucle compacto con el estado base y métodos en variables locales.
+            copiar = self._base.copy
+            hashes = []
+            agregar = hashes.append
+            for valor in arreglo[validos]:
+                estado = copiar()
+                estado.update(str(valor).encode("utf-8"))
+                agregar(estado.hexdigest())
+            resultado[validos] = hashes
+        return resultado
+
+    def estadisticas(self) -> EstadisticasCache:
+        with self._candado:
+            return EstadisticasCache(
+                aciertos=self._aciertos,
+                fallos=self._fallos,
+                tamano=len(self._cache),
+                capacidad=self.capacidad_cache,
+            )
+
+    def limpiar_cache(self) -> None:
+        with self._candado:
+            self._cache.clear()
+            self._aciertos = 0
+            self._fallos = 0
+
+
+__all__ = ["CAPACIDAD_CACHE", "EstadisticasCache", "Hasheador"]
@@ -0,0 +1,250 @@
+"""Políticas declarativas de anonimización ejecutadas con una sola copia del DataFrame."""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import time
+from typing import Dict, Literal, Mapping
+
+import pandas as pd
+
+from .boveda import VocabularioBoveda
+from .transformaciones import (
+    LONGITUD_TOKEN,
+    _copiar_vocabulario,
+    _tokenizar_sobre,
+    _validar_mascara,
+    enmascarar_serie,
+    hashear_serie,
+)
+
+ModoParalelo = Literal["hilos", "procesos"]
+
+
+@dataclass(frozen=True)
+class ReglaHash:
+    """Hash irreversible: SHA-256 con ``sal`` o HMAC-SHA256 con ``clave``."""
+
+    sal: str | None = None
+    clave: str | None = None
+
+
+@dataclass(frozen=True)
+class ReglaMascara:
+    visible: int = 4
+    caracter: str = "*"
+
+    def __post_init__(self) -> None:
+        _validar_mascara(self.visible, self.caracter)
+
+
+@dataclass(frozen=True)
+class ReglaToken:
+    """Tokenización reversible; con ``clave`` los tokens no dependen del orden."""
+
+    prefijo: str = "token"
+    clave: str | None = None
+    longitud: int = LONGITUD_TOKEN
+
+
+Regla = ReglaHash | ReglaMascara | ReglaToken
+
+
+@dataclass(frozen=True)
+class PoliticaAnonimizacion:
+    """Asocia cada columna sensible con la regla que debe aplicársele."""
+
+    reglas: Mapping[str, Regla]
+
+    def __post_init__(self) -> None:
+        for columna, regla in self.reglas.items():
+            if not isinstance(regla, (ReglaHash, ReglaMascara, ReglaToken)):
+                raise TypeError(
+                    f"La regla de '{columna}' debe ser ReglaHash, ReglaMascara o ReglaToken."
+                )
+
+    @property
+    def columnas_token(self) -> list[str]:
+        return [c for c, regla in self.reglas.items() if isinstance(regla, ReglaToken)]
+
+
+@dataclass(frozen=True)
+class ResultadoPolitica:
+    dataframe: pd.DataFrame
+    diccionarios: Dict[str, Dict[str, str]]
+    nuevos: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    tiempos: Dict[str, float] = field(default_factory=dict)
+
+
+def _transformar_columna(
+    serie: pd.Series,
+    regla: Regla,
+    vocabulario: Dict[str, str] | None,
+) -> tuple[pd.Series, Dict[str, str] | None, Dict[str, str] | None, float]:
+    """Aplica una regla a una columna y mide cuánto tarda (ejecutable en otro proceso)."""
+
+    inicio = time.perf_counter()
+    nuevos = None
+    if isinstance(regla, ReglaHash):
+        resultado = hashear_serie(serie, sal=regla.sal, clave=regla.clave)
+    elif isinstance(regla, ReglaMascara):
+        resultado = enmascarar_serie(
+            serie, visible=regla.visible, caracter=regla.caracter
+        )
+    else:
+        vocabulario = {} if vocabulario is None else vocabulario
+        resultado, nuevos = _tokenizar_sobre(
+            serie,
+            regla.prefijo,
+            vocabulario,
+            clave=regla.clave,
+            longitud=regla.longitud,
+        )
+    return resultado, vocabulario, nuevos, time.perf_counter() - inicio
+
+
+def _crear_pool(paralelo: ModoParalelo, max_workers: int | None) -> Executor:
+    if paralelo == "hilos":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if paralelo == "procesos":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError("paralelo debe ser None, 'hilos' o 'procesos'.")
+
+
+def _copiar_vocabularios(
+    vocabularios: Mapping[str, Mapping[str, str]] | None,
+) -> Dict[str, Dict[str, str]]:
+    """Copia los vocabularios en memoria; los de la bóveda se amplían en sitio."""
+
+    return {
+        columna: _copiar_vocabulario(vocabulario)
+        for columna, vocabulario in (vocabularios or {}).items()
+    }
+
+
+def _validar_paralelo(
+    politica: PoliticaAnonimizacion,
+    vocabularios: Mapping[str, Mapping[str, str]],
+    paralelo: ModoParalelo | None,
+) -> None:
+    """Rechaza antes de crear el pool lo que los procesos no pueden recibir."""
+
+    if paralelo != "procesos":
+        return
+    for columna in politica.columnas_token:
+        if isinstance(vocabularios.get(columna), VocabularioBoveda):
+            raise ValueError(
+                f"El vocabulario de '{columna}' es un VocabularioBoveda (conexión "
+                "SQLite) y no puede enviarse a otros procesos: usa "
+                "paralelo='hilos' o paralelo=None."
+            )
+
+
+def _repartir(pool: Executor, tareas: Mapping[str, tuple]) -> Dict[str, tuple]:
+    futuros = {
+        columna: pool.submit(_transformar_columna, *args)
+        for columna, args in tareas.items()
+    }
+    return {columna: futuro.result() for columna, futuro in futuros.items()}
+
+
+def _ejecutar_politica(
+    df: pd.DataFrame,
+    politica: PoliticaAnonimizacion,
+    vocabularios: Dict[str, Dict[str, str]],
+    *,
+    paralelo: ModoParalelo | None = None,
+    max_workers: int | None = None,
+    copiar: bool = True,
+    pool: Executor | None = None,
+) -> ResultadoPolitica:
+    """Núcleo del ejecutor: amplía ``vocabularios`` en sitio.
+
+    ``pool`` reutiliza un ejecutor ya creado (p. ej. uno por archivo en
+    ``anonimizar_archivo``); sin él se crea y se cierra uno por llamada.
+    """
+
+    faltantes = [columna for columna in politica.reglas if columna not in df.columns]
+    if faltantes:
+        raise KeyError(f"Columnas ausentes en el DataFrame: {', '.join(faltantes)}.")
+
+    tareas = {
+        columna: (
+            df[columna],
+            regla,
+            (
+                vocabularios.setdefault(columna, {})
+                if isinstance(regla, ReglaToken)
+                else None
+            ),
+        )
+        for columna, regla in politica.reglas.items()
+    }
+
+    if paralelo is None or len(tareas) <= 1:
+        salidas = {
+            columna: _transformar_columna(*args) for columna, args in tareas.items()
+        }
+    elif pool is not None:
+        salidas = _repartir(pool, tareas)
+    else:
+        with _crear_pool(paralelo, max_workers) as propio:
+            salidas = _repartir(propio, tareas)
+
+    destino = df.copy() if copiar else df
+    nuevos: Dict[str, Dict[str, str]] = {}
+    tiempos: Dict[str, float] = {}
+    for columna, (serie, vocabulario, entradas_nuevas, segundos) in salidas.items():
+        destino[columna] = serie
+        tiempos[columna] = segundos
+        if vocabulario is not None:
+            # En modo procesos el vocabulario vuelve como copia: se reemplaza en sitio.
+            vocabularios[columna] = vocabulario
+            nuevos[columna] = entradas_nuevas or {}
+
+    diccionarios = {
+        columna: vocabularios[columna] for columna in politica.columnas_token
+    }
+    return ResultadoPolitica(
+        dataframe=destino, diccionarios=diccionarios, nuevos=nuevos, tiempos=tiempos
+    )
+
+
+def aplicar_politica(
+    df: pd.DataFrame,
+    politica: PoliticaAnonimizacion,
+    *,
+    vocabularios: Mapping[str, Mapping[str, str]] | None = None,
+    paralelo: ModoParalelo | None = None,
+    max_workers: int | None = None,
+) -> ResultadoPolitica:
+    """Aplica toda la política validando columnas una vez y copiando ``df`` una sola vez.
+
+    Cada columna se transforma de forma independiente; con ``paralelo="hilos"``
+    o ``paralelo="procesos"`` las columnas se reparten entre trabajadores. El
+    resultado incluye los segundos empleados por columna en ``tiempos``.
+    ``vocabularios`` se copian, salvo los ``VocabularioBoveda``, que se amplían
+    en sitio y no admiten ``paralelo="procesos"`` (``ValueError``).
+    """
+
+    vocabularios = _copiar_vocabularios(vocabularios)
+    _validar_paralelo(politica, vocabularios, paralelo)
+    return _ejecutar_politica(
+        df,
+        politica,
+        vocabularios,
+        paralelo=paralelo,
+        max_workers=max_workers,
+    )
+
+
+__all__ = [
+    "PoliticaAnonimizacion",
+    "Regla",
+    "ReglaHash",
+    "ReglaMascara",
+    "ReglaToken",
+    "ResultadoPolitica",
+    "aplicar_politica",
+]
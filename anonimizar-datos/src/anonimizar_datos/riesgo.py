@@ -0,0 +1,204 @@
+"""Análisis vectorizado de k-anonimato, l-diversidad y riesgo de re-identificación.
+
+Las clases de equivalencia se calculan sin bucles por grupo: cada
+cuasi-identificador se factoriza una sola vez y los códigos se combinan en una
+clave entera (compactándola cuando el producto de cardinalidades se acercaría
+al límite de ``int64``). Los tamaños salen de ``np.bincount`` y la diversidad,
+de contar pares únicos (clase, valor sensible).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .transformaciones import _asegurar_columnas
+
+_LIMITE_CLAVE = 2**62
+
+
+class RiesgoReidentificacionError(ValueError):
+    """Se lanza cuando el dataset anonimizado no alcanza el k o l exigido."""
+
+
+@dataclass(frozen=True)
+class ReporteRiesgo:
+    cuasi_identificadores: tuple[str, ...]
+    registros: int
+    clases: int
+    k: int
+    k_objetivo: int
+    registros_en_riesgo: int
+    riesgo_maximo: float
+    riesgo_promedio: float
+    grupos_violatorios: pd.DataFrame
+    sensible: str | None = None
+    l_diversidad: int | None = None
+    l_objetivo: int | None = None
+
+    @property
+    def cumple(self) -> bool:
+        cumple_l = self.l_diversidad is None or self.l_diversidad >= (
+            self.l_objetivo or 0
+        )
+        return self.k >= self.k_objetivo and cumple_l
+
+
+def _factorizar(
+    df: pd.DataFrame, columnas: Iterable[str]
+) -> Dict[str, tuple[np.ndarray, int]]:
+    """Códigos y cardinalidad por columna; los nulos cuentan como un valor más."""
+
+    codigos: Dict[str, tuple[np.ndarray, int]] = {}
+    for columna in columnas:
+        if columna not in df.columns:
+            raise KeyError(f"La columna '{columna}' no está presente en el DataFrame.")
+        valores, unicos = pd.factorize(df[columna], use_na_sentinel=False)
+        codigos[columna] = (valores.astype(np.int64, copy=False), max(len(unicos), 1))
+    return codigos
+
+
+def _combinar(
+    partes: Sequence[tuple[np.ndarray, int]], n: int
+) -> tuple[np.ndarray, int]:
+    """Combina códigos por columna en un identificador de clase compacto ``[0, clases)``."""
+
+    clave = np.zeros(n, dtype=np.int64)
+    cardinalidad = 1
+    for codigos, tamano in partes:
+        if cardinalidad * tamano >= _LIMITE_CLAVE:
+            clave, unicos = pd.factorize(clave)
+            cardinalidad = max(len(unicos), 1)
+        clave = clave * tamano + codigos
+        cardinalidad *= tamano
+    ids, unicos = pd.factorize(clave)
+    return ids, len(unicos)
+
+
+def _diversidad(
+    ids: np.ndarray, clases: int, sensibles: tuple[np.ndarray, int]
+) -> np.ndarray:
+    """Número de valores sensibles distintos por clase de equivalencia."""
+
+    codigos, tamano = sensibles
+    pares = pd.unique(ids.astype(np.int64) * tamano + codigos)
+    return np.bincount(pares // tamano, minlength=clases)
+
+
+def analizar_riesgo(
+    df: pd.DataFrame,
+    cuasi_identificadores: str | Iterable[str],
+    *,
+    k_objetivo: int = 5,
+    sensible: str | None = None,
+    l_objetivo: int = 2,
+) -> ReporteRiesgo:
+    """Calcula clases de equivalencia, k-anonimato y (con ``sensible``) l-diversidad.
+
+    ``riesgo_maximo`` es ``1/k`` y ``riesgo_promedio`` la probabilidad media de
+    re-identificar un registro (clases / registros). ``grupos_violatorios`` lista
+    una fila por clase con menos de ``k_objetivo`` registros o, si hay columna
+    sensible, con menos de ``l_objetivo`` valores distintos.
+    """
+
+    if k_objetivo < 1:
+        raise ValueError("k_objetivo debe ser mayor o igual a uno.")
+
+    columnas = _asegurar_columnas(cuasi_identificadores)
+    n = len(df)
+    codigos = _factorizar(df, columnas + ([sensible] if sensible else []))
+    ids, clases = _combinar([codigos[c] for c in columnas], n)
+
+    tamanos = np.bincount(ids, minlength=clases)
+    violacion = tamanos < k_objetivo
+    diversidades = None
+    if sensible:
+        diversidades = _diversidad(ids, clases, codigos[sensible])
+        violacion |= diversidades < l_objetivo
+
+    # Primera fila de cada clase para mostrar los valores de los cuasi-identificadores.
+    _, primeras = np.unique(ids, return_index=True)
+    clases_violatorias = np.flatnonzero(violacion)
+    grupos = df[columnas].iloc[primeras[clases_violatorias]].reset_index(drop=True)
+    grupos["tamano"] = tamanos[clases_violatorias]
+    if diversidades is not None:
+        grupos["diversidad"] = diversidades[clases_violatorias]
+    grupos = grupos.sort_values("tamano", kind="stable", ignore_index=True)
+
+    return ReporteRiesgo(
+        cuasi_identificadores=tuple(columnas),
+        registros=n,
+        clases=clases,
+        k=int(tamanos.min()) if n else 0,
+        k_objetivo=k_objetivo,
+        registros_en_riesgo=int(tamanos[tamanos < k_objetivo].sum()),
+        riesgo_maximo=1 / int(tamanos.min()) if n else 0.0,
+        riesgo_promedio=clases / n if n else 0.0,
+        grupos_violatorios=grupos,
+        sensible=sensible,
+        l_diversidad=(
+            int(diversidades.min()) if diversidades is not None and n else None
+        ),
+        l_objetivo=l_objetivo if sensible else None,
+    )
+
+
+def evaluar_combinaciones(
+    df: pd.DataFrame,
+    cuasi_identificadores: Iterable[str],
+    *,
+    k_objetivo: int = 5,
+    tamano_maximo: int | None = None,
+) -> pd.DataFrame:
+    """Calcula k y registros en riesgo para cada subconjunto de cuasi-identificadores.
+
+    Cada columna se factoriza una sola vez y se reutiliza en todas las
+    combinaciones, de modo que solo se itera sobre combinaciones, nunca sobre grupos.
+    """
+
+    columnas = list(cuasi_identificadores)
+    codigos = _factorizar(df, columnas)
+    tamano_maximo = tamano_maximo or len(columnas)
+    filas: List[Dict[str, object]] = []
+    for tamano in range(1, tamano_maximo + 1):
+        for combinacion in combinations(columnas, tamano):
+            ids, clases = _combinar([codigos[c] for c in combinacion], len(df))
+            tamanos = np.bincount(ids, minlength=clases)
+            filas.append(
+                {
+                    "cuasi_identificadores": combinacion,
+                    "clases": clases,
+                    "k": int(tamanos.min()) if len(df) else 0,
+                    "registros_en_riesgo": int(tamanos[tamanos < k_objetivo].sum()),
+                }
+            )
+    return pd.DataFrame(filas).sort_values(
+        ["k", "registros_en_riesgo"], ascending=[True, False], ignore_index=True
+    )
+
+
+def verificar_riesgo(reporte: ReporteRiesgo) -> ReporteRiesgo:
+    """Compuerta: devuelve el reporte si cumple o lanza ``RiesgoReidentificacionError``."""
+
+    if not reporte.cumple:
+        detalle = f"k={reporte.k} (objetivo {reporte.k_objetivo})"
+        if reporte.l_diversidad is not None:
+            detalle += f", l={reporte.l_diversidad} (objetivo {reporte.l_objetivo})"
+        raise RiesgoReidentificacionError(
+            f"Riesgo de re-identificación: {detalle}; "
+            f"{len(reporte.grupos_violatorios)} grupos violan la política."
+        )
+    return reporte
+
+
+__all__ = [
+    "ReporteRiesgo",
+    "RiesgoReidentificacionError",
+    "analizar_riesgo",
+    "evaluar_combinaciones",
+    "verificar_riesgo",
+]
@@ -0,0 +1,515 @@
+"""Transformaciones de hashing, enmascarado y tokenización sobre DataFrames."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .boveda import VocabularioBoveda
+from .hasheo import Hasheador
+
+# Por debajo de este número de valores únicos no compensa arrancar procesos.
+MIN_UNICOS_POR_PROCESO = 50_000
+# Caracteres hexadecimales del digest en los tokens deterministas (64 bits).
+LONGITUD_TOKEN = 16
+# Con menos de 64 bits las colisiones son casi seguras con millones de valores.
+LONGITUD_TOKEN_MINIMA = 16
+
+
+# ``hash_string`` comparte un ``Hasheador`` por sal en todo el proceso: la memoria
+# queda acotada a SALES_COMPARTIDAS * CAPACIDAD_CACHE_COMPARTIDA entradas.
+SALES_COMPARTIDAS = 8
+CAPACIDAD_CACHE_COMPARTIDA = 10_000
+
+
+@lru_cache(maxsize=SALES_COMPARTIDAS)
+def _hasheador_para(sal: str | None) -> Hasheador:
+    return Hasheador(sal=sal, capacidad_cache=CAPACIDAD_CACHE_COMPARTIDA)
+
+
+def hash_string(valor: Any, *, sal: str | None = None) -> Any:
+    """Convierte cualquier valor en un hash SHA-256 determinista.
+
+    Reutiliza un ``Hasheador`` por sal (seguro entre hilos), de modo que los
+    valores repetidos salen de su caché LRU en lugar de volver a hashearse.
+    """
+
+    return _hasheador_para(sal).hash(valor)
+
+
+def es_serie_arrow(serie: pd.Series) -> bool:
+    """Indica si la serie es texto respaldado por un arreglo de ``pyarrow``."""
+
+    dtype = serie.dtype
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage == "pyarrow"
+    if isinstance(dtype, pd.ArrowDtype):
+        import pyarrow as pa
+
+        tipo = dtype.pyarrow_dtype
+        return pa.types.is_string(tipo) or pa.types.is_large_string(tipo)
+    return False
+
+
+def _asegurar_columnas(columnas: str | Iterable[str]) -> List[str]:
+    return [columnas] if isinstance(columnas, str) else list(columnas)
+
+
+def _hashear_lote(
+    valores: Sequence[Any], sal: str | None, clave: str | None
+) -> np.ndarray:
+    """Hashea un lote de valores únicos; la caché no aporta nada y se desactiva."""
+
+    return Hasheador(sal=sal, clave=clave, capacidad_cache=0).hash_lote(valores)
+
+
+def _hashear_unicos(
+    unicos: np.ndarray,
+    sal: str | None,
+    clave: str | None,
+    procesos: int | None,
+) -> np.ndarray:
+    n_procesos = procesos or 1
+    if n_procesos > 1 and len(unicos) >= MIN_UNICOS_POR_PROCESO * 2:
+        n_lotes = min(n_procesos, len(unicos) // MIN_UNICOS_POR_PROCESO)
+        lotes = np.array_split(unicos, n_lotes)
+        with ProcessPoolExecutor(max_workers=n_lotes) as pool:
+            partes = list(pool.map(_hashear_lote, lotes, repeat(sal), repeat(clave)))
+        return np.concatenate(partes)
+    return _hashear_lote(unicos, sal, clave)
+
+
+# ``infer_dtype`` de columnas object cuyos valores son todos del mismo tipo: ahí
+# dos valores iguales para ``factorize`` también tienen el mismo ``str``.
+_TIPOS_HOMOGENEOS = frozenset(
+    {"string", "bytes", "integer", "floating", "boolean", "decimal", "empty"}
+)
+
+
+def _factorizar_por_texto(serie: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Factoriza de modo que cada código corresponda a un único ``str(valor)``.
+
+    En columnas object con tipos mezclados ``pd.factorize`` une ``1``, ``1.0`` y
+    ``True`` (son iguales en Python) aunque su texto difiera; en ese caso se
+    factoriza la forma textual. Las columnas homogéneas no pagan la conversión.
+    """
+
+    if serie.dtype != object or (
+        pd.api.types.infer_dtype(serie, skipna=True) in _TIPOS_HOMOGENEOS
+    ):
+        return pd.factorize(serie, use_na_sentinel=True)
+    textos = serie.astype(str).mask(serie.isna())
+    return pd.factorize(textos, use_na_sentinel=True)
+
+
+def hashear_serie(
+    serie: pd.Series,
+    *,
+    sal: str | None = None,
+    clave: str | None = None,
+    procesos: int | None = None,
+) -> pd.Series:
+    """Hashea solo los valores distintos de la serie y los reasigna por posición.
+
+    El coste crece con la cardinalidad y no con el número de filas: la serie se
+    factoriza, cada valor único se hashea una vez y el resultado se recupera con
+    un ``take`` vectorizado. Con ``procesos > 1`` los únicos se reparten entre
+    varios núcleos. Con ``clave`` se usa HMAC-SHA256 en lugar del hash con ``sal``.
+    Los nulos se conservan tal cual, igual que en ``hash_string``. Las series de
+    texto Arrow se procesan con ``backend_arrow`` y conservan su dtype.
+    """
+
+    if es_serie_arrow(serie):
+        from .backend_arrow import _hashear_serie_arrow
+
+        return _hashear_serie_arrow(serie, sal=sal, clave=clave)
+
+    codigos, unicos = _factorizar_por_texto(serie)
+    hashes = _hashear_unicos(np.asarray(unicos, dtype=object), sal, clave, procesos)
+
+    resultado = serie.to_numpy(dtype=object, copy=True)
+    validos = codigos >= 0
+    resultado[validos] = hashes.take(codigos[validos])
+    return pd.Series(resultado, index=serie.index, name=serie.name, dtype=object)
+
+
+def anonimizar_columnas_hash(
+    df: pd.DataFrame,
+    columnas: str | Iterable[str],
+    *,
+    sal: str | None = None,
+    clave: str | None = None,
+    inplace: bool = False,
+    procesos: int | None = None,
+) -> pd.DataFrame:
+    """Anonimiza columnas específicas usando hashing determinista.
+
+    Cada columna se procesa con ``hashear_serie``; ``procesos`` permite repartir
+    el hashing de los valores únicos entre varios núcleos y ``clave`` activa
+    HMAC-SHA256.
+    """
+
+    columnas_normalizadas = _asegurar_columnas(columnas)
+    destino = df if inplace else df.copy()
+
+    for columna in columnas_normalizadas:
+        if columna not in destino.columns:
+            raise KeyError(f"La columna '{columna}' no está presente en el DataFrame.")
+
+        destino[columna] = hashear_serie(
+            destino[columna], sal=sal, clave=clave, procesos=procesos
+        )
+
+    return destino
+
+
+def _dtype_texto() -> pd.StringDtype:
+    """Usa almacenamiento Arrow para los kernels de texto si ``pyarrow`` está disponible."""
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return pd.StringDtype("python")
+    return pd.StringDtype("pyarrow")
+
+
+def _como_texto(serie: pd.Series) -> pd.Series:
+    """``serie.map(str)`` conservando los nulos, con un ``str`` por valor distinto.
+
+    ``astype(string)`` no usa ``str``: ``2024-01-01`` quedaría sin hora y un
+    ``float32`` perdería dígitos. Los únicos se toman de la propia serie en su
+    primera aparición y se encajan como lo hace ``map``.
+    """
+
+    codigos, _ = _factorizar_por_texto(serie)
+    _, primeras = np.unique(codigos, return_index=True)
+    primeras = primeras[codigos[primeras] >= 0]
+    unicos = pd.array(
+        [str(valor) for valor in serie.iloc[primeras].astype(object)],
+        dtype=_dtype_texto(),
+    )
+    return pd.Series(
+        unicos.take(codigos, allow_fill=True), index=serie.index, name=serie.name
+    )
+
+
+def _validar_mascara(visible: int, caracter: str) -> None:
+    if visible < 0:
+        raise ValueError("El parámetro 'visible' debe ser mayor o igual a cero.")
+    if len(caracter) != 1:
+        raise ValueError("'caracter' debe contener exactamente un símbolo.")
+
+
+def enmascarar_serie(
+    serie: pd.Series,
+    *,
+    visible: int = 4,
+    caracter: str = "*",
+) -> pd.Series:
+    """Enmascara una serie completa con operaciones de texto vectorizadas.
+
+    La máscara de nulos se calcula una sola vez. Con texto Arrow (o si
+    ``pyarrow`` está instalado) toda la columna se enmascara con kernels de
+    Arrow en ``backend_arrow``. Sin Arrow se recortan los últimos ``visible``
+    caracteres y se rellenan por la izquierda con ``caracter`` hasta la
+    longitud original, agrupando por longitud para que cada ``pad`` use un
+    ancho fijo. Las columnas no textuales se convierten con ``str(valor)``
+    (como ``map``: fechas, ``float32`` y bytes no cambian de representación),
+    una sola vez por valor distinto.
+    """
+
+    _validar_mascara(visible, caracter)
+
+    es_texto = isinstance(serie.dtype, pd.StringDtype) or es_serie_arrow(serie)
+    textos = serie if es_texto else _como_texto(serie)
+    nulos = textos.isna().to_numpy()
+
+    if es_serie_arrow(textos):
+        from .backend_arrow import _enmascarar_serie_arrow
+
+        enmascarado = _enmascarar_serie_arrow(
+            textos, visible=visible, caracter=caracter
+        )
+    else:
+        enmascarado = _enmascarar_por_longitud(textos, visible, caracter)
+
+    if es_texto:
+        return enmascarado
+
+    # Para columnas no textuales se devuelve object conservando los nulos originales.
+    resultado = np.where(
+        nulos, serie.to_numpy(dtype=object), enmascarado.to_numpy(dtype=object)
+    )
+    return pd.Series(resultado, index=serie.index, name=serie.name, dtype=object)
+
+
+def _enmascarar_por_longitud(
+    textos: pd.Series, visible: int, caracter: str
+) -> pd.Series:
+    visibles = textos.str[-visible:] if visible else textos.str[:0]
+    longitudes = textos.str.len()
+    enmascarado = visibles.copy()
+    for longitud, posiciones in longitudes.groupby(longitudes).indices.items():
+        longitud = int(longitud)
+        if visible and longitud <= visible:
+            continue
+        enmascarado.iloc[posiciones] = (
+            visibles.iloc[posiciones]
+            .str.pad(longitud, side="left", fillchar=caracter)
+            .array
+        )
+    return enmascarado
+
+
+def enmascarar_columnas(
+    df: pd.DataFrame,
+    columnas: str | Iterable[str],
+    *,
+    visible: int = 4,
+    caracter: str = "*",
+    inplace: bool = False,
+) -> pd.DataFrame:
+    """Enmascara parcialmente los valores dejando visibles los últimos caracteres."""
+
+    _validar_mascara(visible, caracter)
+
+    columnas_normalizadas = _asegurar_columnas(columnas)
+    destino = df if inplace else df.copy()
+
+    for columna in columnas_normalizadas:
+        if columna not in destino.columns:
+            raise KeyError(f"La columna '{columna}' no está presente en el DataFrame.")
+
+        destino[columna] = enmascarar_serie(
+            destino[columna], visible=visible, caracter=caracter
+        )
+
+    return destino
+
+
+@dataclass(frozen=True)
+class TokenizacionResultado:
+    """Resultado de ``tokenizar_columnas``.
+
+    ``diccionarios`` contiene el vocabulario completo por columna (el previo más
+    los valores nuevos) y puede pasarse tal cual al siguiente lote; ``nuevos``
+    solo incluye las equivalencias añadidas en esta ejecución.
+    """
+
+    dataframe: pd.DataFrame
+    diccionarios: Dict[str, Dict[str, str]]
+    nuevos: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
+def _factorizar_como_texto(serie: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Factoriza por ``str(valor)`` sin convertir cada fila a texto.
+
+    Primero se factorizan los valores originales y luego solo los únicos se
+    convierten a texto, de modo que ``1`` y ``"1"`` comparten código.
+    """
+
+    codigos, unicos = _factorizar_por_texto(serie)
+    claves = np.array([str(valor) for valor in unicos], dtype=object)
+    codigos_claves, claves_unicas = pd.factorize(claves)
+    validos = codigos >= 0
+    codigos[validos] = codigos_claves.take(codigos[validos])
+    return codigos, np.asarray(claves_unicas, dtype=object)
+
+
+def _tokens_deterministas(
+    claves: Sequence[str],
+    prefijo: str,
+    clave: str,
+    longitud: int,
+) -> List[str]:
+    """Deriva cada token de un HMAC-SHA256 del valor: no depende del orden ni del lote."""
+
+    if not LONGITUD_TOKEN_MINIMA <= longitud <= 64:
+        raise ValueError(
+            f"'longitud' debe estar entre {LONGITUD_TOKEN_MINIMA} y 64 caracteres."
+        )
+
+    digests = Hasheador(clave=clave, capacidad_cache=0).hash_lote(claves)
+    return [f"{prefijo}_{digest[:longitud]}" for digest in digests]
+
+
+def _tokens_usados(vocabulario: Mapping[str, str], tokens: Sequence[str]) -> set[str]:
+    """Los ``tokens`` que el vocabulario ya asigna a algún valor.
+
+    ``VocabularioBoveda`` responde con el índice inverso de la bóveda; un
+    diccionario en memoria recorre sus valores.
+    """
+
+    buscar = getattr(vocabulario, "tokens_usados", None)
+    if buscar is not None:
+        return buscar(tokens)
+    return set(tokens).intersection(vocabulario.values()) if tokens else set()
+
+
+def _asignar_tokens(
+    claves: Sequence[str],
+    prefijo: str,
+    vocabulario: Dict[str, str],
+    clave: str | None,
+    longitud: int,
+    nombre: Any = None,
+) -> tuple[List[str], Dict[str, str]]:
+    """Devuelve el token de cada clave única y amplía ``vocabulario`` en sitio."""
+
+    # Los vocabularios respaldados por la bóveda buscan los valores del lote en bloque.
+    precargar = getattr(vocabulario, "precargar", None)
+    if precargar is not None:
+        precargar(claves)
+
+    nuevos: Dict[str, str] = {}
+    tokens: List[str] = []
+    if clave is None:
+        contador = len(vocabulario) + 1
+        for valor in claves:
+            token = vocabulario.get(valor)
+            if token is None:
+                token = f"{prefijo}_{contador:03d}"
+                contador += 1
+                vocabulario[valor] = token
+                nuevos[valor] = token
+            tokens.append(token)
+    else:
+        pendientes = [valor for valor in claves if valor not in vocabulario]
+        derivados = _tokens_deterministas(pendientes, prefijo, clave, longitud)
+        # Un token nuevo no puede repetirse en el lote ni estar ya asignado a otro valor.
+        if len(set(derivados)) != len(derivados) or _tokens_usados(
+            vocabulario, derivados
+        ):
+            raise ValueError(
+                f"Colisión de tokens en '{nombre}': aumenta 'longitud' "
+                f"(actual {longitud})."
+            )
+        nuevos = dict(zip(pendientes, derivados))
+        vocabulario.update(nuevos)
+        tokens = [vocabulario[valor] for valor in claves]
+    return tokens, nuevos
+
+
+def _tokenizar_sobre(
+    serie: pd.Series,
+    prefijo: str,
+    vocabulario: Dict[str, str],
+    clave: str | None = None,
+    longitud: int = LONGITUD_TOKEN,
+) -> tuple[pd.Series, Dict[str, str]]:
+    """Tokeniza ``serie`` ampliando ``vocabulario`` en sitio; devuelve las entradas nuevas."""
+
+    if es_serie_arrow(serie):
+        from .backend_arrow import _tokenizar_serie_arrow
+
+        return _tokenizar_serie_arrow(serie, prefijo, vocabulario, clave, longitud)
+
+    codigos, claves = _factorizar_como_texto(serie)
+    tokens, nuevos = _asignar_tokens(
+        claves, prefijo, vocabulario, clave, longitud, serie.name
+    )
+    categorica = pd.Categorical.from_codes(
+        codigos, categories=pd.Index(tokens, dtype=object)
+    )
+    return pd.Series(categorica, index=serie.index, name=serie.name), nuevos
+
+
+def _copiar_vocabulario(
+    vocabulario: Mapping[str, str] | None,
+) -> MutableMapping[str, str]:
+    """Copia un vocabulario en memoria; uno de la bóveda se amplía en sitio.
+
+    Copiar un ``VocabularioBoveda`` volcaría la bóveda entera a un ``dict``:
+    se usa tal cual y solo se consultan los valores únicos de cada lote.
+    """
+
+    if isinstance(vocabulario, VocabularioBoveda):
+        return vocabulario
+    return dict(vocabulario or {})
+
+
+def tokenizar_serie(
+    serie: pd.Series,
+    *,
+    prefijo: str = "token",
+    vocabulario: Mapping[str, str] | None = None,
+    clave: str | None = None,
+    longitud: int = LONGITUD_TOKEN,
+) -> tuple[pd.Series, MutableMapping[str, str], Dict[str, str]]:
+    """Tokeniza una serie en una sola pasada y devuelve una columna categórica.
+
+    Los tokens se asignan en orden de primera aparición continuando la
+    numeración de ``vocabulario``; los valores ya conocidos conservan su token.
+    Con ``clave`` el token es ``{prefijo}_{HMAC(clave, valor)[:longitud]}``: varios
+    trabajadores pueden tokenizar particiones por separado y obtener los mismos
+    tokens sin estado compartido. Un token nuevo repetido en el lote o ya asignado
+    en ``vocabulario`` a otro valor lanza ``ValueError``.
+    Devuelve la serie tokenizada, el vocabulario actualizado y las entradas nuevas.
+    Un ``VocabularioBoveda`` no se copia: se amplía en sitio (``guardar()`` lo
+    persiste) y se devuelve el mismo objeto.
+    """
+
+    actualizado = _copiar_vocabulario(vocabulario)
+    tokenizada, nuevos = _tokenizar_sobre(
+        serie, prefijo, actualizado, clave=clave, longitud=longitud
+    )
+    return tokenizada, actualizado, nuevos
+
+
+def tokenizar_columnas(
+    df: pd.DataFrame,
+    columnas: str | Iterable[str],
+    *,
+    prefijo: str = "token",
+    vocabularios: Mapping[str, Mapping[str, str]] | None = None,
+    clave: str | None = None,
+    longitud: int = LONGITUD_TOKEN,
+) -> TokenizacionResultado:
+    """Reemplaza valores por tokens legibles y conserva el diccionario para auditoría.
+
+    Las columnas resultantes son ``Categorical`` cuyas categorías son los tokens.
+    Con ``vocabularios`` (por ejemplo, ``resultado.diccionarios`` de un lote
+    anterior) solo se tokenizan los valores no vistos y se respetan los tokens previos.
+    Con ``clave`` los tokens son deterministas (ver ``tokenizar_serie``).
+    """
+
+    columnas_normalizadas = _asegurar_columnas(columnas)
+    destino = df.copy()
+    vocabularios = vocabularios or {}
+    diccionarios: Dict[str, Dict[str, str]] = {}
+    nuevos: Dict[str, Dict[str, str]] = {}
+
+    for columna in columnas_normalizadas:
+        if columna not in destino.columns:
+            raise KeyError(f"La columna '{columna}' no está presente en el DataFrame.")
+
+        destino[columna], diccionarios[columna], nuevos[columna] = tokenizar_serie(
+            destino[columna],
+            prefijo=prefijo,
+            vocabulario=vocabularios.get(columna),
+            clave=clave,
+            longitud=longitud,
+        )
+
+    return TokenizacionResultado(
+        dataframe=destino, diccionarios=diccionarios, nuevos=nuevos
+    )
+
+
+__all__ = [
+    "TokenizacionResultado",
+    "anonimizar_columnas_hash",
+    "enmascarar_columnas",
+    "enmascarar_serie",
+    "es_serie_arrow",
+    "hash_string",
+    "hashear_serie",
+    "tokenizar_columnas",
+    "tokenizar_serie",
+]
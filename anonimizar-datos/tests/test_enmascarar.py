@@ -0,0 +1,62 @@
+"""Regresión: ``enmascarar_serie`` coincide con la versión valor a valor.
+
+Se ejecuta sin dependencias extra:
+
+    uv run python -m unittest discover -s anonimizar-datos/tests
+"""
+
+from typing import Any
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from anonimizar_datos.transformaciones import enmascarar_serie
+
+
+def _enmascarar_valor(valor: Any, visible: int, caracter: str) -> Any:
+    """Implementación original, aplicada con ``Series.map``."""
+
+    try:
+        if bool(pd.isna(valor)):
+            return valor
+    except TypeError:
+        pass
+    texto = str(valor)
+    if not texto or visible == 0:
+        return caracter * len(texto)
+    return f"{caracter * max(len(texto) - visible, 0)}{texto[-visible:]}"
+
+
+class EnmascararSerieTest(unittest.TestCase):
+    SERIES = {
+        "fechas": pd.Series(
+            pd.to_datetime(["2024-01-01 00:00", None, "2024-01-01 12:30"])
+        ),
+        "duraciones": pd.Series(pd.to_timedelta(["1 day", "2h", None])),
+        "float64": pd.Series([1.5, np.nan, 123456.789, 1.5]),
+        "float32": pd.Series(np.array([0.1, 2.0, 0.1], dtype="float32")),
+        "enteros": pd.Series([7, 1234567, -3]),
+        "mixta": pd.Series(
+            [1, 1.0, True, "1", b"ab", None, pd.Timestamp("2024-01-01"), ""],
+            dtype=object,
+        ),
+        "texto": pd.Series(["007", "abcdef", None, ""], dtype=object),
+    }
+
+    def test_coincide_con_map(self) -> None:
+        for nombre, serie in self.SERIES.items():
+            for visible in (0, 2, 4):
+                with self.subTest(serie=nombre, visible=visible):
+                    esperado = serie.map(
+                        lambda valor: _enmascarar_valor(valor, visible, "*")
+                    )
+                    obtenido = enmascarar_serie(serie, visible=visible)
+                    self.assertEqual(
+                        [None if pd.isna(v) else v for v in obtenido],
+                        [None if pd.isna(v) else v for v in esperado],
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
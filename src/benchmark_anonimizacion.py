@@ -0,0 +1,311 @@
+"""Benchmark de rendimiento de anonimizar-datos sobre DataFrames sintéticos.
+
+Mide filas/segundo, memoria pico (heap de Python más búferes de Arrow) y
+número de copias de hashing, enmascarado, tokenización y la política completa
+de ``pipeline_anonimizacion``. Los
+resultados se guardan en JSON y pueden compararse con una ejecución anterior
+para detectar regresiones:
+
+    uv run src/benchmark_anonimizacion.py --filas 10000 1000000 --nulos 0 0.1
+    uv run src/benchmark_anonimizacion.py --baseline .cache/benchmarks/base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from anonimizar_datos import (
+    anonimizar_columnas_hash,
+    enmascarar_columnas,
+    tokenizar_columnas,
+)
+from pipeline_anonimizacion import (
+    HASH_COLUMNS,
+    HASH_SALT,
+    MASK_COLUMNS,
+    TOKEN_COLUMNS,
+    aplicar_anonimizacion,
+)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "benchmarks"
+FILAS_POR_DEFECTO = (10_000, 100_000, 1_000_000)
+TOLERANCIA_POR_DEFECTO = 0.15
+
+CASOS: Dict[str, Callable[[pd.DataFrame], object]] = {
+    "hash": lambda df: anonimizar_columnas_hash(df, HASH_COLUMNS, sal=HASH_SALT),
+    "mascara": lambda df: enmascarar_columnas(
+        df, MASK_COLUMNS, visible=3, caracter="#"
+    ),
+    "tokenizacion": lambda df: tokenizar_columnas(df, TOKEN_COLUMNS, prefijo="anon"),
+    "completo": aplicar_anonimizacion,
+}
+
+
+def generar_frame(
+    filas: int, cardinalidad: float, nulos: float, *, seed: int = 0
+) -> pd.DataFrame:
+    """Crea las columnas sensibles de la política con cardinalidad y nulos controlados.
+
+    ``cardinalidad`` es la proporción de valores distintos respecto a ``filas``.
+    """
+
+    rng = np.random.default_rng(seed)
+    distintos = max(1, int(filas * cardinalidad))
+
+    def _columna(prefijo: str) -> pd.Series:
+        codigos = rng.integers(0, distintos, filas)
+        valores = np.char.add(prefijo, codigos.astype("U"))
+        serie = pd.Series(valores)
+        if nulos:
+            serie[rng.random(filas) < nulos] = None
+        return serie
+
+    return pd.DataFrame(
+        {
+            "cliente_id": _columna("CLI-"),
+            "documento_nacional": _columna("DNI"),
+            "direccion_detallada": _columna("Calle "),
+            "asesor_venta": _columna("Asesor "),
+        }
+    )
+
+
+@contextmanager
+def contar_copias() -> Iterator[Dict[str, int]]:
+    """Cuenta las llamadas a ``DataFrame.copy`` y ``Series.copy`` profundas."""
+
+    conteo = {"dataframe": 0, "series": 0}
+    originales = {"dataframe": pd.DataFrame.copy, "series": pd.Series.copy}
+
+    def _envolver(tipo: str) -> Callable[..., object]:
+        original = originales[tipo]
+
+        def _copy(self: object, deep: bool = True, *args: object, **kwargs: object):
+            if deep:
+                conteo[tipo] += 1
+            return original(self, deep, *args, **kwargs)
+
+        return _copy
+
+    pd.DataFrame.copy = _envolver("dataframe")  # type: ignore[method-assign]
+    pd.Series.copy = _envolver("series")  # type: ignore[method-assign]
+    try:
+        yield conteo
+    finally:
+        pd.DataFrame.copy = originales["dataframe"]  # type: ignore[method-assign]
+        pd.Series.copy = originales["series"]  # type: ignore[method-assign]
+
+
+# Pools proxy de Arrow ya usados: los búferes que siguen vivos los referencian,
+# así que no se liberan aunque la medición haya terminado.
+_POOLS_ARROW: List[Any] = []
+
+
+@contextmanager
+def medir_memoria_arrow() -> Iterator[Dict[str, int]]:
+    """Pico de bytes que Arrow reserva dentro del bloque.
+
+    ``tracemalloc`` no ve los búferes de Arrow (con pandas 3 el texto vive en
+    Arrow): se instala un pool proxy propio como pool por defecto y se lee su
+    ``max_memory()``. Sin ``pyarrow`` el pico es 0.
+    """
+
+    medicion = {"pico": 0}
+    try:
+        import pyarrow as pa
+    except ImportError:
+        yield medicion
+        return
+
+    anterior = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(_POOLS_ARROW[0] if _POOLS_ARROW else anterior)
+    _POOLS_ARROW.append(pool)
+    pa.set_memory_pool(pool)
+    try:
+        yield medicion
+    finally:
+        medicion["pico"] = pool.max_memory()
+
+
+def medir_caso(
+    funcion: Callable[[pd.DataFrame], object],
+    df: pd.DataFrame,
+    repeticiones: int,
+) -> Dict[str, float]:
+    """Mejor tiempo de ``repeticiones`` y, en una pasada aparte, memoria pico y copias."""
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(df)
+        tiempos.append(time.perf_counter() - inicio)
+
+    # tracemalloc ralentiza el código Python: la memoria se mide fuera del cronómetro.
+    with contar_copias() as copias, medir_memoria_arrow() as arrow:
+        tracemalloc.start()
+        funcion(df)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    segundos = min(tiempos)
+    return {
+        "segundos": segundos,
+        "filas_por_segundo": len(df) / segundos if segundos else float("inf"),
+        "memoria_pico_mb": (pico + arrow["pico"]) / 1e6,
+        "memoria_pico_python_mb": pico / 1e6,
+        "memoria_pico_arrow_mb": arrow["pico"] / 1e6,
+        "copias_dataframe": copias["dataframe"],
+        "copias_series": copias["series"],
+    }
+
+
+def ejecutar_benchmark(
+    filas: List[int],
+    cardinalidades: List[float],
+    nulos: List[float],
+    casos: List[str],
+    repeticiones: int,
+) -> List[Dict[str, object]]:
+    resultados: List[Dict[str, object]] = []
+    for n in filas:
+        for cardinalidad in cardinalidades:
+            for proporcion_nulos in nulos:
+                df = generar_frame(n, cardinalidad, proporcion_nulos)
+                for caso in casos:
+                    medicion = medir_caso(CASOS[caso], df, repeticiones)
+                    resultados.append(
+                        {
+                            "caso": caso,
+                            "filas": n,
+                            "cardinalidad": cardinalidad,
+                            "nulos": proporcion_nulos,
+                            **medicion,
+                        }
+                    )
+                    print(
+                        f"- {caso:<12} filas={n:>11,} card={cardinalidad:<5} "
+                        f"nulos={proporcion_nulos:<4} "
+                        f"{medicion['filas_por_segundo']:>14,.0f} filas/s "
+                        f"pico={medicion['memoria_pico_mb']:>9.1f} MB "
+                        f"(arrow {medicion['memoria_pico_arrow_mb']:.1f}) "
+                        f"copias={medicion['copias_dataframe']}"
+                    )
+                del df
+    return resultados
+
+
+def _metadatos() -> Dict[str, str]:
+    versiones = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+    try:
+        import pyarrow
+
+        versiones["pyarrow"] = pyarrow.__version__
+    except ImportError:
+        pass
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "plataforma": platform.platform(),
+        **versiones,
+    }
+
+
+def _clave(resultado: Dict[str, object]) -> tuple:
+    return (
+        resultado["caso"],
+        resultado["filas"],
+        resultado["cardinalidad"],
+        resultado["nulos"],
+    )
+
+
+def comparar_con_baseline(
+    resultados: List[Dict[str, object]],
+    baseline: Path,
+    tolerancia: float,
+) -> List[str]:
+    """Devuelve las regresiones de throughput mayores que ``tolerancia``."""
+
+    with baseline.open(encoding="utf-8") as archivo:
+        previos = {_clave(r): r for r in json.load(archivo)["resultados"]}
+
+    regresiones = []
+    for resultado in resultados:
+        previo = previos.get(_clave(resultado))
+        if previo is None:
+            continue
+        actual = float(resultado["filas_por_segundo"])  # type: ignore[arg-type]
+        anterior = float(previo["filas_por_segundo"])
+        cambio = actual / anterior - 1
+        if cambio < -tolerancia:
+            caso, n, cardinalidad, nulos = _clave(resultado)
+            regresiones.append(
+                f"{caso} (filas={n:,}, card={cardinalidad}, nulos={nulos}): "
+                f"{anterior:,.0f} → {actual:,.0f} filas/s ({cambio:+.0%})"
+            )
+        if resultado["copias_dataframe"] > previo["copias_dataframe"]:
+            regresiones.append(
+                f"{resultado['caso']} (filas={resultado['filas']:,}): copias "
+                f"{previo['copias_dataframe']} → {resultado['copias_dataframe']}"
+            )
+    return regresiones
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=FILAS_POR_DEFECTO)
+    parser.add_argument("--cardinalidad", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--nulos", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument(
+        "--salida",
+        type=Path,
+        default=CACHE_DIR / f"anonimizacion_{datetime.now():%Y%m%d_%H%M%S}.json",
+    )
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_POR_DEFECTO)
+    args = parser.parse_args(argv)
+
+    print("Benchmark de anonimizar-datos")
+    resultados = ejecutar_benchmark(
+        args.filas, args.cardinalidad, args.nulos, args.casos, args.repeticiones
+    )
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    with args.salida.open("w", encoding="utf-8") as archivo:
+        json.dump(
+            {"metadatos": _metadatos(), "resultados": resultados}, archivo, indent=2
+        )
+    print(f"\nResultados guardados en: {args.salida}")
+
+    if args.baseline is None:
+        return 0
+
+    regresiones = comparar_con_baseline(resultados, args.baseline, args.tolerancia)
+    if regresiones:
+        print(f"\n⚠️ Regresiones respecto a {args.baseline}:")
+        for regresion in regresiones:
+            print(f"  - {regresion}")
+        return 1
+    print(f"\n✅ Sin regresiones respecto a {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Benchmark de arranque en frío de los artefactos persistidos.
+
+Cada medición lanza un intérprete nuevo que importa el paquete, carga el
+artefacto (mapeado en memoria o copiado) y hace la primera predicción, de
+modo que se mide lo que paga un trabajador recién creado:
+
+    uv run src/benchmark_arranque.py --repeticiones 10
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from ml_pipeline_e2e_practica.artefactos import (
+    ARTEFACTOS_DIR,
+    ARCHIVO_MODELO,
+    resolver_artefacto,
+)
+
+SRC_DIR = Path(__file__).resolve().parent
+CACHE_DIR = SRC_DIR.parent / ".cache" / "benchmarks"
+
+_MEDICION = """
+import json, sys, time
+inicio = time.perf_counter()
+from ml_pipeline_e2e_practica import cargar_artefacto, cargar_dataframe_limpio
+importado = time.perf_counter()
+artefacto = cargar_artefacto(sys.argv[1], mmap_mode=sys.argv[2] or None)
+cargado = time.perf_counter()
+# Segunda carga: ya sin el costo de importar los módulos del estimador.
+cargar_artefacto(sys.argv[1], mmap_mode=sys.argv[2] or None)
+recargado = time.perf_counter()
+muestra = cargar_dataframe_limpio().head(1)
+listo = time.perf_counter()
+artefacto.predecir(muestra)
+predicho = time.perf_counter()
+print(json.dumps({
+    "importar_ms": (importado - inicio) * 1_000,
+    "cargar_ms": (cargado - importado) * 1_000,
+    "recargar_ms": (recargado - cargado) * 1_000,
+    "primera_prediccion_ms": (predicho - listo) * 1_000,
+}))
+"""
+
+
+def medir_arranque(
+    artefacto: Path, mmap_mode: str | None, repeticiones: int
+) -> Dict[str, float]:
+    """Mediana de cada fase en ``repeticiones`` procesos nuevos."""
+
+    entorno = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    muestras: List[Dict[str, float]] = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", _MEDICION, str(artefacto), mmap_mode or ""],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=entorno,
+        )
+        muestras.append(json.loads(salida.stdout))
+    return {fase: statistics.median(m[fase] for m in muestras) for fase in muestras[0]}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--artefactos", type=Path, default=ARTEFACTOS_DIR)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument(
+        "--salida",
+        type=Path,
+        default=CACHE_DIR / f"arranque_{datetime.now():%Y%m%d_%H%M%S}.json",
+    )
+    args = parser.parse_args(argv)
+
+    artefactos = sorted(p for p in args.artefactos.iterdir() if p.is_dir())
+    if not artefactos:
+        print(
+            f"⚠️ ALERTA: no hay artefactos en {args.artefactos}. "
+            "Ejecuta antes src/train_regression.py o src/train_classification.py."
+        )
+        return 1
+
+    print("Arranque en frío (mediana por fase, en ms):")
+    resultados = []
+    for artefacto in artefactos:
+        tamano_mb = (
+            resolver_artefacto(artefacto) / ARCHIVO_MODELO
+        ).stat().st_size / 1e6
+        for mmap_mode in ("r", None):
+            fases = medir_arranque(artefacto, mmap_mode, args.repeticiones)
+            resultados.append(
+                {
+                    "artefacto": artefacto.name,
+                    "mmap_mode": mmap_mode,
+                    "tamano_mb": tamano_mb,
+                    **fases,
+                }
+            )
+            print(
+                f"- {artefacto.name:<24} mmap={str(mmap_mode):<4} "
+                f"importar {fases['importar_ms']:7.1f} | "
+                f"cargar {fases['cargar_ms']:6.2f} | "
+                f"recargar {fases['recargar_ms']:5.2f} | "
+                f"1.ª predicción {fases['primera_prediccion_ms']:6.2f} "
+                f"({tamano_mb:.2f} MB)"
+            )
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    args.salida.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+    print(f"\n✅ Resultados guardados en: {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Benchmark del índice IVF frente al ``KNeighborsClassifier`` exacto.
+
+Para cada valor de ``n_sondeos`` mide el *recall* de los k vecinos respecto a
+la búsqueda exacta, el accuracy y la coincidencia con las predicciones
+exactas, las consultas por segundo en lote y la latencia de una consulta
+aislada. ``--replicas`` multiplica el conjunto de entrenamiento (con un ruido
+pequeño) para ver cómo escala cada método:
+
+    uv run src/benchmark_vecinos.py --sondeos 1 2 4 8 16 --replicas 1 20
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.neighbors import KNeighborsClassifier
+
+from ml_pipeline_e2e_practica.preprocesamiento_seguro import (
+    cargar_dataframe_limpio,
+    preparar_matrices,
+)
+from ml_pipeline_e2e_practica.vecinos_aproximados import ClasificadorVecinosIVF
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "benchmarks"
+N_VECINOS = 5
+
+
+def ampliar(
+    X: np.ndarray, y: np.ndarray, replicas: int, *, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Repite ``X`` ``replicas`` veces con ruido gaussiano (σ=0.01, datos escalados)."""
+
+    if replicas <= 1:
+        return X, y
+    rng = np.random.default_rng(seed)
+    X_ampliado = np.tile(X, (replicas, 1))
+    X_ampliado[len(X) :] += rng.normal(0, 0.01, X_ampliado[len(X) :].shape)
+    return X_ampliado, np.tile(y, replicas)
+
+
+def medir(
+    modelo: BaseEstimator,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    exactos: Dict[str, np.ndarray],
+    repeticiones: int,
+) -> Dict[str, float]:
+    inicio = time.perf_counter()
+    predicciones = modelo.predict(X_test)
+    segundos_lote = time.perf_counter() - inicio
+
+    latencias = []
+    for fila in X_test[:repeticiones]:
+        inicio = time.perf_counter()
+        modelo.predict(fila[None, :])
+        latencias.append((time.perf_counter() - inicio) * 1_000)
+
+    distancias, _ = modelo.kneighbors(X_test, N_VECINOS)
+    # Un vecino cuenta como recuperado si está a la distancia del k-ésimo exacto
+    # o menos; así los empates no penalizan al índice.
+    recuperados = (distancias <= exactos["distancias"][:, -1:] + 1e-9).sum(axis=1)
+    return {
+        "recall": float(np.minimum(recuperados, N_VECINOS).mean() / N_VECINOS),
+        "accuracy": float((predicciones == y_test).mean()),
+        "coincidencia": float((predicciones == exactos["predicciones"]).mean()),
+        "consultas_por_segundo": len(X_test) / segundos_lote,
+        "latencia_ms_p50": statistics.median(latencias),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sondeos", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1])
+    parser.add_argument("--n-listas", type=int, default=None)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument(
+        "--salida",
+        type=Path,
+        default=CACHE_DIR / f"vecinos_{datetime.now():%Y%m%d_%H%M%S}.json",
+    )
+    args = parser.parse_args(argv)
+
+    df = cargar_dataframe_limpio()
+    df["is_high_demand"] = (df["demand"] > df["demand"].median()).astype(int)
+    X_base, X_test, y_base, y_test = preparar_matrices(df, target_col="is_high_demand")
+
+    resultados = []
+    for replicas in args.replicas:
+        X_train, y_train = ampliar(X_base, y_base, replicas)
+        print(f"\nEntrenamiento con {len(X_train):,} filas (réplicas={replicas}):")
+
+        inicio = time.perf_counter()
+        exacto = KNeighborsClassifier(n_neighbors=N_VECINOS).fit(X_train, y_train)
+        construccion = time.perf_counter() - inicio
+        exactos = {
+            "predicciones": exacto.predict(X_test),
+            "distancias": exacto.kneighbors(X_test)[0],
+        }
+        casos = [("exacto", None, construccion)]
+
+        inicio = time.perf_counter()
+        indice = ClasificadorVecinosIVF(N_VECINOS, n_listas=args.n_listas).fit(
+            X_train, y_train
+        )
+        construccion = time.perf_counter() - inicio
+        casos += [("ivf", sondeos, construccion) for sondeos in args.sondeos]
+
+        for metodo, sondeos, construccion in casos:
+            # El índice se construye una vez; ``n_sondeos`` solo afecta a la consulta.
+            modelo = exacto if sondeos is None else indice.set_params(n_sondeos=sondeos)
+            metricas = medir(modelo, X_test, y_test, exactos, args.repeticiones)
+            resultados.append(
+                {
+                    "filas_entrenamiento": len(X_train),
+                    "metodo": metodo,
+                    "n_sondeos": sondeos,
+                    "n_listas": len(indice.centroides_) if sondeos else None,
+                    "construccion_s": construccion,
+                    **metricas,
+                }
+            )
+            etiqueta = "exacto" if sondeos is None else f"ivf sondeos={sondeos}"
+            print(
+                f"- {etiqueta:<16} recall {metricas['recall']:.4f} | "
+                f"accuracy {metricas['accuracy']:.4f} | "
+                f"coincidencia {metricas['coincidencia']:.4f} | "
+                f"{metricas['consultas_por_segundo']:>10,.0f} consultas/s | "
+                f"p50 {metricas['latencia_ms_p50']:.3f} ms"
+            )
+
+    args.salida.parent.mkdir(parents=True, exist_ok=True)
+    args.salida.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+    print(f"\n✅ Resultados guardados en: {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Actualiza un modelo SGD solo con los registros posteriores al último checkpoint.
+
+La primera ejecución entrena con todo el archivo; las siguientes leen por
+bloques solo lo añadido al CSV desde el último checkpoint:
+
+    uv run src/entrenar_incremental.py
+    uv run src/entrenar_incremental.py --tarea clasificacion --datos nuevos.csv
+
+La métrica reportada es *prequential*: cada lote se evalúa antes de aprender de él.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from pathlib import Path
+import sys
+from typing import List
+
+import pandas as pd
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+
+from ml_pipeline_e2e_practica.aprendizaje_incremental import (
+    INCREMENTAL_DIR,
+    ModeloIncremental,
+    actualizar_desde_archivo,
+    mediana_limpia,
+)
+from ml_pipeline_e2e_practica.preprocesamiento_seguro import (
+    DATA_PATH,
+    FILAS_POR_BLOQUE,
+    TARGET,
+)
+
+TARGET_CLASIFICACION = "is_high_demand"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tarea", choices=("regresion", "clasificacion"), default="regresion"
+    )
+    parser.add_argument("--datos", type=Path, default=DATA_PATH)
+    parser.add_argument("--directorio", type=Path, default=None)
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE)
+    parser.add_argument(
+        "--umbral",
+        type=float,
+        default=None,
+        help="Demanda a partir de la cual es alta (clasificación). "
+        "Por defecto, la mediana de las filas limpias en la primera ejecución.",
+    )
+    args = parser.parse_args(argv)
+    directorio = args.directorio or INCREMENTAL_DIR / args.tarea
+
+    transformar = None
+    if args.tarea == "regresion":
+        modelo = ModeloIncremental(directorio, SGDRegressor(random_state=42))
+        nombre_metrica = "MSE"
+    else:
+        modelo = ModeloIncremental(
+            directorio,
+            SGDClassifier(loss="log_loss", random_state=42),
+            target_col=TARGET_CLASIFICACION,
+            clases=[0, 1],
+        )
+        nombre_metrica = "Accuracy"
+        # El umbral queda fijo en el checkpoint: redefinir el target a mitad
+        # del entrenamiento mezclaría dos problemas distintos.
+        umbral = modelo.metadatos.get("umbral", args.umbral)
+        if umbral is None:
+            umbral = mediana_limpia(args.datos, filas_por_bloque=args.filas_por_bloque)
+        modelo.metadatos["umbral"] = umbral
+
+        def transformar(bloque: pd.DataFrame) -> pd.DataFrame:
+            bloque[TARGET_CLASIFICACION] = (bloque[TARGET] > umbral).astype(int)
+            return bloque
+
+    resumen = actualizar_desde_archivo(
+        modelo,
+        args.datos,
+        filas_por_bloque=args.filas_por_bloque,
+        transformar=transformar,
+    )
+    if not resumen.filas_nuevas:
+        print(
+            f"✅ Sin registros posteriores a {resumen.ultimo_timestamp}; "
+            f"el checkpoint v{resumen.version} sigue vigente."
+        )
+        return 0
+
+    print(
+        f"✅ {resumen.filas_nuevas:,} filas nuevas en {resumen.segundos:.2f} s "
+        f"(total {resumen.filas_vistas:,}, hasta {resumen.ultimo_timestamp})."
+    )
+    if not math.isnan(resumen.metrica):
+        print(
+            f"{nombre_metrica} prequential sobre las filas nuevas: {resumen.metrica:.4f}"
+        )
+    print(f"Checkpoint v{resumen.version} guardado en: {modelo.ruta_artefacto}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
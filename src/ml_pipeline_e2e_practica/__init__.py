@@ -1,10 +1,89 @@
 """Paquete educativo con utilidades para prevenir data leakage en pipelines."""
 
+from .almacen_features import (
+    FEATURES_TEMPORALES,
+    AlmacenFeatures,
+    calcular_features,
+)
+from .aprendizaje_incremental import (
+    ModeloIncremental,
+    ResumenActualizacion,
+    actualizar_desde_archivo,
+    mediana_limpia,
+)
+from .artefactos import (
+    Artefacto,
+    cargar_artefacto,
+    entrenar_y_guardar,
+    guardar_artefacto,
+    resolver_artefacto,
+)
+from .bloques import EscritorBloques, leer_en_bloques
+from .busqueda_hiperparametros import ResultadoBusqueda, buscar_hiperparametros
+from .comparacion_modelos import (
+    ResultadoModelo,
+    comparar_modelos,
+    imprimir_resultados,
+)
 from .preprocesamiento_seguro import (
+    CACHE_DIR,
+    ESQUEMA,
     FEATURES,
     TARGET,
+    MatricesEnDisco,
     cargar_dataframe_limpio,
+    derivar_features,
+    dividir_y_escalar,
     preparar_matrices,
+    preparar_matrices_por_bloques,
+    reporte_memoria,
+    ruta_snapshot,
+)
+from .validacion_cruzada import (
+    PliegosCV,
+    podar_pliegos,
+    preparar_pliegos,
+    resumen_validacion,
+    validar_modelos,
 )
+from .vecinos_aproximados import ClasificadorVecinosIVF
 
-__all__ = ["FEATURES", "TARGET", "cargar_dataframe_limpio", "preparar_matrices"]
+__all__ = [
+    "AlmacenFeatures",
+    "Artefacto",
+    "CACHE_DIR",
+    "ClasificadorVecinosIVF",
+    "ESQUEMA",
+    "EscritorBloques",
+    "FEATURES",
+    "FEATURES_TEMPORALES",
+    "MatricesEnDisco",
+    "ModeloIncremental",
+    "PliegosCV",
+    "ResultadoBusqueda",
+    "ResultadoModelo",
+    "ResumenActualizacion",
+    "TARGET",
+    "actualizar_desde_archivo",
+    "buscar_hiperparametros",
+    "calcular_features",
+    "cargar_artefacto",
+    "cargar_dataframe_limpio",
+    "comparar_modelos",
+    "derivar_features",
+    "dividir_y_escalar",
+    "entrenar_y_guardar",
+    "guardar_artefacto",
+    "imprimir_resultados",
+    "leer_en_bloques",
+    "mediana_limpia",
+    "podar_pliegos",
+    "preparar_matrices",
+    "preparar_matrices_por_bloques",
+    "preparar_pliegos",
+    "reporte_memoria",
+    "resolver_artefacto",
+    "resumen_validacion",
+    "ruta_snapshot",
+    "validar_modelos",
+]
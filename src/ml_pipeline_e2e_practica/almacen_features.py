@@ -0,0 +1,219 @@
+"""Almacén incremental de features de rezago y medias móviles sin fuga temporal.
+
+Todas las features de una fila se calculan solo con la demanda de horas
+**anteriores** a su ``timestamp``:
+
+- ``demand_lag_1`` y ``demand_lag_24``: demanda exactamente 1 y 24 horas antes.
+- ``demand_media_24h``: media de las 24 horas previas (ventana ``[t-24h, t)``).
+- ``demand_media_hora_7d``: media de la misma hora en los 7 días previos.
+
+Si la hora de referencia no existe en el histórico (filas descartadas en la
+limpieza) la feature queda en ``NaN``. Como ninguna feature mira más atrás de
+``VENTANA_HORAS``, basta con persistir esa ventana para calcular solo las filas
+nuevas en cada actualización.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .preprocesamiento_seguro import RAIZ_PROYECTO, TARGET
+
+FEATURES_DIR = RAIZ_PROYECTO / ".cache" / "features"
+VENTANA_HORAS = 24 * 7
+FEATURES_TEMPORALES = [
+    "demand_lag_1",
+    "demand_lag_24",
+    "demand_media_24h",
+    "demand_media_hora_7d",
+]
+# Incrementar cuando cambie `calcular_features`: el almacén se reconstruye.
+VERSION_FEATURES = 1
+
+
+def _desplazar(serie: pd.Series, horas: int) -> np.ndarray:
+    """Valor de ``serie`` en ``t - horas`` para cada ``t`` del índice (o ``NaN``)."""
+
+    return serie.reindex(serie.index - pd.Timedelta(hours=horas)).to_numpy()
+
+
+def calcular_features(
+    df: pd.DataFrame, target_col: str = TARGET, *, timestamp_col: str = "timestamp"
+) -> pd.DataFrame:
+    """Calcula las features temporales de ``df`` completo de forma vectorizada.
+
+    Devuelve un DataFrame alineado con ``df`` (mismo índice) con
+    ``FEATURES_TEMPORALES``. ``df`` no necesita venir ordenado, pero cada
+    ``timestamp`` debe ser único.
+    """
+
+    if df[timestamp_col].duplicated().any():
+        raise ValueError(f"La columna '{timestamp_col}' tiene timestamps duplicados.")
+
+    serie = pd.Series(
+        df[target_col].to_numpy(dtype=np.float64),
+        index=pd.DatetimeIndex(df[timestamp_col]),
+    ).sort_index()
+
+    dias_previos = np.column_stack([_desplazar(serie, 24 * d) for d in range(1, 8)])
+    presentes = (~np.isnan(dias_previos)).sum(axis=1)
+    media_hora = np.divide(
+        np.nansum(dias_previos, axis=1),
+        presentes,
+        out=np.full(len(serie), np.nan),
+        where=presentes > 0,
+    )
+
+    features = pd.DataFrame(
+        {
+            "demand_lag_1": _desplazar(serie, 1),
+            "demand_lag_24": dias_previos[:, 0],
+            "demand_media_24h": serie.rolling("24h", closed="left").mean().to_numpy(),
+            "demand_media_hora_7d": media_hora,
+        },
+        index=serie.index,
+    )
+    return features.reindex(pd.DatetimeIndex(df[timestamp_col])).set_index(df.index)
+
+
+class AlmacenFeatures:
+    """Persiste features temporales por partes y las amplía solo con filas nuevas.
+
+    El directorio contiene una parte Feather por actualización, la ventana de
+    las últimas ``VENTANA_HORAS`` horas de demanda y ``meta.json``, que se
+    escribe al final de forma atómica y referencia las partes y la ventana
+    vigentes.
+    """
+
+    def __init__(
+        self,
+        directorio: str | Path = FEATURES_DIR,
+        *,
+        target_col: str = TARGET,
+        timestamp_col: str = "timestamp",
+    ) -> None:
+        self.directorio = Path(directorio)
+        self.target_col = target_col
+        self.timestamp_col = timestamp_col
+        self._meta = self._leer_meta()
+
+    @property
+    def _ruta_meta(self) -> Path:
+        return self.directorio / "meta.json"
+
+    def _leer_meta(self) -> Dict[str, object]:
+        vacio: Dict[str, object] = {
+            "version": VERSION_FEATURES,
+            "partes": [],
+            "ventana": None,
+            "ultimo": None,
+        }
+        if not self._ruta_meta.exists():
+            return vacio
+        meta = json.loads(self._ruta_meta.read_text(encoding="utf-8"))
+        # Una versión distinta implica otra definición de features: se descarta.
+        return meta if meta.get("version") == VERSION_FEATURES else vacio
+
+    @property
+    def ultimo_timestamp(self) -> pd.Timestamp | None:
+        ultimo = self._meta["ultimo"]
+        return None if ultimo is None else pd.Timestamp(ultimo)
+
+    def _ventana(self) -> pd.DataFrame:
+        if self.ultimo_timestamp is None:
+            return pd.DataFrame(
+                {
+                    self.timestamp_col: pd.Series(dtype="datetime64[us]"),
+                    self.target_col: pd.Series(dtype=np.float64),
+                }
+            )
+        return pd.read_feather(self.directorio / str(self._meta["ventana"]))
+
+    def _escribir_atomico(self, df: pd.DataFrame, ruta: Path) -> None:
+        temporal = ruta.with_suffix(f".{os.getpid()}.tmp")
+        df.to_feather(temporal)
+        temporal.replace(ruta)
+
+    def actualizar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calcula y guarda las features de las filas posteriores al último timestamp.
+
+        Las filas con ``timestamp`` igual o anterior al último almacenado se
+        ignoran. Devuelve las features nuevas (con ``timestamp_col``).
+        """
+
+        ultimo = self.ultimo_timestamp
+        nuevas = df if ultimo is None else df[df[self.timestamp_col] > ultimo]
+        nuevas = nuevas.sort_values(self.timestamp_col)
+        if nuevas.empty:
+            return pd.DataFrame(columns=[self.timestamp_col, *FEATURES_TEMPORALES])
+
+        columnas = [self.timestamp_col, self.target_col]
+        historia = pd.concat(
+            [self._ventana(), nuevas[columnas].astype({self.target_col: np.float64})],
+            ignore_index=True,
+        )
+        features = calcular_features(
+            historia, self.target_col, timestamp_col=self.timestamp_col
+        ).iloc[-len(nuevas) :]
+        features.insert(0, self.timestamp_col, nuevas[self.timestamp_col].to_numpy())
+        features = features.reset_index(drop=True)
+
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        partes: List[str] = list(self._meta["partes"])  # type: ignore[arg-type]
+        nombre = f"parte_{len(partes):05d}.feather"
+        self._escribir_atomico(features, self.directorio / nombre)
+        ventana_anterior = self._meta["ventana"]
+
+        nuevo_ultimo = historia[self.timestamp_col].iloc[-1]
+        limite = nuevo_ultimo - pd.Timedelta(hours=VENTANA_HORAS)
+        ventana = historia[historia[self.timestamp_col] >= limite]
+        nombre_ventana = f"ventana_{len(partes):05d}.feather"
+        self._escribir_atomico(
+            ventana.reset_index(drop=True), self.directorio / nombre_ventana
+        )
+
+        # meta.json es el punto de confirmación: hasta reemplazarlo, la parte y
+        # la ventana nuevas no existen para otros lectores.
+        self._meta = {
+            "version": VERSION_FEATURES,
+            "partes": [*partes, nombre],
+            "ventana": nombre_ventana,
+            "ultimo": nuevo_ultimo.isoformat(),
+        }
+        temporal = self._ruta_meta.with_suffix(f".{os.getpid()}.tmp")
+        temporal.write_text(json.dumps(self._meta, indent=2), encoding="utf-8")
+        temporal.replace(self._ruta_meta)
+        if ventana_anterior:
+            (self.directorio / str(ventana_anterior)).unlink(missing_ok=True)
+        return features
+
+    def cargar(self) -> pd.DataFrame:
+        """Todas las features almacenadas, ordenadas por ``timestamp``."""
+
+        partes = [
+            pd.read_feather(self.directorio / nombre)
+            for nombre in self._meta["partes"]  # type: ignore[union-attr]
+        ]
+        if not partes:
+            return pd.DataFrame(columns=[self.timestamp_col, *FEATURES_TEMPORALES])
+        return pd.concat(partes, ignore_index=True)
+
+    def unir(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Añade a ``df`` las features almacenadas cruzando por ``timestamp``."""
+
+        return df.merge(self.cargar(), on=self.timestamp_col, how="left")
+
+
+__all__ = [
+    "AlmacenFeatures",
+    "FEATURES_DIR",
+    "FEATURES_TEMPORALES",
+    "VENTANA_HORAS",
+    "calcular_features",
+]
@@ -0,0 +1,358 @@
+"""Entrenamiento incremental con ``partial_fit`` y checkpoints atómicos.
+
+``ModeloIncremental`` mantiene un ``StandardScaler`` acumulado y un estimador
+con ``partial_fit`` (``SGDRegressor``, ``SGDClassifier``...). Cada
+actualización aprende solo de las filas con ``timestamp`` posterior al último
+checkpoint. ``actualizar_desde_archivo`` además guarda en el checkpoint hasta
+qué byte leyó cada archivo y continúa desde ahí: ni siquiera vuelve a leer ni
+limpiar el histórico, así que su costo depende de las filas nuevas.
+
+Cada lote se evalúa antes de aprender de él (evaluación *prequential*): en ese
+momento el scaler y el modelo solo han visto datos anteriores, de modo que la
+métrica reportada no tiene fuga.
+
+El directorio del modelo contiene un artefacto por versión, en el mismo
+formato que ``guardar_artefacto`` (sirve tal cual para
+``servicio_prediccion.py`` y ``puntuar_lotes.py``), y ``estado.json``, que se
+reemplaza de forma atómica y apunta a la versión vigente.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import IO, Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone, is_classifier
+from sklearn.metrics import accuracy_score, mean_squared_error
+from sklearn.preprocessing import StandardScaler
+
+from .artefactos import cargar_artefacto, guardar_artefacto
+from .preprocesamiento_seguro import (
+    DATA_PATH,
+    FEATURES,
+    FILAS_POR_BLOQUE,
+    RAIZ_PROYECTO,
+    TARGET,
+    _bloques_limpios,
+)
+
+INCREMENTAL_DIR = RAIZ_PROYECTO / ".cache" / "incremental"
+ARCHIVO_ESTADO = "estado.json"
+FILAS_POR_LOTE = 1_024
+
+Metrica = Callable[[np.ndarray, np.ndarray], float]
+
+
+@dataclass(frozen=True)
+class ResumenActualizacion:
+    filas_nuevas: int
+    filas_vistas: int
+    ultimo_timestamp: pd.Timestamp | None
+    metrica: float
+    version: int
+    segundos: float
+
+
+class ModeloIncremental:
+    """Scaler y estimador que se actualizan solo con filas nuevas.
+
+    Si ``directorio`` ya tiene un checkpoint se reanuda desde él y ``modelo``
+    se ignora. Los clasificadores necesitan ``clases`` en la primera
+    actualización (``partial_fit`` no puede deducirlas de un solo lote).
+    """
+
+    def __init__(
+        self,
+        directorio: str | Path,
+        modelo: BaseEstimator | None = None,
+        *,
+        features: Sequence[str] = FEATURES,
+        target_col: str = TARGET,
+        clases: Sequence[Any] | None = None,
+        metrica: Metrica | None = None,
+        timestamp_col: str = "timestamp",
+    ) -> None:
+        self.directorio = Path(directorio)
+        self.timestamp_col = timestamp_col
+        self._pendientes = 0
+        self._y_evaluados: List[np.ndarray] = []
+        self._predichos: List[np.ndarray] = []
+        self._inicio = time.perf_counter()
+
+        estado = self._leer_estado()
+        if estado is None:
+            if modelo is None:
+                raise ValueError(
+                    f"No hay checkpoint en {self.directorio}; indica el estimador inicial."
+                )
+            if not hasattr(modelo, "partial_fit"):
+                raise ValueError(f"{type(modelo).__name__} no implementa partial_fit.")
+            if is_classifier(modelo) and clases is None:
+                raise ValueError("Los clasificadores incrementales necesitan `clases`.")
+            self.scaler = StandardScaler()
+            self.modelo = clone(modelo)
+            self.features = list(features)
+            self.target_col = target_col
+            self.clases = None if clases is None else list(clases)
+            self.metadatos: Dict[str, Any] = {}
+            self.version = 0
+            self.ultimo_timestamp: pd.Timestamp | None = None
+            self.filas_vistas = 0
+            self.posiciones: Dict[str, int] = {}
+        else:
+            # Sin mapeo: ``partial_fit`` modifica los coeficientes en sitio.
+            artefacto = cargar_artefacto(
+                self.directorio / estado["artefacto"], mmap_mode=None
+            )
+            self.scaler = artefacto.scaler
+            self.modelo = artefacto.modelo
+            self.features = artefacto.features
+            self.target_col = artefacto.metadatos["target"]
+            self.clases = artefacto.metadatos.get("clases")
+            self.metadatos = dict(artefacto.metadatos.get("extra", {}))
+            self.version = estado["version"]
+            self.ultimo_timestamp = pd.Timestamp(estado["ultimo"])
+            self.filas_vistas = estado["filas_vistas"]
+            # Checkpoints anteriores sin posiciones: se relee el archivo una vez.
+            self.posiciones = dict(estado.get("posiciones", {}))
+
+        if metrica is None:
+            metrica = (
+                accuracy_score if is_classifier(self.modelo) else mean_squared_error
+            )
+        self.metrica = metrica
+        # Corte fijo hasta el próximo checkpoint: el orden de los lotes no importa.
+        self._corte = self.ultimo_timestamp
+
+    @property
+    def _ruta_estado(self) -> Path:
+        return self.directorio / ARCHIVO_ESTADO
+
+    def _leer_estado(self) -> Dict[str, Any] | None:
+        if not self._ruta_estado.exists():
+            return None
+        return json.loads(self._ruta_estado.read_text(encoding="utf-8"))
+
+    @property
+    def ruta_artefacto(self) -> Path | None:
+        """Artefacto de la versión confirmada, listo para ``cargar_artefacto``."""
+
+        return None if self.version == 0 else self.directorio / f"v{self.version:05d}"
+
+    def aprender(
+        self, df: pd.DataFrame, *, filas_por_lote: int = FILAS_POR_LOTE
+    ) -> int:
+        """Evalúa y aprende de las filas de ``df`` posteriores al último checkpoint.
+
+        ``df`` debe venir limpio (``cargar_dataframe_limpio`` o un bloque
+        equivalente). No escribe nada en disco; devuelve las filas usadas.
+        """
+
+        nuevas = df if self._corte is None else df[df[self.timestamp_col] > self._corte]
+        if nuevas.empty:
+            return 0
+        nuevas = nuevas.sort_values(self.timestamp_col)
+        # DataFrame, como en ``dividir_y_escalar``: el scaler guarda los nombres.
+        X = nuevas[self.features].astype(np.float64)
+        y = nuevas[self.target_col].to_numpy()
+
+        for inicio in range(0, len(nuevas), filas_por_lote):
+            X_lote = X.iloc[inicio : inicio + filas_por_lote]
+            y_lote = y[inicio : inicio + filas_por_lote]
+            if self.filas_vistas + self._pendientes > 0:
+                self._y_evaluados.append(y_lote)
+                self._predichos.append(
+                    self.modelo.predict(self.scaler.transform(X_lote))
+                )
+            self.scaler.partial_fit(X_lote)
+            argumentos = {"classes": self.clases} if self.clases is not None else {}
+            self.modelo.partial_fit(self.scaler.transform(X_lote), y_lote, **argumentos)
+            self._pendientes += len(X_lote)
+
+        ultimo = nuevas[self.timestamp_col].iloc[-1]
+        if self.ultimo_timestamp is None or ultimo > self.ultimo_timestamp:
+            self.ultimo_timestamp = ultimo
+        return len(nuevas)
+
+    def guardar(self) -> ResumenActualizacion:
+        """Confirma lo aprendido como una versión nueva y reinicia los contadores.
+
+        El artefacto se escribe en su propio directorio y ``estado.json`` se
+        reemplaza al final: una interrupción deja vigente la versión anterior.
+        Sin filas nuevas no se escribe nada.
+        """
+
+        evaluados = (
+            float(
+                self.metrica(
+                    np.concatenate(self._y_evaluados), np.concatenate(self._predichos)
+                )
+            )
+            if self._y_evaluados
+            else float("nan")
+        )
+        filas_nuevas = self._pendientes
+        if filas_nuevas:
+            anterior = self.ruta_artefacto
+            self.filas_vistas += filas_nuevas
+            self.version += 1
+            guardar_artefacto(
+                self.ruta_artefacto,
+                self.modelo,
+                self.scaler,
+                features=self.features,
+                target_col=self.target_col,
+                metadatos={
+                    "clases": self.clases,
+                    "extra": self.metadatos,
+                    "ultimo_timestamp": self.ultimo_timestamp.isoformat(),
+                    "filas_vistas": self.filas_vistas,
+                },
+            )
+            estado = {
+                "version": self.version,
+                "artefacto": self.ruta_artefacto.name,
+                "ultimo": self.ultimo_timestamp.isoformat(),
+                "filas_vistas": self.filas_vistas,
+                "posiciones": self.posiciones,
+            }
+            temporal = self._ruta_estado.with_suffix(f".{os.getpid()}.tmp")
+            temporal.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+            temporal.replace(self._ruta_estado)
+            if anterior is not None:
+                shutil.rmtree(anterior, ignore_errors=True)
+
+        resumen = ResumenActualizacion(
+            filas_nuevas=filas_nuevas,
+            filas_vistas=self.filas_vistas,
+            ultimo_timestamp=self.ultimo_timestamp,
+            metrica=evaluados,
+            version=self.version,
+            segundos=time.perf_counter() - self._inicio,
+        )
+        self._corte = self.ultimo_timestamp
+        self._pendientes = 0
+        self._y_evaluados, self._predichos = [], []
+        self._inicio = time.perf_counter()
+        return resumen
+
+    def actualizar(
+        self, df: pd.DataFrame, *, filas_por_lote: int = FILAS_POR_LOTE
+    ) -> ResumenActualizacion:
+        """``aprender`` + ``guardar`` en una sola llamada."""
+
+        self.aprender(df, filas_por_lote=filas_por_lote)
+        return self.guardar()
+
+
+class _Tramo(io.RawIOBase):
+    """Vista de solo lectura de los próximos ``restantes`` bytes de ``archivo``."""
+
+    def __init__(self, archivo: IO[bytes], restantes: int) -> None:
+        self._archivo = archivo
+        self._restantes = restantes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino: Any) -> int:
+        leidos = self._archivo.readinto(
+            memoryview(destino)[: min(len(destino), self._restantes)]
+        )
+        self._restantes -= leidos
+        return leidos
+
+
+def _fin_lineas_completas(archivo: IO[bytes], tamano: int) -> int:
+    """Posición tras el último salto de línea: una fila a medio escribir no se lee."""
+
+    fin = tamano
+    while fin > 0:
+        archivo.seek(max(fin - 65_536, 0))
+        trozo = archivo.read(fin - max(fin - 65_536, 0))
+        salto = trozo.rfind(b"\n")
+        if salto >= 0:
+            return fin - len(trozo) + salto + 1
+        fin -= len(trozo)
+    return 0
+
+
+def mediana_limpia(
+    ruta: str | Path = DATA_PATH,
+    columna: str = TARGET,
+    *,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> float:
+    """Mediana de ``columna`` sobre las filas que sobreviven a la limpieza.
+
+    Solo se acumula esa columna, no el DataFrame completo.
+    """
+
+    valores = [
+        bloque[columna].to_numpy(dtype=np.float64)
+        for bloque in _bloques_limpios(Path(ruta), filas_por_bloque)
+    ]
+    if not valores:
+        raise ValueError(f"{ruta} no tiene filas válidas tras la limpieza.")
+    return float(np.median(np.concatenate(valores)))
+
+
+def actualizar_desde_archivo(
+    modelo: ModeloIncremental,
+    ruta: str | Path = DATA_PATH,
+    *,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    filas_por_lote: int = FILAS_POR_LOTE,
+    transformar: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+) -> ResumenActualizacion:
+    """Lee por bloques limpios lo añadido al CSV desde el checkpoint, aprende y guarda.
+
+    El archivo se trata como de solo anexado: se continúa desde el byte
+    guardado en el checkpoint y solo hasta la última línea completa. Si el
+    archivo es más corto que esa posición (se reescribió), se lee desde el
+    principio y el corte por ``timestamp`` descarta lo ya aprendido. La memoria
+    queda acotada por ``filas_por_bloque``. ``transformar`` permite derivar
+    columnas por bloque (p. ej. el target de clasificación).
+    """
+
+    ruta = Path(ruta)
+    clave = str(ruta.resolve())
+    with ruta.open("rb") as archivo:
+        cabecera = archivo.readline()
+        fin = _fin_lineas_completas(archivo, ruta.stat().st_size)
+        inicio = modelo.posiciones.get(clave, 0)
+        if not len(cabecera) <= inicio <= fin:
+            inicio = len(cabecera)
+
+        if inicio < fin:
+            columnas = pd.read_csv(io.BytesIO(cabecera), nrows=0).columns
+            archivo.seek(inicio)
+            tramo = io.BufferedReader(_Tramo(archivo, fin - inicio))
+            bloques = _bloques_limpios(
+                tramo, filas_por_bloque, header=None, names=list(columnas)
+            )
+            for bloque in bloques:
+                if transformar is not None:
+                    bloque = transformar(bloque)
+                modelo.aprender(bloque, filas_por_lote=filas_por_lote)
+    # Se confirma junto con el modelo: si ``guardar`` no llega a escribir, la
+    # próxima ejecución vuelve a leer este tramo.
+    modelo.posiciones[clave] = fin
+    return modelo.guardar()
+
+
+__all__ = [
+    "INCREMENTAL_DIR",
+    "ModeloIncremental",
+    "ResumenActualizacion",
+    "actualizar_desde_archivo",
+    "mediana_limpia",
+]
@@ -0,0 +1,230 @@
+"""Artefactos persistidos: scaler + modelo ajustados y metadatos del esquema.
+
+Cada artefacto es un directorio con una subcarpeta por versión guardada y
+``actual.json``, que apunta a la vigente. Cada versión contiene:
+
+- ``modelo.joblib``: ``{"scaler": ..., "modelo": ...}`` guardado sin compresión,
+  de modo que ``joblib.load(..., mmap_mode="r")`` mapea en memoria los arreglos
+  NumPy que el estimador guarda como atributos (p. ej. el conjunto de
+  entrenamiento de KNN o el índice de ``ClasificadorVecinosIVF``) y varios
+  procesos que cargan el mismo artefacto comparten esas páginas. Los nodos de
+  los árboles no se mapean: ``Tree.__setstate__`` de scikit-learn los copia.
+- ``metadatos.json``: features, dtypes, target, clase del estimador y versiones
+  de las librerías con las que se entrenó.
+
+Guardar escribe una versión nueva y reemplaza ``actual.json`` con un
+``rename`` atómico: un lector concurrente (o una interrupción) ve siempre la
+versión anterior completa o la nueva, nunca un directorio a medias.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+from typing import Any, Dict, List, Mapping
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import BaseEstimator, clone
+from sklearn.preprocessing import StandardScaler
+
+from .preprocesamiento_seguro import (
+    ESQUEMA,
+    FEATURES,
+    RAIZ_PROYECTO,
+    TARGET,
+    dividir_y_escalar,
+)
+
+ARTEFACTOS_DIR = RAIZ_PROYECTO / ".cache" / "artefactos"
+ARCHIVO_MODELO = "modelo.joblib"
+ARCHIVO_METADATOS = "metadatos.json"
+ARCHIVO_ACTUAL = "actual.json"
+# Versiones que se conservan: la vigente y la anterior, por si un lector
+# resolvió el puntero justo antes del cambio.
+VERSIONES_CONSERVADAS = 2
+
+
+@dataclass(frozen=True)
+class Artefacto:
+    scaler: StandardScaler
+    modelo: BaseEstimator
+    metadatos: Dict[str, Any]
+
+    @property
+    def features(self) -> List[str]:
+        return list(self.metadatos["features"])
+
+    def predecir(self, df: pd.DataFrame) -> np.ndarray:
+        """Escala ``df[features]`` con el scaler de entrenamiento y predice."""
+
+        faltantes = [c for c in self.features if c not in df.columns]
+        if faltantes:
+            raise KeyError(
+                f"Columnas ausentes en el DataFrame: {', '.join(faltantes)}."
+            )
+        X = df[self.features].astype(self.metadatos["dtype"])
+        return self.modelo.predict(self.scaler.transform(X))
+
+    def predecir_matriz(self, X: np.ndarray) -> np.ndarray:
+        """Predice sobre una matriz con las columnas en el orden de ``features``.
+
+        Evita pandas en el camino caliente: aplica la misma transformación que
+        ``StandardScaler.transform`` con ``mean_`` y ``scale_`` ya ajustados.
+        Las features que el esquema de entrenamiento guarda con menos precisión
+        (p. ej. ``float32``) se redondean igual, para que valores crudos en
+        ``float64`` no caigan al otro lado de un umbral del modelo.
+        """
+
+        X = np.array(X, dtype=self.metadatos["dtype"])
+        for i, feature in enumerate(self.features):
+            tipo = self.metadatos["esquema"].get(feature, "")
+            if tipo.startswith("float") and np.dtype(tipo).itemsize < X.itemsize:
+                X[:, i] = X[:, i].astype(tipo)
+        if self.scaler.with_mean:
+            X = X - self.scaler.mean_
+        if self.scaler.with_std:
+            X = X / self.scaler.scale_
+        return self.modelo.predict(X)
+
+
+def resolver_artefacto(origen: str | Path) -> Path:
+    """Directorio de la versión vigente de ``origen``.
+
+    Un directorio sin ``actual.json`` (formato anterior, sin versiones) se
+    devuelve tal cual.
+    """
+
+    origen = Path(origen)
+    puntero = origen / ARCHIVO_ACTUAL
+    if not puntero.exists():
+        return origen
+    return origen / json.loads(puntero.read_text(encoding="utf-8"))["version"]
+
+
+def _podar_versiones(destino: Path, vigente: str) -> None:
+    versiones = sorted(
+        carpeta.name
+        for carpeta in destino.iterdir()
+        if carpeta.is_dir()
+        and carpeta.name.startswith("v")
+        and carpeta.suffix != ".tmp"
+    )
+    conservadas = set(versiones[-VERSIONES_CONSERVADAS:]) | {vigente}
+    for nombre in versiones:
+        if nombre not in conservadas:
+            shutil.rmtree(destino / nombre, ignore_errors=True)
+    # Archivos del formato anterior, ya reemplazados por las versiones.
+    for nombre in (ARCHIVO_MODELO, ARCHIVO_METADATOS):
+        (destino / nombre).unlink(missing_ok=True)
+
+
+def guardar_artefacto(
+    destino: str | Path,
+    modelo: BaseEstimator,
+    scaler: StandardScaler,
+    *,
+    features: List[str] = FEATURES,
+    target_col: str = TARGET,
+    dtype: np.dtype | type = np.float64,
+    metadatos: Mapping[str, Any] | None = None,
+) -> Path:
+    """Guarda una versión nueva y la publica reemplazando ``actual.json``."""
+
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    version = f"v{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}_{os.getpid()}"
+    temporal = destino / f"{version}.tmp"
+    temporal.mkdir()
+    joblib.dump({"scaler": scaler, "modelo": modelo}, temporal / ARCHIVO_MODELO)
+    (temporal / ARCHIVO_METADATOS).write_text(
+        json.dumps(
+            {
+                "estimador": f"{type(modelo).__module__}.{type(modelo).__name__}",
+                "parametros": modelo.get_params(),
+                "features": list(features),
+                "esquema": {c: str(ESQUEMA[c]) for c in features if c in ESQUEMA},
+                "dtype": np.dtype(dtype).name,
+                "target": target_col,
+                "versiones": {
+                    "python": platform.python_version(),
+                    "sklearn": sklearn.__version__,
+                    "numpy": np.__version__,
+                },
+                "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                **(metadatos or {}),
+            },
+            indent=2,
+            default=repr,
+        ),
+        encoding="utf-8",
+    )
+    temporal.rename(destino / version)
+
+    puntero = destino / f"{ARCHIVO_ACTUAL}.{os.getpid()}.tmp"
+    puntero.write_text(json.dumps({"version": version}), encoding="utf-8")
+    puntero.replace(destino / ARCHIVO_ACTUAL)
+    _podar_versiones(destino, version)
+    return destino
+
+
+def cargar_artefacto(origen: str | Path, *, mmap_mode: str | None = "r") -> Artefacto:
+    """Carga la versión vigente; con ``mmap_mode="r"`` los arreglos quedan mapeados.
+
+    Solo se mapean los arreglos NumPy del estimador (ver el docstring del
+    módulo). Si la versión de scikit-learn difiere de la usada al guardar, se
+    lanza ``ValueError``: los estimadores serializados no son portables entre
+    versiones.
+    """
+
+    origen = resolver_artefacto(origen)
+    metadatos = json.loads((origen / ARCHIVO_METADATOS).read_text(encoding="utf-8"))
+    guardada = metadatos["versiones"]["sklearn"]
+    if guardada != sklearn.__version__:
+        raise ValueError(
+            f"El artefacto {origen} se entrenó con scikit-learn {guardada} "
+            f"y está instalada la {sklearn.__version__}; vuelve a entrenarlo."
+        )
+    contenido = joblib.load(origen / ARCHIVO_MODELO, mmap_mode=mmap_mode)
+    return Artefacto(contenido["scaler"], contenido["modelo"], metadatos)
+
+
+def entrenar_y_guardar(
+    df: pd.DataFrame,
+    modelos: Mapping[str, BaseEstimator],
+    target_col: str = TARGET,
+    *,
+    destino: str | Path = ARTEFACTOS_DIR,
+    dtype: np.dtype | type = np.float64,
+) -> Dict[str, Path]:
+    """Ajusta el scaler con el split de ``preparar_matrices`` y guarda un artefacto por modelo."""
+
+    X_train, _, y_train, _, scaler = dividir_y_escalar(df, target_col, dtype=dtype)
+    rutas: Dict[str, Path] = {}
+    for nombre, modelo in modelos.items():
+        ajustado = clone(modelo).fit(X_train, y_train)
+        rutas[nombre] = guardar_artefacto(
+            Path(destino) / nombre,
+            ajustado,
+            scaler,
+            target_col=target_col,
+            dtype=dtype,
+        )
+    return rutas
+
+
+__all__ = [
+    "ARTEFACTOS_DIR",
+    "Artefacto",
+    "cargar_artefacto",
+    "entrenar_y_guardar",
+    "guardar_artefacto",
+    "resolver_artefacto",
+]
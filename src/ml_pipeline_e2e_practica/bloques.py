@@ -0,0 +1,143 @@
+"""Lectura y escritura por bloques de archivos CSV/Parquet más grandes que la memoria.
+
+Los tipos se fijan una vez por archivo, no por bloque: ``read_csv`` deduce
+``float64`` para una columna vacía en un bloque y texto en el siguiente, y el
+esquema Parquet del primer bloque tiene que servir para todos los demás. Es
+la única implementación: ``anonimizar_datos.bloques`` la reutiliza.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping
+
+import pandas as pd
+
+EXTENSIONES_PARQUET = (".parquet", ".pq")
+FILAS_POR_BLOQUE = 100_000
+
+
+def _es_parquet(ruta: Path) -> bool:
+    return ruta.suffix.lower() in EXTENSIONES_PARQUET
+
+
+def leer_en_bloques(
+    ruta: str | Path,
+    *,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    tipos: Mapping[str, object] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Itera el archivo en DataFrames de como máximo ``filas_por_bloque`` filas.
+
+    Las columnas de ``tipos`` se convierten a su tipo en todos los bloques; en
+    CSV el resto se lee como texto (un documento ``"007"`` no pierde los
+    ceros). Con enteros conviene un tipo con nulos (``"Int64"``) para que un
+    bloque con huecos no pase a ``float64``. El texto de los Parquet se entrega
+    en Arrow, sin crear objetos de Python por fila.
+    """
+
+    if filas_por_bloque <= 0:
+        raise ValueError("filas_por_bloque debe ser mayor que cero.")
+
+    ruta = Path(ruta)
+    if not ruta.exists():
+        raise FileNotFoundError(f"No se encontró el archivo de entrada {ruta}.")
+    tipos = dict(tipos or {})
+
+    if _es_parquet(ruta):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        texto_arrow = {
+            pa.string(): pd.StringDtype("pyarrow"),
+            pa.large_string(): pd.StringDtype("pyarrow"),
+        }
+        archivo = pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=filas_por_bloque):
+            bloque = lote.to_pandas(types_mapper=texto_arrow.get)
+            yield bloque.astype(
+                {columna: tipo for columna, tipo in tipos.items() if columna in bloque}
+            )
+    else:
+        dtype = defaultdict(lambda: str, tipos)
+        with pd.read_csv(ruta, chunksize=filas_por_bloque, dtype=dtype) as lector:
+            yield from lector
+
+
+class EscritorBloques:
+    """Escribe bloques de forma incremental en CSV o Parquet según la extensión.
+
+    Se escribe en ``<ruta>.tmp`` y solo al cerrar sin errores se reemplaza
+    ``ruta``: un fallo a mitad no deja un archivo truncado. El esquema Parquet
+    se fija con el primer bloque (``columnas_texto`` y las columnas sin ningún
+    valor, de tipo ``null``, se declaran como texto) y los bloques siguientes
+    se convierten a él.
+    """
+
+    def __init__(self, ruta: str | Path, *, columnas_texto: Iterable[str] = ()) -> None:
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._temporal = self.ruta.with_name(self.ruta.name + ".tmp")
+        self._columnas_texto = list(columnas_texto)
+        self._escritor_parquet = None
+        self._esquema = None
+        self._con_cabecera = True
+
+    def escribir(self, bloque: pd.DataFrame) -> None:
+        # Las columnas categóricas cambian de categorías entre bloques: se escriben como texto.
+        for columna in self._columnas_texto:
+            if isinstance(bloque[columna].dtype, pd.CategoricalDtype):
+                bloque[columna] = bloque[columna].astype(object)
+
+        if not _es_parquet(self.ruta):
+            bloque.to_csv(
+                self._temporal,
+                mode="w" if self._con_cabecera else "a",
+                header=self._con_cabecera,
+                index=False,
+            )
+            self._con_cabecera = False
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+        if self._esquema is None:
+            esquema = tabla.schema
+            for indice, campo in enumerate(esquema):
+                if campo.name in self._columnas_texto or pa.types.is_null(campo.type):
+                    esquema = esquema.set(indice, pa.field(campo.name, pa.string()))
+            self._esquema = esquema.remove_metadata()
+            self._escritor_parquet = pq.ParquetWriter(self._temporal, self._esquema)
+        self._escritor_parquet.write_table(
+            tabla.select(self._esquema.names).cast(self._esquema)
+        )
+
+    def cerrar(self, *, confirmar: bool = True) -> None:
+        """Cierra el archivo y lo publica en ``ruta`` (o lo descarta si no se confirma)."""
+
+        if self._escritor_parquet is not None:
+            self._escritor_parquet.close()
+            self._escritor_parquet = None
+        if not self._temporal.exists():
+            return
+        if confirmar:
+            self._temporal.replace(self.ruta)
+        else:
+            self._temporal.unlink()
+
+    def __enter__(self) -> EscritorBloques:
+        return self
+
+    def __exit__(self, tipo_error: type | None, *_: object) -> None:
+        self.cerrar(confirmar=tipo_error is None)
+
+
+__all__ = [
+    "EXTENSIONES_PARQUET",
+    "EscritorBloques",
+    "FILAS_POR_BLOQUE",
+    "leer_en_bloques",
+]
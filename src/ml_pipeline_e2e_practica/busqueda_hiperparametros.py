@@ -0,0 +1,341 @@
+"""Búsqueda de hiperparámetros por *successive halving* con presupuesto y reanudación.
+
+La búsqueda parte de ``n_configuraciones`` candidatos muestreados del espacio
+y avanza por rondas: en cada ronda solo sobrevive la mejor fracción ``1/eta``,
+que recibe ``eta`` veces más filas de entrenamiento y más pliegos. Las
+matrices salen de ``PliegosCV`` (preprocesadas y cacheadas una sola vez).
+
+Cada evaluación se añade a un registro JSONL en cuanto termina; al volver a
+llamar con la misma ruta y la misma definición se reutilizan las evaluaciones
+registradas, de modo que una ejecución interrumpida (o sin presupuesto)
+continúa donde se quedó.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+import hashlib
+import json
+import math
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.model_selection import ParameterSampler
+
+from .preprocesamiento_seguro import RAIZ_PROYECTO
+from .validacion_cruzada import PliegosCV
+
+BUSQUEDAS_DIR = RAIZ_PROYECTO / ".cache" / "busquedas"
+ETA = 3
+FILAS_MINIMAS = 200
+
+Metrica = Callable[[np.ndarray, np.ndarray], float]
+_Clave = Tuple[int, int, int]  # (configuración, ronda, pliego)
+
+
+@dataclass(frozen=True)
+class ResultadoBusqueda:
+    mejores_parametros: Dict[str, Any]
+    mejor_puntaje: float
+    evaluaciones: pd.DataFrame
+    completada: bool
+
+
+def _a_json(valor: Any) -> Any:
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _configuraciones(
+    espacio: Mapping[str, Any], n: int, random_state: int
+) -> List[Dict[str, Any]]:
+    return [
+        {clave: _a_json(valor) for clave, valor in parametros.items()}
+        for parametros in ParameterSampler(espacio, n, random_state=random_state)
+    ]
+
+
+def _rondas(n_configuraciones: int, n_pliegos: int, eta: int) -> List[Dict[str, Any]]:
+    """Supervivientes, fracción de filas y pliegos de cada ronda."""
+
+    # floor(log_eta(n)) con enteros: ``math.log(243, 3)`` da 4.999... y perdería una ronda.
+    ultima, restantes = 0, max(n_configuraciones, 1)
+    while restantes >= eta:
+        restantes //= eta
+        ultima += 1
+    rondas = []
+    for ronda in range(ultima + 1):
+        fraccion = float(eta ** (ronda - ultima))
+        rondas.append(
+            {
+                "configuraciones": max(math.ceil(n_configuraciones / eta**ronda), 1),
+                "fraccion": fraccion,
+                # Los últimos pliegos tienen más historia: son los que se conservan.
+                "pliegos": list(
+                    range(n_pliegos)[-max(math.ceil(n_pliegos * fraccion), 1) :]
+                ),
+            }
+        )
+    return rondas
+
+
+def _evaluar(
+    modelo: BaseEstimator,
+    parametros: Dict[str, Any],
+    pliegos: PliegosCV,
+    pliego: int,
+    fraccion: float,
+    metrica: Metrica,
+) -> Tuple[float, int, float]:
+    X_train, X_test, y_train, y_test = pliegos.cargar(pliego)
+    # Las filas más recientes del entrenamiento son las más cercanas al pliego de prueba.
+    filas = min(len(X_train), max(FILAS_MINIMAS, math.ceil(len(X_train) * fraccion)))
+    inicio = time.perf_counter()
+    try:
+        estimador = clone(modelo).set_params(**parametros)
+        estimador.fit(X_train[-filas:], y_train[-filas:])
+        puntaje = float(metrica(y_test, estimador.predict(X_test)))
+    except ValueError:
+        # Configuración inválida para este tamaño (p. ej. más vecinos que filas).
+        puntaje = float("nan")
+    return puntaje, filas, time.perf_counter() - inicio
+
+
+class _Registro:
+    """Registro JSONL: una cabecera con la firma y una línea por evaluación."""
+
+    def __init__(self, ruta: Path, firma: str) -> None:
+        self.ruta = ruta
+        self.evaluaciones: Dict[_Clave, Dict[str, Any]] = {}
+        if ruta.exists():
+            with ruta.open(encoding="utf-8") as archivo:
+                lineas = [json.loads(linea) for linea in archivo if linea.strip()]
+            if lineas and lineas[0].get("firma") != firma:
+                raise ValueError(
+                    f"El registro {ruta} pertenece a otra búsqueda; usa otra ruta."
+                )
+            for linea in lineas[1:]:
+                clave = (linea["configuracion"], linea["ronda"], linea["pliego"])
+                self.evaluaciones[clave] = linea
+        else:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(json.dumps({"firma": firma}) + "\n", encoding="utf-8")
+
+    def agregar(self, evaluacion: Dict[str, Any]) -> None:
+        clave = (evaluacion["configuracion"], evaluacion["ronda"], evaluacion["pliego"])
+        self.evaluaciones[clave] = evaluacion
+        with self.ruta.open("a", encoding="utf-8") as archivo:
+            archivo.write(json.dumps(evaluacion) + "\n")
+
+
+def buscar_hiperparametros(
+    modelo: BaseEstimator,
+    espacio: Mapping[str, Any],
+    pliegos: PliegosCV,
+    *,
+    metrica: Metrica,
+    mayor_es_mejor: bool,
+    n_configuraciones: int = 27,
+    eta: int = ETA,
+    presupuesto_segundos: float | None = None,
+    procesos: int | None = None,
+    ruta: str | Path | None = None,
+    random_state: int = 42,
+) -> ResultadoBusqueda:
+    """Ejecuta (o reanuda) la búsqueda y devuelve la mejor configuración hasta ahora.
+
+    ``espacio`` sigue el formato de ``ParameterSampler`` (listas o
+    distribuciones de ``scipy.stats``). Cuando se agota ``presupuesto_segundos``
+    no se lanzan más evaluaciones y el resultado queda con
+    ``completada=False``; lo ya evaluado está en el registro para reanudar.
+    """
+
+    if eta < 2:
+        raise ValueError("eta debe ser mayor o igual a dos.")
+
+    configuraciones = _configuraciones(espacio, n_configuraciones, random_state)
+    rondas = _rondas(len(configuraciones), pliegos.n_pliegos, eta)
+    firma = hashlib.sha256(
+        json.dumps(
+            {
+                "modelo": repr(modelo),
+                "configuraciones": configuraciones,
+                "eta": eta,
+                "pliegos": str(pliegos.directorio),
+                "metrica": getattr(metrica, "__name__", repr(metrica)),
+            },
+            sort_keys=True,
+            default=repr,
+        ).encode("utf-8")
+    ).hexdigest()[:16]
+    ruta = (
+        Path(ruta) if ruta else BUSQUEDAS_DIR / f"{type(modelo).__name__}_{firma}.jsonl"
+    )
+    registro = _Registro(ruta, firma)
+
+    limite = (
+        None
+        if presupuesto_segundos is None
+        else time.monotonic() + presupuesto_segundos
+    )
+    signo = -1.0 if mayor_es_mejor else 1.0
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos != 1 else None
+    completada = True
+    candidatos = list(range(len(configuraciones)))
+    try:
+        for numero, ronda in enumerate(rondas):
+            pendientes = [
+                (c, pliego)
+                for c in candidatos
+                for pliego in ronda["pliegos"]
+                if (c, numero, pliego) not in registro.evaluaciones
+            ]
+            if not _ejecutar_ronda(
+                pendientes,
+                numero,
+                ronda["fraccion"],
+                modelo,
+                configuraciones,
+                pliegos,
+                metrica,
+                registro,
+                pool,
+                limite,
+            ):
+                completada = False
+                break
+
+            puntajes = {
+                c: np.mean(
+                    [
+                        registro.evaluaciones[(c, numero, p)]["puntaje"]
+                        for p in ronda["pliegos"]
+                    ]
+                )
+                for c in candidatos
+            }
+            # NaN (configuración fallida) siempre queda al final.
+            candidatos = sorted(
+                candidatos,
+                key=lambda c: (
+                    np.isnan(puntajes[c]),
+                    signo * np.nan_to_num(puntajes[c]),
+                ),
+            )
+            if numero + 1 < len(rondas):
+                candidatos = candidatos[: rondas[numero + 1]["configuraciones"]]
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=completada, cancel_futures=True)
+
+    evaluaciones = pd.DataFrame(list(registro.evaluaciones.values()))
+    return _mejor(evaluaciones, configuraciones, rondas, signo, completada)
+
+
+def _ejecutar_ronda(
+    pendientes: List[Tuple[int, int]],
+    numero: int,
+    fraccion: float,
+    modelo: BaseEstimator,
+    configuraciones: List[Dict[str, Any]],
+    pliegos: PliegosCV,
+    metrica: Metrica,
+    registro: _Registro,
+    pool: ProcessPoolExecutor | None,
+    limite: float | None,
+) -> bool:
+    """Evalúa los pares pendientes; devuelve ``False`` si se agotó el presupuesto."""
+
+    def _registrar(c: int, pliego: int, salida: Tuple[float, int, float]) -> None:
+        puntaje, filas, segundos = salida
+        registro.agregar(
+            {
+                "configuracion": c,
+                "ronda": numero,
+                "pliego": pliego,
+                "parametros": configuraciones[c],
+                "filas": filas,
+                "puntaje": puntaje,
+                "segundos": segundos,
+            }
+        )
+
+    def _restante() -> float | None:
+        return None if limite is None else limite - time.monotonic()
+
+    if pool is None:
+        for c, pliego in pendientes:
+            restante = _restante()
+            if restante is not None and restante <= 0:
+                return False
+            _registrar(
+                c,
+                pliego,
+                _evaluar(
+                    modelo, configuraciones[c], pliegos, pliego, fraccion, metrica
+                ),
+            )
+        return True
+
+    futuros: Dict[Future, Tuple[int, int]] = {
+        pool.submit(
+            _evaluar, modelo, configuraciones[c], pliegos, pliego, fraccion, metrica
+        ): (c, pliego)
+        for c, pliego in pendientes
+    }
+    while futuros:
+        restante = _restante()
+        if restante is not None and restante <= 0:
+            return False
+        listos, _ = wait(futuros, timeout=restante, return_when=FIRST_COMPLETED)
+        for futuro in listos:
+            _registrar(*futuros.pop(futuro), futuro.result())
+    return True
+
+
+def _mejor(
+    evaluaciones: pd.DataFrame,
+    configuraciones: List[Dict[str, Any]],
+    rondas: List[Dict[str, Any]],
+    signo: float,
+    completada: bool,
+) -> ResultadoBusqueda:
+    """Mejor configuración de la ronda más alta con algún candidato completo.
+
+    Solo compiten configuraciones evaluadas en todos los pliegos de esa ronda,
+    para no comparar medias de distinto número de pliegos tras una interrupción.
+    """
+
+    for numero in range(len(rondas) - 1, -1, -1):
+        if evaluaciones.empty:
+            break
+        ronda = evaluaciones[evaluaciones["ronda"] == numero]
+        por_config = ronda.groupby("configuracion")["puntaje"]
+        completas = por_config.count() == len(rondas[numero]["pliegos"])
+        medias = por_config.mean()[completas].dropna()
+        if medias.empty:
+            continue
+        mejor = (signo * medias).idxmin()
+        return ResultadoBusqueda(
+            mejores_parametros=configuraciones[mejor],
+            mejor_puntaje=float(medias[mejor]),
+            evaluaciones=evaluaciones,
+            completada=completada,
+        )
+    return ResultadoBusqueda({}, float("nan"), evaluaciones, completada)
+
+
+__all__ = [
+    "BUSQUEDAS_DIR",
+    "ResultadoBusqueda",
+    "buscar_hiperparametros",
+]
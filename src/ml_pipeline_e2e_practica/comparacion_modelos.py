@@ -0,0 +1,233 @@
+"""Motor compartido para comparar modelos por calidad y por costo de cómputo.
+
+Cada candidato se entrena en un proceso del pool; las matrices ya
+preprocesadas se publican una sola vez en memoria compartida y los
+trabajadores las leen sin copiarlas ni serializarlas. ``fit``, ``predict``
+y la pasada de memoria se ejecutan en paralelo; solo el microbenchmark de
+latencia por lote se mide de a un modelo a la vez (un candado compartido por
+el pool), porque sus milisegundos son los más sensibles a la competencia por
+CPU. Por modelo se reporta:
+
+- la métrica de calidad sobre el set de prueba,
+- el tiempo de ``fit``,
+- la latencia de ``predict`` (p50/p99 por tamaño de lote) y el throughput,
+- la memoria pico de ``fit`` + ``predict`` (medida con ``tracemalloc`` en una
+  pasada aparte para no distorsionar los tiempos).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator, clone
+
+TAMANOS_LOTE = (1, 32, 1024)
+REPETICIONES_LATENCIA = 50
+
+Metrica = Callable[[np.ndarray, np.ndarray], float]
+
+# Candado de cada trabajador del pool; ``None`` en el proceso principal.
+_CANDADO_TIEMPOS: AbstractContextManager | None = None
+
+
+def _inicializar(candado: AbstractContextManager) -> None:
+    global _CANDADO_TIEMPOS
+    _CANDADO_TIEMPOS = candado
+
+
+@dataclass(frozen=True)
+class ResultadoModelo:
+    nombre: str
+    metrica: float
+    segundos_fit: float
+    latencias_ms: Dict[int, Tuple[float, float]]
+    filas_por_segundo: float
+    memoria_pico_mb: float | None
+
+
+@dataclass(frozen=True)
+class _MatrizCompartida:
+    nombre: str
+    forma: Tuple[int, ...]
+    dtype: str
+
+
+def _publicar(arreglo: np.ndarray, segmentos: List[SharedMemory]) -> _MatrizCompartida:
+    arreglo = np.ascontiguousarray(arreglo)
+    segmento = SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+    segmentos.append(segmento)
+    np.ndarray(arreglo.shape, arreglo.dtype, buffer=segmento.buf)[...] = arreglo
+    return _MatrizCompartida(segmento.name, arreglo.shape, arreglo.dtype.str)
+
+
+def _medir(
+    nombre: str,
+    modelo: BaseEstimator,
+    matrices: Sequence[np.ndarray],
+    metrica: Metrica,
+    tamanos_lote: Sequence[int],
+    repeticiones: int,
+    medir_memoria: bool,
+) -> ResultadoModelo:
+    X_train, X_test, y_train, y_test = matrices
+
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    segundos_fit = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    predicciones = modelo.predict(X_test)
+    segundos_predict = time.perf_counter() - inicio
+
+    latencias: Dict[int, Tuple[float, float]] = {}
+    with _CANDADO_TIEMPOS or nullcontext():
+        for tamano in tamanos_lote:
+            tamano = min(tamano, len(X_test))
+            posiciones = max(len(X_test) - tamano + 1, 1)
+            muestras = np.empty(repeticiones)
+            for i in range(repeticiones):
+                desde = (i * tamano) % posiciones
+                lote = X_test[desde : desde + tamano]
+                inicio = time.perf_counter()
+                modelo.predict(lote)
+                muestras[i] = time.perf_counter() - inicio
+            p50, p99 = np.percentile(muestras * 1_000, [50, 99])
+            latencias[tamano] = (float(p50), float(p99))
+
+    memoria = None
+    if medir_memoria:
+        tracemalloc.start()
+        clone(modelo).fit(X_train, y_train).predict(X_test)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memoria = pico / 1e6
+
+    return ResultadoModelo(
+        nombre=nombre,
+        metrica=float(metrica(y_test, predicciones)),
+        segundos_fit=segundos_fit,
+        latencias_ms=latencias,
+        filas_por_segundo=(
+            len(X_test) / segundos_predict if segundos_predict else float("inf")
+        ),
+        memoria_pico_mb=memoria,
+    )
+
+
+def _evaluar_en_proceso(
+    nombre: str,
+    modelo: BaseEstimator,
+    descriptores: Sequence[_MatrizCompartida],
+    metrica: Metrica,
+    tamanos_lote: Sequence[int],
+    repeticiones: int,
+    medir_memoria: bool,
+) -> ResultadoModelo:
+    segmentos = [SharedMemory(name=d.nombre, track=False) for d in descriptores]
+    try:
+        # Vistas de solo lectura: el modelo no puede alterar los datos de los demás.
+        matrices = []
+        for descriptor, segmento in zip(descriptores, segmentos):
+            vista = np.ndarray(
+                descriptor.forma, np.dtype(descriptor.dtype), buffer=segmento.buf
+            )
+            vista.flags.writeable = False
+            matrices.append(vista)
+        resultado = _medir(
+            nombre,
+            modelo,
+            matrices,
+            metrica,
+            tamanos_lote,
+            repeticiones,
+            medir_memoria,
+        )
+        # Algunos modelos (p. ej. KNN) guardan una vista de X_train: se liberan
+        # antes de cerrar los segmentos.
+        del matrices, vista, modelo
+        return resultado
+    finally:
+        for segmento in segmentos:
+            segmento.close()
+
+
+def comparar_modelos(
+    modelos: Mapping[str, BaseEstimator],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: np.ndarray,
+    y_test: np.ndarray,
+    *,
+    metrica: Metrica,
+    procesos: int | None = None,
+    tamanos_lote: Sequence[int] = TAMANOS_LOTE,
+    repeticiones: int = REPETICIONES_LATENCIA,
+    medir_memoria: bool = True,
+) -> List[ResultadoModelo]:
+    """Entrena y mide cada modelo, en paralelo si hay más de un proceso disponible.
+
+    Con ``procesos=1`` todo se ejecuta en el proceso actual (útil para depurar).
+    Los resultados mantienen el orden de ``modelos``.
+    """
+
+    matrices = [np.asarray(m) for m in (X_train, X_test, y_train, y_test)]
+    opciones = (metrica, tuple(tamanos_lote), repeticiones, medir_memoria)
+
+    if procesos == 1 or len(modelos) <= 1:
+        return [
+            _medir(nombre, clone(modelo), matrices, *opciones)
+            for nombre, modelo in modelos.items()
+        ]
+
+    segmentos: List[SharedMemory] = []
+    try:
+        descriptores = [_publicar(m, segmentos) for m in matrices]
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_inicializar,
+            initargs=(multiprocessing.Lock(),),
+        ) as pool:
+            futuros = [
+                pool.submit(
+                    _evaluar_en_proceso, nombre, clone(modelo), descriptores, *opciones
+                )
+                for nombre, modelo in modelos.items()
+            ]
+            return [futuro.result() for futuro in futuros]
+    finally:
+        for segmento in segmentos:
+            segmento.close()
+            segmento.unlink()
+
+
+def imprimir_resultados(resultados: Sequence[ResultadoModelo], metrica: str) -> None:
+    """Tabla de calidad y costo: métrica, fit, latencias p50/p99, throughput y memoria."""
+
+    for r in resultados:
+        latencias = ", ".join(
+            f"lote {tamano}: {p50:.2f}/{p99:.2f} ms"
+            for tamano, (p50, p99) in r.latencias_ms.items()
+        )
+        memoria = (
+            "" if r.memoria_pico_mb is None else f" | pico {r.memoria_pico_mb:.1f} MB"
+        )
+        print(
+            f"- {r.nombre}: {metrica} {r.metrica:.4f} | fit {r.segundos_fit * 1_000:.1f} ms"
+            f" | predict p50/p99 ({latencias})"
+            f" | {r.filas_por_segundo:,.0f} filas/s{memoria}"
+        )
+
+
+__all__ = [
+    "ResultadoModelo",
+    "comparar_modelos",
+    "imprimir_resultados",
+]
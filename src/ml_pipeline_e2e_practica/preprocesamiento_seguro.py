@@ -2,20 +2,53 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
+import hashlib
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import IO, Dict, Iterator, Tuple
 
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
-DATA_PATH = (
-    Path(__file__).resolve().parent.parent.parent / "data" / "bike_sharing_demand.csv"
-)
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent.parent
+DATA_PATH = RAIZ_PROYECTO / "data" / "bike_sharing_demand.csv"
+CACHE_DIR = RAIZ_PROYECTO / ".cache" / "dataset"
+FORMATO_TIMESTAMP = "%d-%m-%Y %H:%M"
+# Incrementar cuando cambie `_limpiar`: invalida las instantáneas guardadas.
+VERSION_LIMPIEZA = 3
 FEATURES = ["temp", "humidity", "windspeed", "hour", "is_weekend"]
 TARGET = "demand"
 
+# Esquema declarado del dataset limpio. Las categorías se fijan explícitamente
+# para que el dtype sea idéntico entre archivos, instantáneas y bloques. Las
+# mediciones de sensores caben en float32; el objetivo se queda en float64.
+ESQUEMA: Dict[str, object] = {
+    "id": "int32",
+    "season": pd.CategoricalDtype(["spring", "summer", "fall", "winter"]),
+    "holiday": "bool",
+    "workingday": "bool",
+    "weather": pd.CategoricalDtype(
+        [
+            "Clear or partly cloudy",
+            "Mist",
+            "Light snow or rain",
+            "heavy rain/ice pellets/snow + fog",
+        ]
+    ),
+    "temp": "float32",
+    "temp_feel": "float32",
+    "humidity": "float32",
+    "windspeed": "float32",
+    "demand": "float64",
+    "hour": "int8",
+    "is_weekend": "bool",
+}
+FILAS_POR_BLOQUE = 100_000
+MATRICES_DIR = RAIZ_PROYECTO / ".cache" / "matrices"
+
 
 def _validar_dataset() -> None:
     if not DATA_PATH.exists():
@@ -25,32 +58,164 @@ def _validar_dataset() -> None:
         )
 
 
-def cargar_dataframe_limpio() -> pd.DataFrame:
-    """Carga el CSV y aplica las transformaciones seguras compartidas."""
+def _leer_csv(ruta: Path | IO[bytes], **opciones: object) -> pd.DataFrame:
+    """Lee el CSV con ``id`` como entero y las banderas ``Yes``/``No`` como booleanos.
 
-    _validar_dataset()
-    df = pd.read_csv(DATA_PATH, parse_dates=["timestamp"])
-    df["timestamp"] = pd.to_datetime(df["timestamp"], dayfirst=True, errors="coerce")
+    Las categorías se leen como texto: ``_compactar`` las valida antes de
+    convertirlas, para que una etiqueta desconocida no se vuelva ``NaN``.
+    """
+
+    dtypes = {
+        columna: dtype
+        for columna, dtype in ESQUEMA.items()
+        if str(dtype).startswith(("int16", "int32", "int64"))
+    }
+    return pd.read_csv(
+        ruta, dtype=dtypes, true_values=["Yes"], false_values=["No"], **opciones
+    )
+
+
+def _validar_conversion(serie: pd.Series, dtype: object) -> None:
+    """Rechaza los valores que ``astype(dtype)`` convertiría sin avisar.
+
+    ``astype(bool)`` vuelve ``True`` un nulo y un ``CategoricalDtype`` vuelve
+    ``NaN`` una etiqueta que no está entre sus categorías.
+    """
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        invalidos = serie[serie.notna() & ~serie.isin(dtype.categories)]
+        if not invalidos.empty:
+            raise ValueError(
+                f"Etiquetas desconocidas en '{serie.name}': "
+                f"{sorted(map(str, invalidos.unique()))}. "
+                "Agrégalas a ESQUEMA e incrementa VERSION_LIMPIEZA."
+            )
+    elif dtype == "bool":
+        invalidos = serie[serie.isna() | ~serie.isin([True, False])]
+        if not invalidos.empty:
+            raise ValueError(
+                f"'{serie.name}' tiene {len(invalidos):,} valores que no son "
+                f"Yes/No (p. ej. {invalidos.iloc[0]!r}); no se puede convertir a bool."
+            )
+
+
+def _compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica ``ESQUEMA`` a las columnas derivadas y a las mediciones.
+
+    Categorías y banderas se validan antes de convertirse (``ValueError`` si
+    hay valores que la conversión alteraría).
+    """
+
+    for columna, dtype in ESQUEMA.items():
+        if columna not in df.columns or df[columna].dtype == dtype:
+            continue
+        _validar_conversion(df[columna], dtype)
+        df[columna] = df[columna].astype(dtype)
+    return df
+
+
+def reporte_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    """Bytes por columna (``deep=True``), dtype y porcentaje del total."""
+
+    memoria = df.memory_usage(deep=True, index=False)
+    reporte = pd.DataFrame(
+        {
+            "dtype": df.dtypes.astype(str),
+            "bytes": memoria,
+            "porcentaje": memoria / memoria.sum() * 100,
+        }
+    )
+    reporte.index.name = "columna"
+    return reporte.sort_values("bytes", ascending=False)
+
+
+def derivar_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Parsea ``timestamp`` y añade ``hour`` e ``is_weekend`` (en sitio).
+
+    Es fila a fila, así que sirve igual para el dataset completo que para
+    bloques de un archivo de scoring. Las fechas inválidas quedan en ``NaT``.
+    """
+
+    df["timestamp"] = pd.to_datetime(
+        df["timestamp"], format=FORMATO_TIMESTAMP, errors="coerce"
+    )
     df["hour"] = df["timestamp"].dt.hour
     df["is_weekend"] = df["timestamp"].dt.dayofweek >= 5
+    return df
+
+
+def _limpiar(df: pd.DataFrame) -> pd.DataFrame:
+    df = derivar_features(df)
 
     columnas_criticas = ["temp", "humidity", "windspeed", TARGET]
     df = df.dropna(subset=columnas_criticas)
     df = df.dropna(subset=["timestamp"])
 
+    return _compactar(df)
+
+
+def _huella_dataset(ruta: Path) -> str:
+    """SHA-256 del contenido del CSV (no de su fecha de modificación)."""
+
+    huella = hashlib.sha256()
+    with ruta.open("rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            huella.update(bloque)
+    return huella.hexdigest()
+
+
+def ruta_snapshot() -> Path:
+    """Instantánea Feather correspondiente al CSV actual y a ``VERSION_LIMPIEZA``."""
+
+    _validar_dataset()
+    huella = _huella_dataset(DATA_PATH)[:16]
+    return CACHE_DIR / f"{DATA_PATH.stem}_{huella}_v{VERSION_LIMPIEZA}.feather"
+
+
+def cargar_dataframe_limpio(*, usar_cache: bool = True) -> pd.DataFrame:
+    """Carga el CSV y aplica las transformaciones seguras compartidas.
+
+    El resultado se guarda como Feather sin comprimir en ``.cache/dataset/``,
+    identificado por el hash del CSV y ``VERSION_LIMPIEZA``; las siguientes
+    llamadas lo leen en lugar de volver a parsear y limpiar el CSV.
+    Sin ``pyarrow`` instalado (o con ``usar_cache=False``) se lee el CSV.
+    """
+
+    _validar_dataset()
+    try:
+        from pyarrow import feather
+    except ImportError:
+        usar_cache = False
+
+    if not usar_cache:
+        return _limpiar(_leer_csv(DATA_PATH))
+
+    ruta = ruta_snapshot()
+    if ruta.exists():
+        # No es cero copias: ``to_pandas`` copia las columnas a bloques de NumPy
+        # escribibles (los llamadores modifican el DataFrame). El ahorro es no
+        # volver a parsear ni limpiar el CSV.
+        return feather.read_table(ruta, memory_map=True).to_pandas()
+
+    df = _limpiar(_leer_csv(DATA_PATH))
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(df, temporal, compression="uncompressed")
+    temporal.replace(ruta)
     return df
 
 
-def preparar_matrices(
+def dividir_y_escalar(
     df: pd.DataFrame,
     target_col: str = TARGET,
     *,
     test_size: float = 0.2,
     random_state: int = 42,
-) -> Tuple[np.ndarray, np.ndarray, pd.Series, pd.Series]:
-    """Genera splits y aplica escalado solo con datos de entrenamiento."""
+    dtype: np.dtype | type = np.float64,
+) -> Tuple[np.ndarray, np.ndarray, pd.Series, pd.Series, StandardScaler]:
+    """Como ``preparar_matrices`` pero devuelve también el scaler ajustado con train."""
 
-    X = df[FEATURES]
+    X = df[FEATURES].astype(dtype)
     y = df[target_col]
 
     X_train, X_test, y_train, y_test = train_test_split(
@@ -61,12 +226,168 @@ def preparar_matrices(
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
 
-    return X_train_scaled, X_test_scaled, y_train, y_test
+    return X_train_scaled, X_test_scaled, y_train, y_test, scaler
+
+
+def preparar_matrices(
+    df: pd.DataFrame,
+    target_col: str = TARGET,
+    *,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    dtype: np.dtype | type = np.float64,
+) -> Tuple[np.ndarray, np.ndarray, pd.Series, pd.Series]:
+    """Genera splits y aplica escalado solo con datos de entrenamiento.
+
+    Las features se convierten a ``dtype`` antes de escalar; con
+    ``dtype=np.float32`` las matrices salen en ``float32`` (``StandardScaler``
+    conserva el tipo) para modelos que lo aceptan.
+    """
+
+    X_train, X_test, y_train, y_test, _ = dividir_y_escalar(
+        df, target_col, test_size=test_size, random_state=random_state, dtype=dtype
+    )
+    return X_train, X_test, y_train, y_test
+
+
+@dataclass(frozen=True)
+class MatricesEnDisco:
+    """Rutas de las matrices ``.npy`` escaladas y el scaler ajustado con train."""
+
+    X_train: Path
+    X_test: Path
+    y_train: Path
+    y_test: Path
+    scaler: StandardScaler
+    filas_train: int
+    filas_test: int
+
+    def cargar(
+        self, mmap_mode: str = "r"
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Abre las cuatro matrices mapeadas en memoria (sin leerlas completas)."""
+
+        return tuple(  # type: ignore[return-value]
+            np.load(ruta, mmap_mode=mmap_mode)
+            for ruta in (self.X_train, self.X_test, self.y_train, self.y_test)
+        )
+
+
+def _bloques_limpios(
+    ruta: Path | IO[bytes], filas_por_bloque: int, **opciones: object
+) -> Iterator[pd.DataFrame]:
+    # Limpiar es fila a fila (parseo, features y ``dropna``): es válido por bloque.
+    with _leer_csv(ruta, chunksize=filas_por_bloque, **opciones) as lector:
+        for bloque in lector:
+            yield _limpiar(bloque)
+
+
+def _es_test(ids: pd.Series, test_size: float, random_state: int) -> np.ndarray:
+    """Asignación determinista por ``id``: no depende del orden ni del tamaño de bloque."""
+
+    huellas = pd.util.hash_pandas_object(
+        ids, index=False, hash_key=f"{random_state:016d}"[-16:]
+    ).to_numpy()
+    return (huellas % 1_000_000) < test_size * 1_000_000
+
+
+def preparar_matrices_por_bloques(
+    ruta: str | Path = DATA_PATH,
+    destino: str | Path = MATRICES_DIR,
+    target_col: str = TARGET,
+    *,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    dtype: np.dtype | type = np.float32,
+) -> MatricesEnDisco:
+    """Versión fuera de memoria de ``preparar_matrices`` para CSV mayores que la RAM.
+
+    Hace dos pasadas por bloques sobre el CSV crudo:
+
+    1. Limpia cada bloque, asigna cada fila a train/test según el hash de su
+       ``id`` y ajusta el scaler con ``partial_fit`` **solo** sobre train.
+    2. Escala cada bloque y lo escribe en ``.npy`` abiertos con ``open_memmap``.
+
+    ``dtype`` se aplica a las features; ``y_*`` conserva el tipo de
+    ``target_col`` tras la limpieza (``demand`` sigue en ``float64``). La
+    partición es reproducible para el mismo ``random_state`` pero no
+    coincide fila a fila con la de ``train_test_split``.
+    """
+
+    if not 0 < test_size < 1:
+        raise ValueError("test_size debe estar entre 0 y 1.")
+
+    ruta = Path(ruta)
+    destino = Path(destino)
+    scaler = StandardScaler()
+    filas = {"train": 0, "test": 0}
+    dtype_target = None
+    for bloque in _bloques_limpios(ruta, filas_por_bloque):
+        # ``_compactar`` fija el tipo según ``ESQUEMA``: es el mismo en todos los bloques.
+        dtype_target = dtype_target or bloque[target_col].to_numpy().dtype
+        test = _es_test(bloque["id"], test_size, random_state)
+        filas["test"] += int(test.sum())
+        filas["train"] += int((~test).sum())
+        if (~test).any():
+            scaler.partial_fit(bloque.loc[~test, FEATURES].to_numpy(dtype=dtype))
+
+    if not filas["train"]:
+        raise ValueError("No quedaron filas de entrenamiento para ajustar el scaler.")
+
+    destino.mkdir(parents=True, exist_ok=True)
+    rutas = {
+        nombre: destino / f"{nombre}.npy"
+        for nombre in ("X_train", "X_test", "y_train", "y_test")
+    }
+    matrices = {
+        f"X_{parte}": np.lib.format.open_memmap(
+            rutas[f"X_{parte}"], mode="w+", dtype=dtype, shape=(n, len(FEATURES))
+        )
+        for parte, n in filas.items()
+    } | {
+        f"y_{parte}": np.lib.format.open_memmap(
+            rutas[f"y_{parte}"], mode="w+", dtype=dtype_target, shape=(n,)
+        )
+        for parte, n in filas.items()
+    }
+
+    posiciones = {"train": 0, "test": 0}
+    for bloque in _bloques_limpios(ruta, filas_por_bloque):
+        test = _es_test(bloque["id"], test_size, random_state)
+        for parte, mascara in (("train", ~test), ("test", test)):
+            n = int(mascara.sum())
+            inicio = posiciones[parte]
+            X = bloque.loc[mascara, FEATURES].to_numpy(dtype=dtype)
+            matrices[f"X_{parte}"][inicio : inicio + n] = scaler.transform(X)
+            matrices[f"y_{parte}"][inicio : inicio + n] = bloque.loc[
+                mascara, target_col
+            ].to_numpy(dtype=dtype_target)
+            posiciones[parte] += n
+
+    for matriz in matrices.values():
+        matriz.flush()
+    del matrices
+
+    return MatricesEnDisco(
+        **rutas,
+        scaler=scaler,
+        filas_train=filas["train"],
+        filas_test=filas["test"],
+    )
 
 
 __all__ = [
+    "CACHE_DIR",
+    "ESQUEMA",
     "FEATURES",
+    "MatricesEnDisco",
     "TARGET",
     "cargar_dataframe_limpio",
+    "derivar_features",
+    "dividir_y_escalar",
     "preparar_matrices",
+    "preparar_matrices_por_bloques",
+    "reporte_memoria",
+    "ruta_snapshot",
 ]
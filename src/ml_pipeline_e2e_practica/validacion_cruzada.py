@@ -0,0 +1,233 @@
+"""Validación cruzada con pliegos preprocesados una sola vez y cacheados en disco.
+
+``preparar_pliegos`` calcula los índices, ajusta un ``StandardScaler`` por
+pliego **solo** con sus filas de entrenamiento y guarda las matrices escaladas
+como ``.npy``. ``validar_modelos`` evalúa todos los pares (modelo, pliego) en
+un pool de procesos; cada trabajador abre las matrices con ``mmap_mode="r"``,
+de modo que comparten la caché de páginas del sistema en vez de recibir copias.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.model_selection import KFold, TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+
+from .preprocesamiento_seguro import FEATURES, RAIZ_PROYECTO, TARGET
+
+PLIEGOS_DIR = RAIZ_PROYECTO / ".cache" / "pliegos"
+N_PLIEGOS = 5
+# Conjuntos de pliegos (uno por huella) que se conservan en ``destino``.
+MAX_EN_CACHE = 4
+# Un ``.tmp`` más viejo que esto quedó de un proceso interrumpido.
+SEGUNDOS_TEMPORAL_HUERFANO = 3_600
+
+Metrica = Callable[[np.ndarray, np.ndarray], float]
+
+
+@dataclass(frozen=True)
+class PliegosCV:
+    """Directorio con ``pliego_<i>/{X_train,X_test,y_train,y_test}.npy``."""
+
+    directorio: Path
+    n_pliegos: int
+    temporal: bool
+
+    def cargar(
+        self, pliego: int, mmap_mode: str | None = "r"
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        carpeta = self.directorio / f"pliego_{pliego}"
+        return tuple(  # type: ignore[return-value]
+            np.load(carpeta / f"{nombre}.npy", mmap_mode=mmap_mode)
+            for nombre in ("X_train", "X_test", "y_train", "y_test")
+        )
+
+
+def _huella(df: pd.DataFrame, columnas: List[str], config: Dict[str, object]) -> str:
+    huella = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8"))
+    huella.update(pd.util.hash_pandas_object(df[columnas], index=False).to_numpy())
+    return huella.hexdigest()[:16]
+
+
+def _indices(
+    n: int, n_pliegos: int, temporal: bool, random_state: int
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    # Temporal: cada pliego entrena con el pasado y evalúa con el bloque siguiente.
+    divisor = (
+        TimeSeriesSplit(n_splits=n_pliegos)
+        if temporal
+        else KFold(n_splits=n_pliegos, shuffle=True, random_state=random_state)
+    )
+    return list(divisor.split(np.empty((n, 1))))
+
+
+def podar_pliegos(destino: str | Path = PLIEGOS_DIR, *, conservar: int = 0) -> int:
+    """Borra los pliegos cacheados menos usados y devuelve cuántos borró.
+
+    Se conservan los ``conservar`` directorios usados más recientemente (la
+    fecha de modificación se renueva en cada reutilización). Los ``.tmp``
+    huérfanos de procesos interrumpidos también se eliminan.
+    """
+
+    destino = Path(destino)
+    if not destino.exists():
+        return 0
+    ahora = time.time()
+    publicados = []
+    borrados = 0
+    for carpeta in destino.iterdir():
+        if not carpeta.is_dir():
+            continue
+        if carpeta.suffix == ".tmp":
+            if ahora - carpeta.stat().st_mtime > SEGUNDOS_TEMPORAL_HUERFANO:
+                shutil.rmtree(carpeta, ignore_errors=True)
+                borrados += 1
+            continue
+        publicados.append(carpeta)
+    publicados.sort(key=lambda carpeta: carpeta.stat().st_mtime, reverse=True)
+    for carpeta in publicados[max(conservar, 0) :]:
+        shutil.rmtree(carpeta, ignore_errors=True)
+        borrados += 1
+    return borrados
+
+
+def preparar_pliegos(
+    df: pd.DataFrame,
+    target_col: str = TARGET,
+    *,
+    n_pliegos: int = N_PLIEGOS,
+    temporal: bool = True,
+    timestamp_col: str = "timestamp",
+    random_state: int = 42,
+    dtype: np.dtype | type = np.float64,
+    destino: str | Path = PLIEGOS_DIR,
+    max_en_cache: int = MAX_EN_CACHE,
+) -> PliegosCV:
+    """Escala y guarda los pliegos de ``df``; si ya existen para los mismos datos, los reutiliza.
+
+    Con ``temporal=True`` las filas se ordenan por ``timestamp_col`` y se usa
+    ``TimeSeriesSplit``, de modo que ningún pliego evalúa con datos anteriores a
+    su entrenamiento. La caché se identifica por el contenido de las columnas
+    usadas y por la configuración; en ``destino`` se conservan los
+    ``max_en_cache`` conjuntos usados más recientemente (ver ``podar_pliegos``).
+    """
+
+    columnas = [*FEATURES, target_col]
+    if temporal:
+        if timestamp_col not in df.columns:
+            raise KeyError(
+                f"La columna '{timestamp_col}' no está presente en el DataFrame."
+            )
+        df = df.sort_values(timestamp_col, kind="stable")
+        columnas.append(timestamp_col)
+
+    config = {
+        "n_pliegos": n_pliegos,
+        "temporal": temporal,
+        "random_state": random_state,
+        "dtype": np.dtype(dtype).str,
+    }
+    directorio = Path(destino) / _huella(df, columnas, config)
+    pliegos = PliegosCV(directorio, n_pliegos, temporal)
+    if directorio.exists():
+        # Marca el uso para que la poda conserve los pliegos vigentes.
+        os.utime(directorio)
+        podar_pliegos(destino, conservar=max_en_cache)
+        return pliegos
+
+    X = df[FEATURES].to_numpy(dtype=dtype)
+    y = df[target_col].to_numpy()
+    temporal_dir = directorio.with_name(f"{directorio.name}.{os.getpid()}.tmp")
+    for i, (train, test) in enumerate(
+        _indices(len(df), n_pliegos, temporal, random_state)
+    ):
+        carpeta = temporal_dir / f"pliego_{i}"
+        carpeta.mkdir(parents=True)
+        scaler = StandardScaler().fit(X[train])
+        np.save(carpeta / "X_train.npy", scaler.transform(X[train]))
+        np.save(carpeta / "X_test.npy", scaler.transform(X[test]))
+        np.save(carpeta / "y_train.npy", y[train])
+        np.save(carpeta / "y_test.npy", y[test])
+
+    try:
+        temporal_dir.rename(directorio)
+    except OSError:
+        # Otro proceso publicó los mismos pliegos mientras se calculaban.
+        shutil.rmtree(temporal_dir)
+    podar_pliegos(destino, conservar=max_en_cache)
+    return pliegos
+
+
+def _evaluar_pliego(
+    nombre: str,
+    modelo: BaseEstimator,
+    pliegos: PliegosCV,
+    pliego: int,
+    metrica: Metrica,
+) -> Dict[str, object]:
+    X_train, X_test, y_train, y_test = pliegos.cargar(pliego)
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    segundos_fit = time.perf_counter() - inicio
+    return {
+        "modelo": nombre,
+        "pliego": pliego,
+        "metrica": float(metrica(y_test, modelo.predict(X_test))),
+        "segundos_fit": segundos_fit,
+    }
+
+
+def validar_modelos(
+    modelos: Mapping[str, BaseEstimator],
+    pliegos: PliegosCV,
+    *,
+    metrica: Metrica,
+    procesos: int | None = None,
+) -> pd.DataFrame:
+    """Evalúa cada par (modelo, pliego) y devuelve una fila por par.
+
+    Con ``procesos=1`` se ejecuta en el proceso actual.
+    """
+
+    pares = [
+        (nombre, clone(modelo), pliegos, pliego, metrica)
+        for nombre, modelo in modelos.items()
+        for pliego in range(pliegos.n_pliegos)
+    ]
+    if procesos == 1:
+        filas = [_evaluar_pliego(*par) for par in pares]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            filas = list(pool.map(_evaluar_pliego, *zip(*pares)))
+    return pd.DataFrame(filas)
+
+
+def resumen_validacion(resultados: pd.DataFrame) -> pd.DataFrame:
+    """Media y desviación de la métrica y tiempo de ``fit`` medio por modelo."""
+
+    return resultados.groupby("modelo", sort=False).agg(
+        media=("metrica", "mean"),
+        desviacion=("metrica", "std"),
+        segundos_fit=("segundos_fit", "mean"),
+    )
+
+
+__all__ = [
+    "PliegosCV",
+    "podar_pliegos",
+    "preparar_pliegos",
+    "resumen_validacion",
+    "validar_modelos",
+]
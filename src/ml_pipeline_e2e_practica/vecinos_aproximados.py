@@ -0,0 +1,193 @@
+"""Clasificador de vecinos cercanos sobre un índice IVF persistente.
+
+``KNeighborsClassifier`` compara cada consulta con el árbol o con todo el
+conjunto de entrenamiento. ``ClasificadorVecinosIVF`` construye una sola vez,
+en ``fit``, un índice de listas invertidas (*inverted file*):
+
+- ``KMeans`` agrupa los puntos de entrenamiento en ``n_listas`` celdas.
+- Los puntos se reordenan para que cada celda quede contigua en un único
+  arreglo (``puntos_``), con sus etiquetas y normas precalculadas.
+
+Una consulta solo mide distancias contra las ``n_sondeos`` celdas cuyo
+centroide está más cerca: ``n_sondeos`` regula el compromiso entre *recall*
+y latencia, y con ``n_sondeos >= n_listas`` la búsqueda es exacta. Si esas
+celdas no suman ``k`` puntos, la consulta se repite duplicando los sondeos
+hasta reunirlos: nunca se vota con menos vecinos de los pedidos. Todo el
+estado ajustado son arreglos de NumPy, así que ``guardar_artefacto`` lo
+persiste tal cual y ``cargar_artefacto(..., mmap_mode="r")`` lo mapea en
+memoria sin reconstruir nada.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.cluster import KMeans
+from sklearn.utils.validation import check_is_fitted, validate_data
+
+
+class ClasificadorVecinosIVF(ClassifierMixin, BaseEstimator):
+    """Votación de los ``n_neighbors`` vecinos más cercanos (pesos uniformes).
+
+    ``n_listas=None`` usa ``√n`` celdas. ``n_sondeos=8`` es el menor valor
+    que mantiene el *recall* por encima de 0.99 en ``benchmark_vecinos.py``
+    también con ``--replicas 20`` (con 4 baja de 0.99).
+    Las consultas se procesan en lotes de ``tamano_lote`` para acotar la
+    memoria de las matrices de distancias.
+    """
+
+    def __init__(
+        self,
+        n_neighbors: int = 5,
+        *,
+        n_listas: int | None = None,
+        n_sondeos: int = 8,
+        tamano_lote: int = 1_024,
+        random_state: int | None = 42,
+    ) -> None:
+        self.n_neighbors = n_neighbors
+        self.n_listas = n_listas
+        self.n_sondeos = n_sondeos
+        self.tamano_lote = tamano_lote
+        self.random_state = random_state
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "ClasificadorVecinosIVF":
+        X, y = validate_data(self, X, y, dtype=np.float64)
+        if self.n_neighbors > len(X):
+            raise ValueError(
+                f"n_neighbors={self.n_neighbors} supera las {len(X)} filas de entrenamiento."
+            )
+        self.classes_, codigos = np.unique(y, return_inverse=True)
+
+        n_listas = self.n_listas or max(int(math.sqrt(len(X))), 1)
+        n_listas = min(n_listas, len(X))
+        agrupador = KMeans(n_listas, n_init=1, random_state=self.random_state)
+        celdas = agrupador.fit_predict(X)
+
+        orden = np.argsort(celdas, kind="stable")
+        self.centroides_ = agrupador.cluster_centers_
+        self.puntos_ = np.ascontiguousarray(X[orden])
+        self.normas_ = np.einsum("ij,ij->i", self.puntos_, self.puntos_)
+        self.etiquetas_ = codigos[orden].astype(np.intp)
+        self.indices_ = orden
+        self.inicios_ = np.searchsorted(celdas[orden], np.arange(n_listas + 1))
+        return self
+
+    def _sondeos(self, X: np.ndarray, n_sondeos: int) -> np.ndarray:
+        n_listas = len(self.centroides_)
+        if n_sondeos >= n_listas:
+            return np.broadcast_to(np.arange(n_listas), (len(X), n_listas))
+        distancias = (
+            np.einsum("ij,ij->i", X, X)[:, None]
+            - 2 * X @ self.centroides_.T
+            + np.einsum("ij,ij->i", self.centroides_, self.centroides_)
+        )
+        return np.argpartition(distancias, n_sondeos - 1, axis=1)[:, :n_sondeos]
+
+    def _buscar_lote(
+        self, X: np.ndarray, k: int, n_sondeos: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Distancias al cuadrado y posiciones (en ``puntos_``) de los ``k`` vecinos."""
+
+        n_sondeos = n_sondeos or self.n_sondeos
+        sondeos = self._sondeos(X, n_sondeos)
+        tamanos = np.diff(self.inicios_)
+        # Cada consulta escribe sus candidatos en su fila de un búfer relleno
+        # con ``inf``. El ancho se acota: una fila llena se compacta a sus
+        # ``k`` mejores antes de recibir otra celda.
+        ancho = min(
+            max(int(tamanos[sondeos].sum(axis=1).max()), k),
+            k + 4 * int(tamanos.max()),
+        )
+        candidatos_d = np.full((len(X), ancho), np.inf)
+        candidatos_i = np.full((len(X), ancho), -1, dtype=np.intp)
+        cursores = np.zeros(len(X), dtype=np.intp)
+        normas_consulta = np.einsum("ij,ij->i", X, X)
+
+        # Se recorre por celda, no por consulta: cada celda se lee una vez y se
+        # compara con todas las consultas del lote que la sondean.
+        pares = np.argsort(sondeos, axis=None, kind="stable")
+        listas, cortes = np.unique(sondeos.ravel()[pares], return_index=True)
+        por_lista = np.split(pares // sondeos.shape[1], cortes[1:])
+        for lista, consultas in zip(listas, por_lista):
+            inicio, fin = self.inicios_[lista], self.inicios_[lista + 1]
+            if fin == inicio:
+                continue
+            llenas = consultas[cursores[consultas] + (fin - inicio) > ancho]
+            if llenas.size:
+                elegidos = np.argpartition(candidatos_d[llenas], k - 1, axis=1)[:, :k]
+                filas = llenas[:, None]
+                candidatos_i[llenas, :k] = candidatos_i[filas, elegidos]
+                candidatos_d[llenas, :k] = candidatos_d[filas, elegidos]
+                candidatos_d[llenas, k:] = np.inf
+                candidatos_i[llenas, k:] = -1
+                cursores[llenas] = k
+            columnas = cursores[consultas, None] + np.arange(fin - inicio)
+            filas = consultas[:, None]
+            candidatos_d[filas, columnas] = (
+                normas_consulta[consultas, None]
+                - 2 * X[consultas] @ self.puntos_[inicio:fin].T
+                + self.normas_[inicio:fin]
+            )
+            candidatos_i[filas, columnas] = np.arange(inicio, fin)
+            cursores[consultas] += fin - inicio
+
+        if ancho > k:
+            elegidos = np.argpartition(candidatos_d, k - 1, axis=1)[:, :k]
+            candidatos_d = np.take_along_axis(candidatos_d, elegidos, axis=1)
+            candidatos_i = np.take_along_axis(candidatos_i, elegidos, axis=1)
+        orden = np.argsort(candidatos_d, axis=1, kind="stable")
+        candidatos_d = np.take_along_axis(candidatos_d, orden, axis=1)
+        candidatos_i = np.take_along_axis(candidatos_i, orden, axis=1)
+
+        # Consultas cuyas celdas no llegaban a ``k`` puntos: se repiten solo
+        # ellas con el doble de sondeos, hasta cubrir todas las celdas.
+        cortas = np.isinf(candidatos_d[:, -1])
+        if cortas.any() and n_sondeos < len(self.centroides_):
+            candidatos_d[cortas], candidatos_i[cortas] = self._buscar_lote(
+                X[cortas], k, 2 * n_sondeos
+            )
+        return candidatos_d, candidatos_i
+
+    def _buscar(self, X: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        check_is_fitted(self)
+        X = validate_data(self, X, dtype=np.float64, reset=False)
+        lotes = [
+            self._buscar_lote(X[inicio : inicio + self.tamano_lote], k)
+            for inicio in range(0, len(X), self.tamano_lote)
+        ]
+        return (
+            np.vstack([d for d, _ in lotes]),
+            np.vstack([i for _, i in lotes]),
+        )
+
+    def kneighbors(
+        self, X: np.ndarray, n_neighbors: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Distancias euclidianas e índices (filas de ``X`` de ``fit``) de los vecinos.
+
+        Solo si el índice entero tiene menos de ``n_neighbors`` puntos quedan
+        huecos, con distancia ``inf`` e índice ``-1``.
+        """
+
+        distancias, posiciones = self._buscar(X, n_neighbors or self.n_neighbors)
+        indices = np.where(posiciones >= 0, self.indices_[posiciones], -1)
+        return np.sqrt(np.maximum(distancias, 0)), indices
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        distancias, posiciones = self._buscar(X, self.n_neighbors)
+        votos = np.zeros((len(posiciones), len(self.classes_)))
+        validos = np.isfinite(distancias)
+        filas = np.broadcast_to(np.arange(len(posiciones))[:, None], posiciones.shape)
+        np.add.at(votos, (filas[validos], self.etiquetas_[posiciones[validos]]), 1.0)
+        return votos / np.maximum(votos.sum(axis=1, keepdims=True), 1.0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # Empates: gana la clase menor, como en ``KNeighborsClassifier``.
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+__all__ = ["ClasificadorVecinosIVF"]
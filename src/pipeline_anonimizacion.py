@@ -2,29 +2,57 @@
 
 from __future__ import annotations
 
-import json
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import math
 import random
 import string
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Iterator, Mapping
 
+import numpy as np
 import pandas as pd
 from faker import Faker
 
 from anonimizar_datos import (
-    anonimizar_columnas_hash,
-    enmascarar_columnas,
-    tokenizar_columnas,
+    BovedaTokens,
+    EscritorBloques,
+    PoliticaAnonimizacion,
+    ReglaHash,
+    ReglaMascara,
+    ReglaToken,
+    ReporteRiesgo,
+    VocabularioBoveda,
+    analizar_riesgo,
+    anonimizar_archivo,
+    aplicar_politica,
+    verificar_riesgo,
 )
 
 CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "anonimizacion"
+BOVEDA_TOKENS = "tokenizacion.sqlite"
 CATEGORIAS = ("tecnologia", "consumo", "moda")
 HASH_COLUMNS = ("cliente_id",)
 MASK_COLUMNS = ("documento_nacional",)
 TOKEN_COLUMNS = ("direccion_detallada", "asesor_venta")
+CUASI_IDENTIFICADORES = ("categoria", "mes", "anio", "es_fin_de_semana", "monto_compra")
 HASH_SALT = "ml-pipeline-e2e-demo"
+K_ANONIMATO = 5
+REDONDEO_MONTO = -3  # Generaliza monto_compra a miles antes de medir el riesgo
 DEFAULT_REGISTROS = 25
+FILAS_POR_BLOQUE = 100_000
 FAKER_LOCALE = "es_MX"
+FILAS_POR_SHARD = 250_000
+TAMANO_POOL_FAKER = 5_000
+DIAS_HISTORIA = 120
+
+POLITICA = PoliticaAnonimizacion(
+    reglas={
+        **{columna: ReglaHash(sal=HASH_SALT) for columna in HASH_COLUMNS},
+        **{columna: ReglaMascara(visible=3, caracter="#") for columna in MASK_COLUMNS},
+        **{columna: ReglaToken(prefijo="anon") for columna in TOKEN_COLUMNS},
+    }
+)
 
 
 def generar_datos_ficticios(
@@ -65,6 +93,129 @@ def generar_datos_ficticios(
     return pd.DataFrame(registros)
 
 
+def _crear_pools_faker(seed: int, tamano_pool: int) -> tuple[np.ndarray, np.ndarray]:
+    """Genera una sola vez las direcciones y nombres que después se muestrean."""
+
+    faker = Faker(FAKER_LOCALE)
+    faker.seed_instance(seed)
+    direcciones = [faker.address().replace("\n", ", ") for _ in range(tamano_pool)]
+    nombres = [faker.name() for _ in range(tamano_pool)]
+    return np.array(direcciones, dtype=object), np.array(nombres, dtype=object)
+
+
+def _generar_shard(
+    inicio: int,
+    n_registros: int,
+    semilla: np.random.SeedSequence,
+    direcciones: np.ndarray,
+    nombres: np.ndarray,
+    fecha_fin: pd.Timestamp,
+) -> pd.DataFrame:
+    """Genera un shard con NumPy vectorizado; se ejecuta en un proceso del pool."""
+
+    rng = np.random.default_rng(semilla)
+    consecutivos = np.arange(inicio + 1, inicio + n_registros + 1)
+
+    numeros = rng.integers(10_000_000, 100_000_000, n_registros).astype("U8")
+    letras = np.array(list(string.ascii_uppercase))[
+        rng.integers(0, 26, (n_registros, 2))
+    ]
+    documentos = np.char.add(
+        np.char.add(np.char.add("DNI", numeros), letras[:, 0]), letras[:, 1]
+    )
+    dias_atras = rng.integers(0, DIAS_HISTORIA + 1, n_registros)
+
+    return pd.DataFrame(
+        {
+            "venta_id": consecutivos,
+            "cliente_id": np.char.add(
+                "CLI-", np.char.zfill(consecutivos.astype("U"), 3)
+            ),
+            "documento_nacional": documentos,
+            "direccion_detallada": direcciones[
+                rng.integers(0, len(direcciones), n_registros)
+            ],
+            "fecha_compra": fecha_fin - pd.to_timedelta(dias_atras, unit="D"),
+            "monto_compra": np.round(rng.uniform(1200, 8500, n_registros), 2),
+            "categoria": pd.Categorical.from_codes(
+                rng.integers(0, len(CATEGORIAS), n_registros), categories=CATEGORIAS
+            ),
+            "asesor_venta": nombres[rng.integers(0, len(nombres), n_registros)],
+        }
+    )
+
+
+def iterar_datos_masivos(
+    n_registros: int,
+    *,
+    seed: int = 42,
+    shards: int | None = None,
+    procesos: int | None = None,
+    tamano_pool: int = TAMANO_POOL_FAKER,
+    fecha_fin: pd.Timestamp | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Genera datos sintéticos por shards, en orden y con memoria acotada.
+
+    Cada shard recibe una semilla derivada con ``SeedSequence.spawn``, de modo
+    que el resultado es reproducible para el mismo ``seed``, número de
+    ``shards`` y ``fecha_fin`` (por defecto, hoy). Los nombres y direcciones se
+    muestrean de pools de Faker generados una vez. Con ``procesos > 1`` los
+    shards se reparten en un pool de procesos con un máximo de ``2 * procesos``
+    shards en vuelo.
+    """
+
+    if n_registros <= 0:
+        raise ValueError("n_registros debe ser mayor que cero.")
+
+    shards = shards or max(1, math.ceil(n_registros / FILAS_POR_SHARD))
+    fecha_fin = (fecha_fin or pd.Timestamp.today()).normalize()
+    direcciones, nombres = _crear_pools_faker(seed, tamano_pool)
+    semillas = np.random.SeedSequence(seed).spawn(shards)
+    limites = np.linspace(0, n_registros, shards + 1).astype(int)
+    tareas = [
+        (int(inicio), int(fin - inicio), semilla, direcciones, nombres, fecha_fin)
+        for inicio, fin, semilla in zip(limites[:-1], limites[1:], semillas)
+        if fin > inicio
+    ]
+
+    if not procesos or procesos <= 1:
+        for tarea in tareas:
+            yield _generar_shard(*tarea)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo: deque[Future[pd.DataFrame]] = deque()
+        pendientes = iter(tareas)
+        for tarea in pendientes:
+            en_vuelo.append(pool.submit(_generar_shard, *tarea))
+            if len(en_vuelo) >= 2 * procesos:
+                break
+        while en_vuelo:
+            shard = en_vuelo.popleft().result()
+            siguiente = next(pendientes, None)
+            if siguiente is not None:
+                en_vuelo.append(pool.submit(_generar_shard, *siguiente))
+            yield shard
+
+
+def generar_datos_masivos(n_registros: int, **opciones: object) -> pd.DataFrame:
+    """Versión en memoria de ``iterar_datos_masivos`` para pruebas de carga."""
+
+    return pd.concat(
+        iterar_datos_masivos(n_registros, **opciones),  # type: ignore[arg-type]
+        ignore_index=True,
+    )
+
+
+def guardar_datos_masivos(destino: Path, n_registros: int, **opciones: object) -> Path:
+    """Escribe los shards directamente en CSV/Parquet sin juntarlos en memoria."""
+
+    with EscritorBloques(destino) as escritor:
+        for shard in iterar_datos_masivos(n_registros, **opciones):  # type: ignore[arg-type]
+            escritor.escribir(shard)
+    return destino
+
+
 def enriquecer_dataset(df: pd.DataFrame) -> pd.DataFrame:
     """Agrega features temporales sin duplicar lógica en otros scripts."""
 
@@ -77,23 +228,83 @@ def enriquecer_dataset(df: pd.DataFrame) -> pd.DataFrame:
 
 def aplicar_anonimizacion(
     df: pd.DataFrame,
+    vocabularios: Mapping[str, Mapping[str, str]] | None = None,
 ) -> tuple[pd.DataFrame, Dict[str, Dict[str, str]]]:
-    """Aplica hashing, enmascarado y tokenización usando solo anonimizar-datos."""
+    """Aplica hashing, enmascarado y tokenización usando solo anonimizar-datos.
 
-    df_hash = anonimizar_columnas_hash(df, HASH_COLUMNS, sal=HASH_SALT)
-    df_enmascarado = enmascarar_columnas(df_hash, MASK_COLUMNS, visible=3, caracter="#")
-    tokenizacion = tokenizar_columnas(df_enmascarado, TOKEN_COLUMNS, prefijo="anon")
-    return tokenizacion.dataframe, tokenizacion.diccionarios
+    La política completa se ejecuta en una sola pasada con una única copia de ``df``.
+    """
 
+    resultado = aplicar_politica(df, POLITICA, vocabularios=vocabularios)
+    return resultado.dataframe, resultado.diccionarios
 
-def guardar_diccionarios(diccionarios: Dict[str, Dict[str, str]]) -> Path:
-    """Persiste diccionarios de tokenización para auditorías controladas."""
 
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    destino = CACHE_DIR / "tokenizacion.json"
-    with destino.open("w", encoding="utf-8") as archivo:
-        json.dump(diccionarios, archivo, ensure_ascii=False, indent=2)
-    return destino
+def abrir_boveda() -> BovedaTokens:
+    """Abre (o crea) la bóveda de tokens del demo sin cargarla en memoria."""
+
+    return BovedaTokens(CACHE_DIR / BOVEDA_TOKENS)
+
+
+def cargar_vocabularios(boveda: BovedaTokens) -> Dict[str, VocabularioBoveda]:
+    """Vocabularios que consultan la bóveda por lote para continuar la numeración.
+
+    No se carga ninguna equivalencia: cada lote busca sus valores distintos por
+    el índice de la bóveda.
+    """
+
+    return {columna: VocabularioBoveda(boveda, columna) for columna in TOKEN_COLUMNS}
+
+
+def guardar_diccionarios(
+    diccionarios: Mapping[str, Mapping[str, str]],
+    boveda: BovedaTokens | None = None,
+) -> Path:
+    """Añade a la bóveda las equivalencias de tokenización para auditorías controladas.
+
+    De los ``VocabularioBoveda`` solo se insertan las entradas nuevas; los
+    diccionarios en memoria se añaden completos. La bóveda se amplía en cada
+    ejecución en lugar de sobrescribirse.
+    """
+
+    if boveda is None:
+        with abrir_boveda() as propia:
+            return guardar_diccionarios(diccionarios, propia)
+    for columna, vocabulario in diccionarios.items():
+        if isinstance(vocabulario, VocabularioBoveda):
+            vocabulario.guardar()
+        else:
+            boveda.agregar(columna, vocabulario)
+    return boveda.ruta
+
+
+def evaluar_riesgo(df: pd.DataFrame, *, estricto: bool = False) -> ReporteRiesgo:
+    """Compuerta posterior a la anonimización: mide k-anonimato de los cuasi-identificadores.
+
+    Con ``estricto=True`` lanza ``RiesgoReidentificacionError`` si no se alcanza
+    ``K_ANONIMATO``; si no, solo alerta.
+    """
+
+    generalizado = df[list(CUASI_IDENTIFICADORES)].assign(
+        monto_compra=df["monto_compra"].round(REDONDEO_MONTO)
+    )
+    reporte = analizar_riesgo(
+        generalizado, CUASI_IDENTIFICADORES, k_objetivo=K_ANONIMATO
+    )
+
+    print(f"- Clases de equivalencia: {reporte.clases:,}")
+    print(f"- k-anonimato: {reporte.k} (objetivo {reporte.k_objetivo})")
+    print(f"- Registros en riesgo: {reporte.registros_en_riesgo:,}")
+    print(f"- Riesgo máximo de re-identificación: {reporte.riesgo_maximo:.0%}")
+    if reporte.cumple:
+        print("✅ Los cuasi-identificadores cumplen el k-anonimato exigido.")
+    elif estricto:
+        verificar_riesgo(reporte)
+    else:
+        print(
+            f"⚠️ ALERTA: {len(reporte.grupos_violatorios)} grupos por debajo de "
+            f"k={K_ANONIMATO}; generaliza o suprime cuasi-identificadores antes de compartir."
+        )
+    return reporte
 
 
 def guardar_dataset(df: pd.DataFrame, nombre: str) -> Path:
@@ -110,7 +321,9 @@ def presentar_resumen(titulo: str, df: pd.DataFrame, columnas: Iterable[str]) ->
     print(df[list(columnas)].head())
 
 
-def ejecutar_pipeline(n_registros: int = DEFAULT_REGISTROS) -> None:
+def ejecutar_pipeline(
+    n_registros: int = DEFAULT_REGISTROS, *, estricto: bool = False
+) -> None:
     print("1) Generando datos ficticios con Faker...")
     df_original = generar_datos_ficticios(n_registros=n_registros)
     presentar_resumen(
@@ -129,20 +342,55 @@ def ejecutar_pipeline(n_registros: int = DEFAULT_REGISTROS) -> None:
     )
 
     print("\n3) Aplicando hashing, enmascarado y tokenización...")
-    df_anonimo, diccionarios = aplicar_anonimizacion(df_enriquecido)
-    presentar_resumen(
-        "Vista anonimizada",
-        df_anonimo,
-        ["cliente_id", "documento_nacional", "direccion_detallada", "asesor_venta"],
-    )
+    with abrir_boveda() as boveda:
+        df_anonimo, diccionarios = aplicar_anonimizacion(
+            df_enriquecido, cargar_vocabularios(boveda)
+        )
+        presentar_resumen(
+            "Vista anonimizada",
+            df_anonimo,
+            ["cliente_id", "documento_nacional", "direccion_detallada", "asesor_venta"],
+        )
 
-    ruta_diccionarios = guardar_diccionarios(diccionarios)
+        print(
+            "\n4) Evaluando riesgo de re-identificación de los cuasi-identificadores..."
+        )
+        evaluar_riesgo(df_anonimo, estricto=estricto)
+
+        ruta_diccionarios = guardar_diccionarios(diccionarios, boveda)
     ruta_dataset = guardar_dataset(df_anonimo, "dataset_anonimo")
 
-    print(f"\nDiccionarios guardados en: {ruta_diccionarios}")
+    print(f"\nBóveda de tokens actualizada en: {ruta_diccionarios}")
     print(f"Dataset anonimizado guardado en: {ruta_dataset}")
     print("Pipeline completado sin exponer los datos originales.")
 
 
+def ejecutar_pipeline_por_bloques(
+    origen: Path,
+    destino: Path,
+    *,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> Path:
+    """Anonimiza un archivo CSV/Parquet sin cargarlo completo en memoria."""
+
+    print(f"Anonimizando {origen} en bloques de {filas_por_bloque:,} filas...")
+    with abrir_boveda() as boveda:
+        resultado = anonimizar_archivo(
+            origen,
+            destino,
+            POLITICA,
+            vocabularios=cargar_vocabularios(boveda),
+            filas_por_bloque=filas_por_bloque,
+        )
+        ruta_diccionarios = guardar_diccionarios(resultado.diccionarios, boveda)
+
+    print(f"- Filas procesadas: {resultado.filas:,} en {resultado.bloques} bloques")
+    for columna, segundos in resultado.tiempos.items():
+        print(f"- {columna}: {segundos:.3f} s")
+    print(f"Dataset anonimizado guardado en: {resultado.destino}")
+    print(f"Bóveda de tokens actualizada en: {ruta_diccionarios}")
+    return resultado.destino
+
+
 if __name__ == "__main__":
     ejecutar_pipeline()
@@ -0,0 +1,174 @@
+"""Scoring por lotes de archivos CSV/Parquet con un artefacto persistido.
+
+Lee el archivo por bloques, deriva ``hour`` e ``is_weekend`` igual que
+``cargar_dataframe_limpio``, escala con el scaler de entrenamiento y escribe
+cada bloque puntuado en cuanto está listo. La memoria depende de
+``--filas-por-bloque`` (y de ``--procesos``), no del tamaño del archivo:
+
+    uv run src/puntuar_lotes.py historico.csv .cache/predicciones/historico.parquet
+    uv run src/puntuar_lotes.py historico.parquet salida.csv --procesos 4
+
+Las filas sin todas las features válidas se conservan con ``prediccion`` vacía.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import sys
+import time
+from typing import Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from ml_pipeline_e2e_practica.artefactos import (
+    ARTEFACTOS_DIR,
+    Artefacto,
+    cargar_artefacto,
+)
+from ml_pipeline_e2e_practica.bloques import (
+    FILAS_POR_BLOQUE,
+    EscritorBloques,
+    leer_en_bloques,
+)
+from ml_pipeline_e2e_practica.preprocesamiento_seguro import derivar_features
+
+COLUMNA_PREDICCION = "prediccion"
+# Columnas numéricas de entrada con el mismo tipo en todos los bloques; el resto
+# (``timestamp``, categorías, flags Yes/No) se lee como texto.
+TIPOS_ENTRADA = {
+    "id": "Int64",
+    "temp": "float64",
+    "temp_feel": "float64",
+    "humidity": "float64",
+    "windspeed": "float64",
+    "demand": "float64",
+}
+
+# Artefacto de cada proceso trabajador (se carga una vez, mapeado en memoria).
+_artefacto: Artefacto | None = None
+
+
+@dataclass(frozen=True)
+class ResumenPuntuacion:
+    destino: Path
+    filas: int
+    bloques: int
+    sin_prediccion: int
+    segundos: float
+
+
+def _inicializar(ruta: Path) -> None:
+    global _artefacto
+    _artefacto = cargar_artefacto(ruta)
+
+
+def puntuar_bloque(bloque: pd.DataFrame, artefacto: Artefacto) -> pd.DataFrame:
+    """Deriva features, predice las filas válidas y añade ``COLUMNA_PREDICCION``."""
+
+    bloque = derivar_features(bloque)
+    X = bloque[artefacto.features].to_numpy(dtype=np.float64, na_value=np.nan)
+    validas = ~np.isnan(X).any(axis=1)
+    predicciones = np.full(len(bloque), np.nan)
+    if validas.any():
+        predicciones[validas] = artefacto.predecir_matriz(X[validas])
+    bloque[COLUMNA_PREDICCION] = predicciones
+    return bloque
+
+
+def _puntuar_en_proceso(bloque: pd.DataFrame) -> pd.DataFrame:
+    assert _artefacto is not None
+    return puntuar_bloque(bloque, _artefacto)
+
+
+def _puntuar_en_paralelo(
+    bloques: Iterable[pd.DataFrame], artefacto: Path, procesos: int
+) -> Iterator[pd.DataFrame]:
+    """Reparte bloques entre procesos manteniendo el orden y ``2 * procesos`` en vuelo."""
+
+    with ProcessPoolExecutor(
+        max_workers=procesos, initializer=_inicializar, initargs=(artefacto,)
+    ) as pool:
+        en_vuelo: deque[Future[pd.DataFrame]] = deque()
+        for bloque in bloques:
+            en_vuelo.append(pool.submit(_puntuar_en_proceso, bloque))
+            if len(en_vuelo) >= 2 * procesos:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+
+def puntuar_archivo(
+    origen: str | Path,
+    destino: str | Path,
+    artefacto: str | Path,
+    *,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    procesos: int | None = None,
+) -> ResumenPuntuacion:
+    """Puntúa ``origen`` en bloques y escribe el resultado en ``destino`` (CSV/Parquet)."""
+
+    inicio = time.perf_counter()
+    artefacto = Path(artefacto)
+    bloques_entrada = leer_en_bloques(
+        origen, filas_por_bloque=filas_por_bloque, tipos=TIPOS_ENTRADA
+    )
+    if procesos and procesos > 1:
+        puntuados = _puntuar_en_paralelo(bloques_entrada, artefacto, procesos)
+    else:
+        cargado = cargar_artefacto(artefacto)
+        puntuados = (puntuar_bloque(b, cargado) for b in bloques_entrada)
+
+    filas = bloques = sin_prediccion = 0
+    with EscritorBloques(destino) as escritor:
+        for bloque in puntuados:
+            escritor.escribir(bloque)
+            filas += len(bloque)
+            bloques += 1
+            sin_prediccion += int(bloque[COLUMNA_PREDICCION].isna().sum())
+
+    return ResumenPuntuacion(
+        destino=Path(destino),
+        filas=filas,
+        bloques=bloques,
+        sin_prediccion=sin_prediccion,
+        segundos=time.perf_counter() - inicio,
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("origen", type=Path)
+    parser.add_argument("destino", type=Path)
+    parser.add_argument(
+        "--artefacto", type=Path, default=ARTEFACTOS_DIR / "DecisionTreeRegressor"
+    )
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE)
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    resumen = puntuar_archivo(
+        args.origen,
+        args.destino,
+        args.artefacto,
+        filas_por_bloque=args.filas_por_bloque,
+        procesos=args.procesos,
+    )
+    print(
+        f"✅ {resumen.filas:,} filas puntuadas en {resumen.bloques} bloques "
+        f"({resumen.filas / resumen.segundos:,.0f} filas/s) → {resumen.destino}"
+    )
+    if resumen.sin_prediccion:
+        print(
+            f"⚠️ ALERTA: {resumen.sin_prediccion:,} filas sin features completas "
+            "quedaron sin predicción."
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
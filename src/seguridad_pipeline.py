@@ -1,29 +1,15 @@
 """Pipeline seguro para el dataset de demanda de bicicletas."""
 
-from pathlib import Path
-
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
-DATA_PATH = Path(__file__).parent.parent / "data" / "bike_sharing_demand.csv"
+from ml_pipeline_e2e_practica import cargar_dataframe_limpio
 
 
 def main() -> None:
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(
-            f"No se encontró el dataset en {DATA_PATH}. Asegúrate de sincronizar los datos."
-        )
-
-    df = pd.read_csv(DATA_PATH, parse_dates=["timestamp"])
-    # Convertir timestamp a datetime si no lo es
-    df["timestamp"] = pd.to_datetime(df["timestamp"], dayfirst=True, errors="coerce")
-    df["hour"] = df["timestamp"].dt.hour
-    df["is_weekend"] = df["timestamp"].dt.dayofweek >= 5
-
-    # Manejar valores faltantes
-    df = df.dropna(subset=["temp", "humidity", "windspeed", "demand"])
-    df = df.dropna(subset=["timestamp"])
+    # Carga, parseo de fechas, features temporales y manejo de faltantes
+    # (reutiliza la instantánea en caché si el CSV no cambió).
+    df = cargar_dataframe_limpio()
 
     features = ["temp", "humidity", "windspeed", "hour", "is_weekend"]
     target = "demand"
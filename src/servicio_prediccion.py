@@ -0,0 +1,380 @@
+"""Servicio local de predicción de demanda con micro-lotes sobre asyncio.
+
+Carga un artefacto (scaler + modelo) una sola vez y atiende HTTP/1.1 con
+conexiones keep-alive:
+
+- ``POST /predecir`` con una fila ``{"temp": ..., ...}`` o un lote
+  ``{"filas": [{...}, ...]}``; responde ``{"predicciones": [...]}``.
+- ``GET /metricas``: solicitudes, filas, tamaño medio de lote, latencias p50/p99
+  y throughput.
+- ``GET /salud``.
+
+Las solicitudes concurrentes se agrupan en micro-lotes: el primer elemento
+abre una ventana de ``max_espera_ms`` y el lote se cierra antes si llega a
+``max_lote`` filas, de modo que ``predict`` se llama una vez por lote.
+
+    uv run src/servicio_prediccion.py servir --artefacto .cache/artefactos/LinearRegression
+    uv run src/servicio_prediccion.py carga --concurrencia 64 --solicitudes 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Tuple
+
+import numpy as np
+
+from ml_pipeline_e2e_practica.artefactos import (
+    ARTEFACTOS_DIR,
+    Artefacto,
+    cargar_artefacto,
+)
+
+MAX_LOTE = 256
+MAX_ESPERA_MS = 2.0
+VENTANA_LATENCIAS = 10_000
+
+_ESTADOS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+
+@dataclass
+class Metricas:
+    inicio: float = field(default_factory=time.perf_counter)
+    solicitudes: int = 0
+    filas: int = 0
+    lotes: int = 0
+    errores: int = 0
+    latencias: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=VENTANA_LATENCIAS)
+    )
+
+    def resumen(self) -> Dict[str, float]:
+        segundos = time.perf_counter() - self.inicio
+        p50, p99 = (
+            np.percentile(np.fromiter(self.latencias, float), [50, 99]) * 1_000
+            if self.latencias
+            else (0.0, 0.0)
+        )
+        return {
+            "solicitudes": self.solicitudes,
+            "filas": self.filas,
+            "lotes": self.lotes,
+            "errores": self.errores,
+            "filas_por_lote": self.filas / self.lotes if self.lotes else 0.0,
+            "latencia_p50_ms": float(p50),
+            "latencia_p99_ms": float(p99),
+            "solicitudes_por_segundo": self.solicitudes / segundos if segundos else 0.0,
+        }
+
+
+class AgrupadorLotes:
+    """Une las filas de solicitudes concurrentes en llamadas vectorizadas a ``predict``."""
+
+    def __init__(
+        self,
+        artefacto: Artefacto,
+        *,
+        max_lote: int = MAX_LOTE,
+        max_espera_ms: float = MAX_ESPERA_MS,
+    ) -> None:
+        if max_lote < 1:
+            raise ValueError("max_lote debe ser mayor o igual a uno.")
+        self.artefacto = artefacto
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1_000
+        self.metricas = Metricas()
+        self._cola: asyncio.Queue[Tuple[np.ndarray, asyncio.Future, float]] = (
+            asyncio.Queue()
+        )
+        self._tarea: asyncio.Task | None = None
+
+    def iniciar(self) -> None:
+        self._tarea = asyncio.create_task(self._procesar())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+
+    async def predecir(self, X: np.ndarray) -> np.ndarray:
+        futuro = asyncio.get_running_loop().create_future()
+        await self._cola.put((X, futuro, time.perf_counter()))
+        return await futuro
+
+    async def _procesar(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self._cola.get()]
+            filas = len(pendientes[0][0])
+            limite = loop.time() + self.max_espera
+            while filas < self.max_lote:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    elemento = await asyncio.wait_for(self._cola.get(), restante)
+                except TimeoutError:
+                    break
+                pendientes.append(elemento)
+                filas += len(elemento[0])
+            await self._resolver(pendientes)
+
+    async def _resolver(
+        self, pendientes: List[Tuple[np.ndarray, asyncio.Future, float]]
+    ) -> None:
+        # ``predict`` corre en un hilo: el bucle sigue aceptando solicitudes.
+        loop = asyncio.get_running_loop()
+        predecir = self.artefacto.predecir_matriz
+        resultados: List[np.ndarray | Exception] = []
+        try:
+            predicciones = await loop.run_in_executor(
+                None, predecir, np.concatenate([X for X, _, _ in pendientes])
+            )
+            inicio = 0
+            for X, _, _ in pendientes:
+                resultados.append(predicciones[inicio : inicio + len(X)])
+                inicio += len(X)
+        except Exception as error:
+            if len(pendientes) == 1:
+                resultados = [error]
+            else:
+                # Un fallo del lote no debe arrastrar a las demás solicitudes:
+                # cada una se predice por separado y falla solo la culpable.
+                resultados = []
+                for X, _, _ in pendientes:
+                    try:
+                        resultados.append(await loop.run_in_executor(None, predecir, X))
+                    except Exception as error_propio:
+                        resultados.append(error_propio)
+
+        ahora = time.perf_counter()
+        for (X, futuro, recibido), resultado in zip(pendientes, resultados):
+            if futuro.done():
+                continue
+            if isinstance(resultado, Exception):
+                futuro.set_exception(resultado)
+                continue
+            futuro.set_result(resultado)
+            self.metricas.latencias.append(ahora - recibido)
+            self.metricas.solicitudes += 1
+            self.metricas.filas += len(X)
+        self.metricas.lotes += 1
+
+
+def _a_matriz(cuerpo: Any, features: List[str]) -> np.ndarray:
+    filas = (
+        cuerpo["filas"] if isinstance(cuerpo, dict) and "filas" in cuerpo else [cuerpo]
+    )
+    if not isinstance(filas, list) or not filas:
+        raise ValueError("Se esperaba una fila o {'filas': [...]} no vacío.")
+    try:
+        X = np.array([[fila[f] for f in features] for fila in filas], dtype=float)
+    except KeyError as error:
+        raise ValueError(f"Falta la feature {error} en la solicitud.") from None
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Features inválidas: {error}.") from None
+    # ``json.loads`` acepta NaN e Infinity: se rechazan aquí, antes de unirse a un lote.
+    if not np.isfinite(X).all():
+        raise ValueError(
+            "Las features deben ser números finitos (sin NaN ni infinito)."
+        )
+    return X
+
+
+def _respuesta(estado: int, contenido: Dict[str, Any], cerrar: bool) -> bytes:
+    cuerpo = json.dumps(contenido).encode("utf-8")
+    cabeceras = (
+        f"HTTP/1.1 {estado} {_ESTADOS[estado]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n"
+    )
+    return cabeceras.encode("latin-1") + cuerpo
+
+
+async def _atender(
+    agrupador: AgrupadorLotes,
+    lector: asyncio.StreamReader,
+    escritor: asyncio.StreamWriter,
+) -> None:
+    features = agrupador.artefacto.features
+    try:
+        while True:
+            linea = await lector.readline()
+            if not linea:
+                break
+            metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+            cabeceras: Dict[str, str] = {}
+            while (cabecera := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            cuerpo = await lector.readexactly(int(cabeceras.get("content-length", 0)))
+            cerrar = cabeceras.get("connection", "").lower() == "close"
+
+            if metodo == "POST" and ruta == "/predecir":
+                try:
+                    X = _a_matriz(json.loads(cuerpo), features)
+                    predicciones = await agrupador.predecir(X)
+                    estado, contenido = 200, {"predicciones": predicciones.tolist()}
+                except ValueError as error:
+                    agrupador.metricas.errores += 1
+                    estado, contenido = 400, {"error": str(error)}
+                except Exception as error:
+                    agrupador.metricas.errores += 1
+                    estado, contenido = 500, {"error": repr(error)}
+            elif metodo == "GET" and ruta == "/metricas":
+                estado, contenido = 200, agrupador.metricas.resumen()
+            elif metodo == "GET" and ruta == "/salud":
+                estado, contenido = 200, {
+                    "estado": "ok",
+                    **agrupador.artefacto.metadatos,
+                }
+            else:
+                estado, contenido = 404, {"error": f"Ruta no encontrada: {ruta}"}
+
+            escritor.write(_respuesta(estado, contenido, cerrar))
+            await escritor.drain()
+            if cerrar:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(
+    artefacto: Path,
+    *,
+    host: str = "127.0.0.1",
+    puerto: int = 8080,
+    max_lote: int = MAX_LOTE,
+    max_espera_ms: float = MAX_ESPERA_MS,
+) -> None:
+    agrupador = AgrupadorLotes(
+        cargar_artefacto(artefacto), max_lote=max_lote, max_espera_ms=max_espera_ms
+    )
+    agrupador.iniciar()
+    servidor = await asyncio.start_server(
+        lambda r, w: _atender(agrupador, r, w), host, puerto
+    )
+    print(
+        f"✅ Sirviendo {artefacto.name} en http://{host}:{puerto} "
+        f"(max_lote={max_lote}, max_espera_ms={max_espera_ms})"
+    )
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await agrupador.detener()
+
+
+async def cargar_prueba(
+    *,
+    host: str = "127.0.0.1",
+    puerto: int = 8080,
+    concurrencia: int = 64,
+    solicitudes: int = 10_000,
+) -> Dict[str, float]:
+    """Cliente de carga: ``concurrencia`` conexiones keep-alive enviando filas sueltas."""
+
+    fila = json.dumps(
+        {"temp": 20.5, "humidity": 60, "windspeed": 12.0, "hour": 8, "is_weekend": 0}
+    ).encode("utf-8")
+    peticion = (
+        f"POST /predecir HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(fila)}\r\n\r\n"
+    ).encode("latin-1") + fila
+    latencias: List[float] = []
+    restantes = [solicitudes]
+
+    async def _cliente() -> None:
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            inicio = time.perf_counter()
+            escritor.write(peticion)
+            await escritor.drain()
+            longitud = 0
+            while (cabecera := await lector.readline()) not in (b"\r\n", b""):
+                if cabecera.lower().startswith(b"content-length:"):
+                    longitud = int(cabecera.split(b":")[1])
+            await lector.readexactly(longitud)
+            latencias.append(time.perf_counter() - inicio)
+        escritor.close()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente() for _ in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+    p50, p99 = np.percentile(latencias, [50, 99]) * 1_000
+    return {
+        "solicitudes": len(latencias),
+        "segundos": segundos,
+        "solicitudes_por_segundo": len(latencias) / segundos,
+        "latencia_p50_ms": float(p50),
+        "latencia_p99_ms": float(p99),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    servir_parser = subparsers.add_parser("servir", help="Inicia el servicio.")
+    servir_parser.add_argument(
+        "--artefacto", type=Path, default=ARTEFACTOS_DIR / "LinearRegression"
+    )
+    servir_parser.add_argument("--max-lote", type=int, default=MAX_LOTE)
+    servir_parser.add_argument("--max-espera-ms", type=float, default=MAX_ESPERA_MS)
+
+    carga_parser = subparsers.add_parser(
+        "carga", help="Genera carga contra el servicio."
+    )
+    carga_parser.add_argument("--concurrencia", type=int, default=64)
+    carga_parser.add_argument("--solicitudes", type=int, default=10_000)
+
+    for sub in (servir_parser, carga_parser):
+        sub.add_argument("--host", default="127.0.0.1")
+        sub.add_argument("--puerto", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    if args.comando == "servir":
+        try:
+            asyncio.run(
+                servir(
+                    args.artefacto,
+                    host=args.host,
+                    puerto=args.puerto,
+                    max_lote=args.max_lote,
+                    max_espera_ms=args.max_espera_ms,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    resultado = asyncio.run(
+        cargar_prueba(
+            host=args.host,
+            puerto=args.puerto,
+            concurrencia=args.concurrencia,
+            solicitudes=args.solicitudes,
+        )
+    )
+    print(json.dumps(resultado, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
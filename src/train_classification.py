@@ -6,10 +6,21 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 from sklearn.neighbors import KNeighborsClassifier
 
+from ml_pipeline_e2e_practica.artefactos import entrenar_y_guardar
+from ml_pipeline_e2e_practica.comparacion_modelos import (
+    comparar_modelos,
+    imprimir_resultados,
+)
 from ml_pipeline_e2e_practica.preprocesamiento_seguro import (
     cargar_dataframe_limpio,
     preparar_matrices,
 )
+from ml_pipeline_e2e_practica.validacion_cruzada import (
+    preparar_pliegos,
+    resumen_validacion,
+    validar_modelos,
+)
+from ml_pipeline_e2e_practica.vecinos_aproximados import ClasificadorVecinosIVF
 
 
 def comparar_modelos_clasificacion() -> None:
@@ -24,14 +35,27 @@ def comparar_modelos_clasificacion() -> None:
     modelos = {
         "LogisticRegression": LogisticRegression(max_iter=1000),
         "KNeighborsClassifier": KNeighborsClassifier(n_neighbors=5),
+        # Índice IVF construido en ``fit`` y persistido con el artefacto.
+        "KNeighborsIVF": ClasificadorVecinosIVF(n_neighbors=5),
     }
 
+    resultados = comparar_modelos(
+        modelos, X_train, X_test, y_train, y_test, metrica=accuracy_score
+    )
+
     print("Comparativa de modelos de clasificación (Accuracy en set de prueba):")
-    for nombre, modelo in modelos.items():
-        modelo.fit(X_train, y_train)
-        predicciones = modelo.predict(X_test)
-        accuracy = accuracy_score(y_test, predicciones)
-        print(f"- {nombre}: {accuracy:.4f}")
+    imprimir_resultados(resultados, "Accuracy")
+
+    pliegos = preparar_pliegos(df, target_col="is_high_demand")
+    validacion = validar_modelos(modelos, pliegos, metrica=accuracy_score)
+    print(
+        f"\nValidación cruzada temporal ({pliegos.n_pliegos} pliegos, Accuracy medio ± desviación):"
+    )
+    for nombre, fila in resumen_validacion(validacion).iterrows():
+        print(f"- {nombre}: {fila['media']:.4f} ± {fila['desviacion']:.4f}")
+
+    rutas = entrenar_y_guardar(df, modelos, target_col="is_high_demand")
+    print(f"\nArtefactos guardados en: {next(iter(rutas.values())).parent}")
 
 
 if __name__ == "__main__":
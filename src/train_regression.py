@@ -6,10 +6,20 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 from sklearn.tree import DecisionTreeRegressor
 
+from ml_pipeline_e2e_practica.artefactos import entrenar_y_guardar
+from ml_pipeline_e2e_practica.comparacion_modelos import (
+    comparar_modelos,
+    imprimir_resultados,
+)
 from ml_pipeline_e2e_practica.preprocesamiento_seguro import (
     cargar_dataframe_limpio,
     preparar_matrices,
 )
+from ml_pipeline_e2e_practica.validacion_cruzada import (
+    preparar_pliegos,
+    resumen_validacion,
+    validar_modelos,
+)
 
 
 def comparar_modelos_regresion() -> None:
@@ -21,12 +31,23 @@ def comparar_modelos_regresion() -> None:
         "DecisionTreeRegressor": DecisionTreeRegressor(random_state=42),
     }
 
+    resultados = comparar_modelos(
+        modelos, X_train, X_test, y_train, y_test, metrica=mean_squared_error
+    )
+
     print("Comparativa de modelos de regresión (MSE en set de prueba):")
-    for nombre, modelo in modelos.items():
-        modelo.fit(X_train, y_train)
-        predicciones = modelo.predict(X_test)
-        mse = mean_squared_error(y_test, predicciones)
-        print(f"- {nombre}: {mse:.4f}")
+    imprimir_resultados(resultados, "MSE")
+
+    pliegos = preparar_pliegos(df)
+    validacion = validar_modelos(modelos, pliegos, metrica=mean_squared_error)
+    print(
+        f"\nValidación cruzada temporal ({pliegos.n_pliegos} pliegos, MSE medio ± desviación):"
+    )
+    for nombre, fila in resumen_validacion(validacion).iterrows():
+        print(f"- {nombre}: {fila['media']:.4f} ± {fila['desviacion']:.4f}")
+
+    rutas = entrenar_y_guardar(df, modelos)
+    print(f"\nArtefactos guardados en: {next(iter(rutas.values())).parent}")
 
 
 if __name__ == "__main__":